@@ -0,0 +1,16 @@
+"""
+asv benchmarks.
+
+Synthetic SAFEs are written by `test/synthetic.py`, shared with the unit tests. It's loaded as
+`benchmarks.synthetic`, because `test` is not a package (and would be shadowed by python's `test` package).
+"""
+import os
+import sys
+import importlib.util
+
+_spec = importlib.util.spec_from_file_location(
+    __name__ + '.synthetic', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test',
+                                          'synthetic.py'))
+synthetic = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = synthetic
+_spec.loader.exec_module(synthetic)
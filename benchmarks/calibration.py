@@ -0,0 +1,109 @@
+"""
+benchmarks for calibration and denoising of digital numbers (`sigma0_raw`, `nesz`, `sigma0`, ...),
+from synthetic calibration and noise luts.
+"""
+import os
+import numpy as np
+import dask
+import dask.array
+import xarray as xr
+from xsar.interpolate import RectBilinear
+from xsar.calibration import calibrate, calibrate_dataarray
+from xsar.utils import map_blocks_coords
+from .xml_decoders import new_parser
+from . import synthetic
+
+
+class Calibration:
+    """
+    sigma0_raw, nesz, sigma0 and gamma0 equivalents for a dual pol 4000 * 4000 image, with 2000 * 2000 chunks:
+    full resolution luts with `map_blocks_coords` and xarray expressions ('luts'),
+    versus one blockwise task per chunk ('fused').
+    """
+    params = [['luts', 'fused']]
+    param_names = ['method']
+    var_names = ['sigma0_raw', 'gamma0_raw']
+    pols = ['VV', 'VH']
+
+    def setup(self, method):
+        rng = np.random.default_rng(0)
+        # IW GRDH like calibration grid
+        grid = (np.linspace(0, 16000, 30).round(), np.linspace(0, 25000, 660).round())
+        self.luts_f = {
+            (var_name, pol): dask.delayed(RectBilinear(*grid, 300 + 100 * rng.random((30, 660))))
+            for var_name in self.var_names for pol in self.pols}
+        xml_file = os.path.join(synthetic.xml_dir(), 'noise_100.xml')
+        if not os.path.exists(xml_file):
+            synthetic.noise_xml(xml_file, n_range=100)
+        parser = new_parser()
+        for pol in self.pols:
+            for name in ['noise_lut_range', 'noise_lut_azi']:
+                self.luts_f[(name, pol)] = dask.delayed(parser.get_compound_var(xml_file, name))
+        shape = (4000, 4000)
+        chunks = (1, 2000, 2000)
+        self.dn = xr.DataArray(
+            dask.array.from_array(rng.integers(0, 500, (2,) + shape).astype('u2'), chunks=chunks),
+            dims=('pol', 'atrack', 'xtrack'),
+            coords={'pol': self.pols, 'atrack': np.arange(shape[0]), 'xtrack': np.arange(shape[1])})
+        self.chunk = self.dn.data[:1, :2000, :2000].compute()
+        self.luts_f_computed = {key: f.compute() for key, f in self.luts_f.items()}
+
+    def _calibrate(self, method):
+        if method == 'fused':
+            lut_f = dask.delayed(RectBilinear.stack)(
+                [self.luts_f[(var_name, pol)] for var_name in self.var_names for pol in self.pols])
+            noise_f = dask.delayed([(self.luts_f[('noise_lut_range', pol)], self.luts_f[('noise_lut_azi', pol)])
+                                    for pol in self.pols])
+            return calibrate_dataarray(self.dn, lut_f, self.var_names, noise_f=noise_f, denoise=True)
+        tmpl = self.dn.isel(pol=0).drop_vars('pol')
+        tmpl = tmpl.copy(data=dask.array.empty_like(tmpl.data, dtype='f8'))
+
+        def lut(name, dtype='f8'):
+            return xr.concat([map_blocks_coords(tmpl.astype(dtype), self.luts_f[(name, pol)],
+                                                name='blocks_%s_%s' % (name, pol))
+                              for pol in self.pols], 'pol').assign_coords(pol=self.pols)
+
+        noise_lut = lut('noise_lut_range', 'f4') * lut('noise_lut_azi', 'f4')
+        ds = xr.Dataset()
+        for var_name in self.var_names:
+            calibration_lut = lut(var_name)
+            res = np.abs(self.dn) ** 2. / (calibration_lut ** 2)
+            ds[var_name] = res.where(res > 0)
+            noise = 'ne%sz' % var_name[0]
+            ds[noise] = noise_lut / calibration_lut ** 2
+            ds[var_name.replace('_raw', '')] = (ds[var_name] - ds[noise]).clip(min=0)
+        return ds
+
+    def time_calibrate(self, method):
+        self._calibrate(method).compute(scheduler='sync')
+
+    def _calibrate_chunk(self, method):
+        """one chunk with numpy, like a dask worker (dask finalize would add copies of results)"""
+        dn = self.chunk
+        atracks = np.arange(2000)
+        xtracks = np.arange(2000)
+        luts_f = self.luts_f_computed
+        if method == 'fused':
+            lut_f = RectBilinear.stack([luts_f[(var_name, 'VV')] for var_name in self.var_names])
+            calibrate(dn, lut_f, atracks, xtracks, [[0], [1]], noise_f=[(luts_f[('noise_lut_range', 'VV')],
+                                                                         luts_f[('noise_lut_azi', 'VV')])],
+                      denoise=True)
+            return
+        noise_lut = luts_f[('noise_lut_range', 'VV')](atracks, xtracks).astype('f4') * \
+            luts_f[('noise_lut_azi', 'VV')](atracks, xtracks).astype('f4')
+        res = {}
+        for var_name in self.var_names:
+            lut = luts_f[(var_name, 'VV')](atracks, xtracks)
+            raw = np.abs(dn[0]) ** 2. / lut ** 2
+            res[var_name] = np.where(raw > 0, raw, np.nan)
+            res['ne%sz' % var_name[0]] = noise_lut / lut ** 2
+            res[var_name.replace('_raw', '')] = np.clip(res[var_name] - res['ne%sz' % var_name[0]], 0, None)
+
+    def time_calibrate_chunk(self, method):
+        self._calibrate_chunk(method)
+
+    def peakmem_calibrate_chunk(self, method):
+        self._calibrate_chunk(method)
+
+    def track_tasks(self, method):
+        return len(dict(self._calibrate(method).__dask_graph__()))
@@ -0,0 +1,61 @@
+"""
+benchmarks for `xsar.Catalog` queries, on synthetic footprints and time ranges.
+"""
+import pandas as pd
+from shapely.geometry import box
+import xsar
+from . import synthetic
+
+
+class CatalogQuery:
+    params = [[10000, 200000]]
+    param_names = ['n_products']
+    timeout = 600
+
+    def setup_cache(self):
+        return {n: synthetic.product_info_frame(n) for n in self.params[0]}
+
+    def setup(self, frames, n_products):
+        self.df = frames[n_products]
+        self.catalog = xsar.Catalog(self.df)
+        self.catalog.query(geometry=(0, 0))  # build indexes
+        self.new_df = synthetic.product_info_frame(1000, seed=1)
+
+    def time_query_box_time(self, frames, n_products):
+        self.catalog.query(geometry=box(-20, -10, 0, 10), start='2017-03-01', stop='2017-03-08')
+
+    def time_query_index_box_time(self, frames, n_products):
+        self.catalog.query_index(geometry=box(-20, -10, 0, 10), start='2017-03-01', stop='2017-03-08')
+
+    def time_query_point(self, frames, n_products):
+        self.catalog.query(geometry=(-67, 20))
+
+    def time_query_index_point(self, frames, n_products):
+        self.catalog.query_index(geometry=(-67, 20))
+
+    def time_query_time(self, frames, n_products):
+        self.catalog.query(start='2017-03-01 10:00', stop='2017-03-01 11:00')
+
+    def time_linear_scan(self, frames, n_products):
+        # without catalog
+        start, stop = pd.Timestamp('2017-03-01'), pd.Timestamp('2017-03-08')
+        mask = self.df.geometry.intersects(box(-20, -10, 0, 10))
+        self.df[mask & self.df.time_range.map(lambda i: i.right >= start and i.left <= stop).values]
+
+    def time_build(self, frames, n_products):
+        xsar.Catalog(self.df).query(geometry=(0, 0))
+
+    def time_insert(self, frames, n_products):
+        # 1000 new products, and index rebuild
+        catalog = xsar.Catalog(self.df)
+        catalog.query(geometry=(0, 0))
+        catalog.add(self.new_df)
+        catalog.query(geometry=(0, 0))
+
+    def time_insert_query(self, frames, n_products):
+        # alternating inserts of 100 products and queries: inserts are scanned, without index rebuild
+        catalog = xsar.Catalog(self.df)
+        catalog.query(geometry=(0, 0))
+        for i in range(10):
+            catalog.add(self.new_df.iloc[i * 100:(i + 1) * 100])
+            catalog.query(geometry=box(-20, -10, 0, 10), start='2017-03-01', stop='2017-03-08')
@@ -0,0 +1,305 @@
+"""
+benchmarks for `xsar.Sentinel1Meta` geolocation (`coords2ll`, `coords2heading`, `ll2coords`), on synthetic SAFEs.
+"""
+import numpy as np
+from scipy.interpolate import RectBivariateSpline
+import xsar
+from xsar.interpolate import RectBilinear
+from . import synthetic
+
+
+class Coords2ll:
+    """lon/lat latency, like `blocks_lonlat` for one chunk of size `chunk` * `chunk`"""
+    params = [[500, 2000]]
+    param_names = ['chunk']
+
+    def setup(self, chunk):
+        self.s1meta = xsar.Sentinel1Meta(synthetic.cached_safe('IW'))
+        self.s1meta.gcps  # gcps are read once
+        self.atracks = np.arange(5000, 5000 + chunk)
+        self.xtracks = np.arange(10000, 10000 + chunk)
+        rng = np.random.default_rng(0)
+        self.points = (rng.uniform(0, 16000, 1000), rng.uniform(0, 25000, 1000))
+
+    def time_coords2ll_chunk(self, chunk):
+        self.s1meta.coords2ll(self.atracks, self.xtracks, to_grid=True)
+
+    def time_coords2heading_chunk(self, chunk):
+        self.s1meta.coords2heading(self.atracks, self.xtracks, to_grid=True, approx=False)
+
+    def time_coords2ll_points(self, chunk):
+        # 1000 points: mostly interpolators setup
+        self.s1meta.coords2ll(*self.points)
+
+    def time_ll2coords_points(self, chunk):
+        self.s1meta.ll2coords(*self.s1meta.coords2ll(*self.points))
+
+
+class Gcps:
+    """gcps gridding from the measurement tiff, and pickled size of the meta with gcps"""
+    params = [['IW', 'EW', 'WV']]
+    param_names = ['mode']
+
+    def setup(self, mode):
+        self.s1meta = xsar.Sentinel1Meta(synthetic.cached_safe(mode))
+        if self.s1meta.multidataset:
+            self.s1meta = xsar.Sentinel1Meta(self.s1meta.subdatasets[0])
+
+    def time_get_gcps(self, mode):
+        self.s1meta._get_gcps()
+
+    def track_pickle_size(self, mode):
+        import cloudpickle
+        self.s1meta.gcps
+        return len(cloudpickle.dumps(self.s1meta))
+
+
+class AnnotationGrid:
+    """
+    lon, lat, incidence and elevation on one chunk of size `chunk` * `chunk`, from the annotation grid:
+    one spline per variable, versus one `RectBilinear` for all variables.
+    """
+    params = [[500, 2000, 5000]]
+    param_names = ['chunk']
+
+    def setup(self, chunk):
+        atracks, xtracks, lon, lat = synthetic.gcps_grid('IW')
+        incidence = np.tile(np.linspace(30, 46, xtracks.size), (atracks.size, 1))
+        self.grid = (atracks, xtracks, np.stack([lon, lat, incidence, incidence - 3.5]))
+        self.atracks = np.arange(5000, 5000 + chunk)
+        self.xtracks = np.arange(10000, 10000 + chunk)
+
+    def time_splines(self, chunk):
+        atracks, xtracks, values = self.grid
+        for v in values:
+            RectBivariateSpline(atracks, xtracks, v, kx=1, ky=1)(self.atracks, self.xtracks)
+
+    def time_rect_bilinear(self, chunk):
+        RectBilinear(*self.grid)(self.atracks, self.xtracks)
+
+
+class Ll2coords:
+    """ll2coords throughput on `n_points` random points (like buoys or model points), and roundtrip accuracy"""
+    params = [[10000, 1000000]]
+    param_names = ['n_points']
+
+    def setup(self, n_points):
+        self.s1meta = xsar.Sentinel1Meta(synthetic.cached_safe('IW'))
+        rng = np.random.default_rng(0)
+        gcps = self.s1meta.gcps
+        self.atracks = rng.uniform(0, gcps.atrack.values[-1], n_points)
+        self.xtracks = rng.uniform(0, gcps.xtrack.values[-1], n_points)
+        self.lonlat = self.s1meta.coords2ll(self.atracks, self.xtracks)
+
+    def time_ll2coords(self, n_points):
+        self.s1meta.ll2coords(*self.lonlat)
+
+    def track_max_error(self, n_points):
+        """max roundtrip error, in pixels"""
+        atracks, xtracks = self.s1meta.ll2coords(*self.lonlat)
+        return float(np.max(np.hypot(atracks - self.atracks, xtracks - self.xtracks)))
+
+
+class Ll2coordsGrid(Ll2coords):
+    """like `Ll2coords`, but with `method='grid'` (lookup grid is built in setup)"""
+
+    def setup(self, n_points):
+        super().setup(n_points)
+        self.s1meta.ll2coords(*self.lonlat, method='grid')
+
+    def time_ll2coords(self, n_points):
+        self.s1meta.ll2coords(*self.lonlat, method='grid')
+
+    def track_max_error(self, n_points):
+        atracks, xtracks = self.s1meta.ll2coords(*self.lonlat, method='grid')
+        return float(np.max(np.hypot(atracks - self.atracks, xtracks - self.xtracks)))
+
+    def time_build_grid(self, n_points):
+        self.s1meta._ll2coords_grid = None
+        self.s1meta._get_ll2coords_grid()
+
+
+class ApproxModes:
+    """
+    accuracy and speed of geolocation modes: bilinear ('exact'), piecewise affine with 10 m or 1 m maximum error,
+    and global affine `approx_transform`.
+    """
+    params = [['exact', 'tiles_10m', 'tiles_1m', 'affine']]
+    param_names = ['mode']
+    approx = {'exact': False, 'tiles_10m': 10., 'tiles_1m': 1., 'affine': True}
+
+    def setup(self, mode):
+        self.s1meta = xsar.Sentinel1Meta(synthetic.cached_safe('IW'))
+        approx = self.approx[mode]
+        # tiles are computed once
+        self.s1meta.coords2ll(0, 0, approx=approx)
+        rng = np.random.default_rng(0)
+        gcps = self.s1meta.gcps
+        self.points = (rng.uniform(0, gcps.atrack.values[-1], 1000000), rng.uniform(0, gcps.xtrack.values[-1], 1000000))
+        self.lonlat = self.s1meta.coords2ll(*self.points)
+        self.atracks = np.arange(5000, 7000)
+        self.xtracks = np.arange(10000, 12000)
+
+    def time_coords2ll_chunk(self, mode):
+        self.s1meta.coords2ll(self.atracks, self.xtracks, to_grid=True, approx=self.approx[mode])
+
+    def time_coords2ll_points(self, mode):
+        self.s1meta.coords2ll(*self.points, approx=self.approx[mode])
+
+    def time_ll2coords_points(self, mode):
+        self.s1meta.ll2coords(*self.lonlat, approx=self.approx[mode])
+
+    def time_coords2heading_chunk(self, mode):
+        self.s1meta.coords2heading(self.atracks[:500], self.xtracks[:500], to_grid=True, approx=self.approx[mode])
+
+    def track_max_error_m(self, mode):
+        """coords2ll max error, in meters"""
+        lon, lat = self.s1meta.coords2ll(*self.points, approx=self.approx[mode])
+        return float(np.max(xsar.utils.haversine(*self.lonlat, lon, lat)[0]))
+
+
+class ShapelyTransform:
+    """lon/lat <-> atrack/xtrack transform of a land mask like multipolygon, with `n_vertices`"""
+    params = [[1000, 100000]]
+    param_names = ['n_vertices']
+
+    def setup(self, n_vertices):
+        import shapely.geometry
+        self.s1meta = xsar.Sentinel1Meta(synthetic.cached_safe('IW'))
+        # 100 islands over the footprint
+        rng = np.random.default_rng(0)
+        minx, miny, maxx, maxy = self.s1meta.footprint.bounds
+        centers = zip(rng.uniform(minx, maxx, 100), rng.uniform(miny, maxy, 100))
+        self.mask_ll = shapely.geometry.MultiPolygon(
+            [shapely.geometry.Point(c).buffer(0.05, n_vertices // 400) for c in centers])
+        self.mask_coords = self.s1meta.ll2coords(self.mask_ll)
+
+    def time_ll2coords(self, n_vertices):
+        self.s1meta.ll2coords(self.mask_ll)
+
+    def time_coords2ll(self, n_vertices):
+        self.s1meta.coords2ll(self.mask_coords)
+
+
+class GroundHeading:
+    """`ground_heading` layer for one chunk of size `chunk` * `chunk`: per pixel (`approx=False`), or interpolated"""
+    params = [[500, 2000], ['exact', 'interpolate']]
+    param_names = ['chunk', 'method']
+
+    def setup(self, chunk, method):
+        self.s1meta = xsar.Sentinel1Meta(synthetic.cached_safe('IW'))
+        self.kwargs = {'exact': {'approx': False}, 'interpolate': {'interpolate': True}}[method]
+        # heading grid is computed once
+        self.s1meta.coords2heading(0, 0, **self.kwargs)
+        self.atracks = np.arange(5000, 5000 + chunk)
+        self.xtracks = np.arange(10000, 10000 + chunk)
+
+    def time_coords2heading(self, chunk, method):
+        self.s1meta.coords2heading(self.atracks, self.xtracks, to_grid=True, **self.kwargs)
+
+    def peakmem_coords2heading(self, chunk, method):
+        self.s1meta.coords2heading(self.atracks, self.xtracks, to_grid=True, **self.kwargs)
+
+
+class LazyLonLat:
+    """
+    lon/lat on a `size` * `size` region of a full IW product: lazy arrays (`lazy_lonlat=True`),
+    versus the default `blocks_lonlat` chunk (5000 * 5000) that contains the region.
+    """
+    params = [[100, 1000]]
+    param_names = ['size']
+
+    def setup(self, size):
+        import xarray as xr
+        from xsar.xarray_backends import LonLatBackendArray
+        self.s1meta = xsar.Sentinel1Meta(synthetic.cached_safe('IW'))
+        self.s1meta.gcps
+        shape = synthetic.modes['IW']['shape']
+        atracks = np.arange(shape[0], dtype=float)
+        xtracks = np.arange(shape[1], dtype=float)
+        self.ds = xr.Dataset(
+            {ll: LonLatBackendArray(self.s1meta, atracks, xtracks, ll).to_variable() for ll in ['longitude', 'latitude']})
+        self.region = dict(atrack=slice(6000, 6000 + size), xtrack=slice(11000, 11000 + size))
+        self.chunk = (np.arange(5000, 10000), np.arange(10000, 15000))
+
+    def time_lazy(self, size):
+        self.ds.isel(**self.region).load()
+
+    def peakmem_lazy(self, size):
+        self.ds.isel(**self.region).load()
+
+    def time_blocks(self, size):
+        lon, lat = self.s1meta.coords2ll(*self.chunk, to_grid=True)
+        lon.astype('f4')[1000:1000 + size, 1000:1000 + size]
+
+    def peakmem_blocks(self, size):
+        lon, lat = self.s1meta.coords2ll(*self.chunk, to_grid=True)
+        lon.astype('f4')[1000:1000 + size, 1000:1000 + size]
+
+
+class Geometries:
+    """
+    geolocation throughput, accuracy and allocations for each case of `synthetic.geometries`
+    (IW, EW, WV, antemeridian crossing, polar).
+    Accuracy is against the synthetic geolocation the gcps were sampled from.
+    """
+    params = [list(synthetic.geometries)]
+    param_names = ['geometry']
+
+    def setup(self, geometry):
+        kwargs = dict(synthetic.geometries[geometry])
+        mode = kwargs.pop('mode')
+        self.s1meta = xsar.Sentinel1Meta(synthetic.cached_safe(mode, name=geometry, **kwargs))
+        if self.s1meta.multidataset:
+            self.s1meta = xsar.Sentinel1Meta(self.s1meta.subdatasets[0])
+        gcps = self.s1meta.gcps
+        rng = np.random.default_rng(0)
+        self.points = (rng.uniform(0, gcps.atrack.values[-1], 100000),
+                       rng.uniform(0, gcps.xtrack.values[-1], 100000))
+        self.truth = synthetic.geolocation(*self.points, spacing=synthetic.modes[mode]['spacing'], **kwargs)
+        self.lonlat = self.s1meta.coords2ll(*self.points)
+        self.atracks = np.arange(1000, 2000)
+        self.xtracks = np.arange(1000, 2000)
+        # heading grid is computed once
+        self.s1meta.coords2heading(0, 0, interpolate=True)
+
+    def time_get_gcps(self, geometry):
+        self.s1meta._get_gcps()
+
+    def time_coords2ll_interpolator(self, geometry):
+        """lon/lat interpolator build from gcps (`_coords2ll_interpolator`, formerly `_dict_coords2ll`)"""
+        self.s1meta._lonlat_interpolator = None
+        self.s1meta._coords2ll_interpolator
+
+    def time_coords2ll_chunk(self, geometry):
+        self.s1meta.coords2ll(self.atracks, self.xtracks, to_grid=True)
+
+    def peakmem_coords2ll_chunk(self, geometry):
+        self.s1meta.coords2ll(self.atracks, self.xtracks, to_grid=True)
+
+    def time_coords2ll_points(self, geometry):
+        self.s1meta.coords2ll(*self.points)
+
+    def time_ll2coords_points(self, geometry):
+        self.s1meta.ll2coords(*self.lonlat)
+
+    def peakmem_ll2coords_points(self, geometry):
+        self.s1meta.ll2coords(*self.lonlat)
+
+    def time_coords2heading_chunk(self, geometry):
+        self.s1meta.coords2heading(self.atracks, self.xtracks, to_grid=True, interpolate=True)
+
+    def track_coords2heading_interpolate_max_error_deg(self, geometry):
+        """coords2heading(..., interpolate=True) max difference with per pixel heading, in degrees"""
+        exact = self.s1meta.coords2heading(*self.points, approx=False)
+        interpolated = self.s1meta.coords2heading(*self.points, interpolate=True)
+        return float(np.max(np.abs((interpolated - exact + 180) % 360 - 180)))
+
+    def track_coords2ll_max_error_m(self, geometry):
+        """coords2ll max error against synthetic geolocation, in meters (gcps grid interpolation error)"""
+        return float(np.max(xsar.utils.haversine(*self.lonlat, *self.truth)[0]))
+
+    def track_ll2coords_max_error(self, geometry):
+        """ll2coords max roundtrip error, in pixels"""
+        atracks, xtracks = self.s1meta.ll2coords(*self.lonlat)
+        return float(np.max(np.hypot(atracks - self.points[0], xtracks - self.points[1])))
@@ -0,0 +1,29 @@
+"""
+benchmarks for `xsar.Sentinel1Dataset` opening (graph construction only, nothing is computed), on a synthetic IW SAFE.
+"""
+import xsar
+from . import synthetic
+
+
+class OpenDataset:
+    """open time and dask graph size, for all variables (None) or a subset with `variables`"""
+    params = [['all', 'sigma0', 'lonlat']]
+    param_names = ['variables']
+    variables = {
+        'all': None,
+        'sigma0': ['sigma0'],
+        'lonlat': ['longitude', 'latitude']
+    }
+
+    def setup(self, variables):
+        self.s1meta = xsar.Sentinel1Meta(synthetic.cached_safe('IW'))
+        self.s1meta.gcps  # gcps are read once
+
+    def _open(self, variables):
+        return xsar.Sentinel1Dataset(self.s1meta, variables=self.variables[variables]).dataset
+
+    def time_open_dataset(self, variables):
+        self._open(variables)
+
+    def track_tasks(self, variables):
+        return len(dict(self._open(variables).__dask_graph__()))
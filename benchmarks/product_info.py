@@ -0,0 +1,96 @@
+"""
+benchmarks for `xsar.product_info` catalog scans, on synthetic SAFEs (manifest and xml files only).
+"""
+import os
+import glob
+import time
+import xsar
+from xsar import sentinel1_xml_mappings
+from xsar.xml_parser import XmlParser
+from . import synthetic
+
+n_safes = 20
+
+
+def synthetic_safes(mode):
+    """`n_safes` synthetic SAFEs paths for `mode`, created once in `synthetic.xml_dir()`"""
+    root_dir = os.path.join(synthetic.xml_dir(), 'catalog_%s' % mode)
+    paths = sorted(glob.glob(os.path.join(root_dir, '*.SAFE')))
+    if len(paths) < n_safes:
+        kwargs = {'pols': ('VV',), 'n_subdatasets': 20} if mode == 'WV' else {}
+        paths = [
+            synthetic.safe(root_dir, mode=mode, measurement=False, start='20170907T1030%02d' % i, **kwargs)
+            for i in range(n_safes)
+        ]
+    return paths
+
+
+def new_parser(reader):
+    streamers = sentinel1_xml_mappings.streamers if reader == 'stream' else {}
+    return XmlParser(
+        xpath_mappings=sentinel1_xml_mappings.xpath_mappings,
+        compounds_vars=sentinel1_xml_mappings.compounds_vars,
+        namespaces=sentinel1_xml_mappings.namespaces,
+        streamers=streamers)
+
+
+class ProductInfo:
+    """product_info on `n_safes` SAFEs ('WV' SAFEs have 20 subdatasets)"""
+    params = [['IW', 'WV'], ['objectify', 'stream']]
+    param_names = ['mode', 'reader']
+    timeout = 300
+
+    def setup(self, mode, reader):
+        self.paths = synthetic_safes(mode)
+
+    def time_product_info(self, mode, reader):
+        xsar.product_info(self.paths, include_multi=True, _xml_parser=new_parser(reader))
+
+    def track_safes_per_second(self, mode, reader):
+        t0 = time.perf_counter()
+        xsar.product_info(self.paths, include_multi=True, _xml_parser=new_parser(reader))
+        return len(self.paths) / (time.perf_counter() - t0)
+
+    track_safes_per_second.unit = 'SAFE/s'
+
+
+class ManifestReader:
+    """safe_attributes and files from manifest"""
+    params = [['objectify', 'stream']]
+    param_names = ['reader']
+
+    def setup(self, reader):
+        self.manifests = [os.path.join(p, 'manifest.safe') for p in synthetic_safes('WV')]
+
+    def time_manifest(self, reader):
+        parser = new_parser(reader)
+        for manifest in self.manifests:
+            parser.get_compound_var(manifest, 'safe_attributes')
+            parser.get_compound_var(manifest, 'files')
+
+
+class ProductInfoParallel:
+    """product_info on `n_safes` 'WV' SAFEs, with dask scheduler"""
+    params = [[None, 'threads', 'processes']]
+    param_names = ['scheduler']
+    timeout = 300
+
+    def setup(self, scheduler):
+        self.paths = synthetic_safes('WV')
+
+    def time_product_info(self, scheduler):
+        xsar.product_info(self.paths, include_multi=True, scheduler=scheduler)
+
+
+class ProductInfoCache:
+    """incremental product_info, with all SAFEs in cache file"""
+    params = [['IW', 'WV']]
+    param_names = ['mode']
+
+    def setup(self, mode):
+        self.paths = synthetic_safes(mode)
+        self.cache_file = os.path.join(synthetic.xml_dir(), 'product_info_%s.parquet' % mode)
+        xsar.product_info(self.paths, columns=['name', 'ipf', 'pols'], include_multi=True, cache_file=self.cache_file)
+
+    def time_product_info_cached(self, mode):
+        xsar.product_info(self.paths, columns=['name', 'ipf', 'pols'], include_multi=True, cache_file=self.cache_file)
@@ -0,0 +1,115 @@
+"""
+benchmarks for xml decoders in `xsar.sentinel1_xml_mappings`, against legacy (per element) decoders.
+"""
+import os
+import numpy as np
+from datetime import datetime
+from xsar import sentinel1_xml_mappings
+from xsar.xml_parser import XmlParser
+from . import synthetic
+
+# legacy decoders, calling np.fromstring or strptime once per xml element
+legacy = {
+    'float_2Darray_from_string_list': lambda x: np.vstack([np.fromstring(e, dtype=float, sep=' ') for e in x]),
+    'int_1Darray_list_from_string_list': lambda x: [np.fromstring(str(s), dtype=int, sep=' ') for s in x],
+    'float_1Darray_list_from_string_list': lambda x: [np.fromstring(str(s), dtype=float, sep=' ') for s in x],
+    'datetime64_array': lambda x: np.array(
+        [np.datetime64(datetime.strptime(sx, '%Y-%m-%dT%H:%M:%S.%f')) for sx in x]),
+}
+
+bulk = {name: getattr(sentinel1_xml_mappings, name) for name in legacy}
+
+
+def new_parser():
+    return XmlParser(
+        xpath_mappings=sentinel1_xml_mappings.xpath_mappings,
+        compounds_vars=sentinel1_xml_mappings.compounds_vars,
+        namespaces=sentinel1_xml_mappings.namespaces,
+        streamers=sentinel1_xml_mappings.streamers)
+
+
+class CalibrationDecoders:
+    """decode sigma0 lut from calibration files"""
+    params = [[(30, 660), (300, 2000)], ['legacy', 'bulk']]
+    param_names = ['vectors_pixels', 'decoder']
+
+    def setup(self, vectors_pixels, decoder):
+        n_vectors, n_pixels = vectors_pixels
+        xml_file = os.path.join(synthetic.xml_dir(), 'calibration_%d_%d.xml' % vectors_pixels)
+        if not os.path.exists(xml_file):
+            synthetic.calibration_xml(xml_file, n_vectors=n_vectors, n_pixels=n_pixels)
+        xpath = sentinel1_xml_mappings.xpath_mappings['calibration']['sigma0_lut'][1]
+        self.raw = new_parser().xpath(xml_file, xpath)
+        self.decoders = legacy if decoder == 'legacy' else bulk
+
+    def time_float_2Darray(self, vectors_pixels, decoder):
+        self.decoders['float_2Darray_from_string_list'](self.raw)
+
+
+class NoiseDecoders:
+    """decode range and azimuth noise vectors"""
+    params = [[100, 1000], ['legacy', 'bulk']]
+    param_names = ['n_range', 'decoder']
+
+    def setup(self, n_range, decoder):
+        xml_file = os.path.join(synthetic.xml_dir(), 'noise_%d.xml' % n_range)
+        if not os.path.exists(xml_file):
+            synthetic.noise_xml(xml_file, n_range=n_range)
+        parser = new_parser()
+        mappings = sentinel1_xml_mappings.xpath_mappings['noise']
+        self.raw_pixels = parser.xpath(xml_file, mappings['range']['xtrack'][1])
+        self.raw_luts = parser.xpath(xml_file, mappings['range']['noiseLut'][1])
+        self.raw_azi_lines = parser.xpath(xml_file, mappings['azi']['atrack'][1])
+        self.decoders = legacy if decoder == 'legacy' else bulk
+
+    def time_range_pixels(self, n_range, decoder):
+        self.decoders['int_1Darray_list_from_string_list'](self.raw_pixels)
+
+    def time_range_luts(self, n_range, decoder):
+        self.decoders['float_1Darray_list_from_string_list'](self.raw_luts)
+
+    def time_azi_lines(self, n_range, decoder):
+        self.decoders['int_1Darray_list_from_string_list'](self.raw_azi_lines)
+
+
+class DateDecoders:
+    params = [['legacy', 'bulk']]
+    param_names = ['decoder']
+
+    def setup(self, decoder):
+        self.dates = [synthetic.time_fmt % (i * 0.001) for i in range(10000)]
+        self.decoders = legacy if decoder == 'legacy' else bulk
+
+    def time_datetime64_array(self, decoder):
+        self.decoders['datetime64_array'](self.dates)
+
+
+class NoiseLuts:
+    """parse to lut latency, from a noise xml file, and lut evaluation on a 2000 * 2000 chunk (like `blocks_noise_lut`)"""
+    params = [100, 1000]
+    param_names = ['n_range']
+
+    def setup(self, n_range):
+        self.xml_file = os.path.join(synthetic.xml_dir(), 'noise_%d.xml' % n_range)
+        if not os.path.exists(self.xml_file):
+            synthetic.noise_xml(self.xml_file, n_range=n_range)
+        parser = new_parser()
+        self.luts = {name: parser.get_compound_var(self.xml_file, name) for name in ['noise_lut_range', 'noise_lut_azi']}
+        # chunk overlapping 2 azimuth blocks and 2 swaths
+        self.atracks = np.arange(3000, 5000)
+        self.xtracks = np.arange(7500, 9500)
+
+    def time_noise_luts(self, n_range):
+        parser = new_parser()
+        parser.get_compound_var(self.xml_file, 'noise_lut_range')
+        parser.get_compound_var(self.xml_file, 'noise_lut_azi')
+
+    def time_noise_lut_range_chunk(self, n_range):
+        self.luts['noise_lut_range'](self.atracks, self.xtracks)
+
+    def time_noise_lut_azi_chunk(self, n_range):
+        self.luts['noise_lut_azi'](self.atracks, self.xtracks)
+
+    def track_noise_lut_range_pickle_size(self, n_range):
+        import cloudpickle
+        return len(cloudpickle.dumps(self.luts['noise_lut_range']))
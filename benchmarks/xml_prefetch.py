@@ -0,0 +1,19 @@
+"""
+benchmarks for `xsar.Sentinel1Meta.prefetch_xml`, on a synthetic SAFE.
+"""
+import xsar
+from . import synthetic
+
+
+class PrefetchXml:
+    """annotation, calibration and noise xml files loading, for all polarizations"""
+    params = [1, 4]
+    param_names = ['concurrency']
+    timeout = 300
+
+    def setup(self, concurrency):
+        self.safe = synthetic.cached_safe('IW')
+
+    def time_prefetch_xml(self, concurrency):
+        s1meta = xsar.Sentinel1Meta(self.safe)
+        s1meta.prefetch_xml(concurrency=concurrency)
@@ -14,7 +14,7 @@ setup(
         'GDAL',
         'dask[array]',
         'dask[distributed]',
-        'xarray',
+        'xarray>=0.18',
         'affine',
         'rasterio',
         'cartopy',
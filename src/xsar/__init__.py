@@ -1,3 +1,3 @@
-__all__ = ['open_dataset', 'product_info', 'Sentinel1Meta', 'Sentinel1Dataset', 'SentinelMeta', 'SentinelDataset']
+__all__ = ['open_dataset', 'product_info', 'Sentinel1Meta', 'Sentinel1Dataset', 'SentinelMeta', 'SentinelDataset', 'Catalog']
 from .xsar import *
 from .xsar import __version__
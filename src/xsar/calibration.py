@@ -0,0 +1,166 @@
+"""
+Calibration of digital numbers with calibration luts (sigma0, gamma0, ...), evaluated by blocks of rows.
+see https://sentinel.esa.int/web/sentinel/radiometric-calibration-of-level-1-products
+"""
+import logging
+import numpy as np
+import dask
+import dask.array
+import xarray as xr
+
+logger = logging.getLogger('xsar.calibration')
+logger.addHandler(logging.NullHandler())
+
+noise_block_rows = 256
+"""rows count for noise luts evaluation in `calibrate`"""
+
+
+def calibrate(dn, lut_f, atracks, xtracks, lut_index, noise_f=None, denoise=False, clip=True, dtype='f8',
+              noise_dtype='f4'):
+    """
+    Calibrated values `abs(dn) ** 2 / lut ** 2`, and optionally noise equivalent `noise_lut / lut ** 2` and
+    denoised values, in one pass by blocks of rows: luts are interpolated from the calibration grid for each block,
+    so no full resolution lut, noise lut or intermediate result is allocated.
+    Non positive calibrated values are set to NaN (`dn` default value is 0).
+
+    Parameters
+    ----------
+    dn: numpy.ndarray
+        digital numbers, with shape (n_pols, atracks.size, xtracks.size).
+    lut_f: xsar.interpolate.RectBilinear
+        interpolator with all the luts as variables (see `xsar.interpolate.RectBilinear.stack`).
+    atracks: numpy.ndarray
+        1D sorted atracks coordinates of `dn`.
+    xtracks: numpy.ndarray
+        1D sorted xtracks coordinates of `dn`.
+    lut_index: numpy.ndarray
+        (n_vars, n_pols) int array: variable index in `lut_f` to use for each calibrated variable and polarization.
+    noise_f: list of tuple of callable, optional
+        for each polarization, noise lut functions `f(atracks, xtracks)` (ie range and azimuth noise).
+        Noise lut is the product of their values, converted to `noise_dtype`.
+        If None, only calibrated values are computed.
+    denoise: bool, optional
+        if True, also compute `calibrated - noise equivalent` (`noise_f` must be provided).
+    clip: bool, optional
+        if True, negative denoised values are clipped to 0.
+    dtype: str or numpy.dtype, optional
+        output dtype ('f8' by default).
+    noise_dtype: str or numpy.dtype, optional
+        noise luts dtype ('f4' by default).
+
+    Returns
+    -------
+    numpy.ndarray
+        shape (n_vars * n_kinds, n_pols, atracks.size, xtracks.size): for each variable, calibrated values,
+        then noise equivalent and denoised values if computed (`n_kinds` is 1, 2 or 3).
+    """
+    n_kinds = 1 if noise_f is None else (3 if denoise else 2)
+    # only luts used by dn polarizations are interpolated
+    variables, inverse = np.unique(lut_index, return_inverse=True)
+    lut_index = inverse.reshape(np.shape(lut_index))
+    n_vars, n_pols = lut_index.shape
+    out = np.empty((n_vars * n_kinds, n_pols) + dn.shape[1:], dtype=dtype)
+    # float64 results are computed directly in `out`, others in buffers and then converted
+    direct = out.dtype == np.float64
+    shape = None
+    noise_rows = slice(0, 0)
+    for rows, luts in lut_f.blocks(atracks, xtracks, variables=variables):
+        # abs(dn) ** 2 is computed once for all luts
+        dn2 = np.square(np.abs(dn[:, rows]), dtype=float)
+        if shape != dn2.shape[1:]:
+            shape = dn2.shape[1:]
+            lut2, res_buffer, noise_buffer = np.empty(shape), np.empty(shape), np.empty(shape)
+        for p in range(n_pols):
+            if noise_f is not None:
+                if p == 0 and rows.stop > noise_rows.stop:
+                    # noise luts are evaluated for several blocks at once, to limit calls overhead
+                    noise_rows = slice(rows.start, max(rows.stop, rows.start + noise_block_rows))
+                    noises = []
+                    for funcs in noise_f:
+                        noise = 1
+                        for f in funcs:
+                            noise = noise * np.asarray(f(atracks[noise_rows], xtracks)).astype(noise_dtype, copy=False)
+                        noises.append(noise)
+                noise = noises[p]
+                if np.ndim(noise):
+                    noise = noise[rows.start - noise_rows.start:rows.stop - noise_rows.start]
+            for v in range(n_vars):
+                i = v * n_kinds
+                np.square(luts[lut_index[v, p]], out=lut2)
+                res = out[i, p, rows] if direct else res_buffer
+                np.divide(dn2[p], lut2, out=res)
+                res[~(res > 0)] = np.nan
+                if not direct:
+                    out[i, p, rows] = res
+                if noise_f is None:
+                    continue
+                noise_res = out[i + 1, p, rows] if direct else noise_buffer
+                np.divide(noise, lut2, out=noise_res)
+                if not direct:
+                    out[i + 1, p, rows] = noise_res
+                if denoise:
+                    denoised = out[i + 2, p, rows] if direct else res_buffer
+                    np.subtract(res, noise_res, out=denoised)
+                    if clip:
+                        np.clip(denoised, 0, None, out=denoised)
+                    if not direct:
+                        out[i + 2, p, rows] = denoised
+    return out
+
+
+def calibrate_dataarray(dn, lut_f, var_names, noise_f=None, denoise=False, clip=True, dtype=None, noise_dtype='f4'):
+    """
+    Lazy calibration of `dn` for `var_names`, with one dask task per `dn` chunk for all variables
+    (see `calibrate`).
+
+    Parameters
+    ----------
+    dn: xarray.DataArray
+        digital_number, with dims ('pol', 'atrack', 'xtrack').
+    lut_f: xsar.interpolate.RectBilinear or dask.delayed.Delayed
+        interpolator with `len(var_names) * dn.pol.size` variables, ordered by var_name, then by pol.
+    var_names: list of str
+        calibrated variables names, like 'sigma0_raw'.
+    noise_f: list or dask.delayed.Delayed, optional
+        noise luts functions for each `dn.pol` (see `calibrate`). If not None, noise equivalent variables are
+        computed, named `'ne%sz' % var_name[0]` (ie 'nesz' for 'sigma0_raw').
+    denoise: bool, optional
+        if True, denoised variables are computed, named like `var_name` without '_raw' suffix (ie 'sigma0').
+    clip: bool, optional
+        if True, negative denoised values are clipped to 0.
+    dtype: str or numpy.dtype, optional
+        output dtype (float64 if None).
+    noise_dtype: str or numpy.dtype, optional
+        noise luts dtype ('f4' by default).
+
+    Returns
+    -------
+    xarray.Dataset
+        same coordinates and chunks as `dn`.
+    """
+    dtype = np.dtype(dtype or 'f8')
+    n_pols = dn.pol.size
+    atracks = dn.atrack.values
+    xtracks = dn.xtrack.values
+    var_index = np.arange(len(var_names))[:, np.newaxis] * n_pols
+    names = []
+    for var_name in var_names:
+        names.append(var_name)
+        if noise_f is not None:
+            names.append('ne%sz' % var_name[0])
+            if denoise:
+                names.append(var_name.replace('_raw', ''))
+
+    def _calibrate_block(dn_block, lut_f, noise_f, block_info=None):
+        loc = block_info[0]['array-location']
+        pols = np.arange(*loc[0])
+        return calibrate(dn_block, lut_f, atracks[loc[1][0]:loc[1][1]], xtracks[loc[2][0]:loc[2][1]],
+                         var_index + pols, noise_f=None if noise_f is None else [noise_f[p] for p in pols],
+                         denoise=denoise, clip=clip, dtype=dtype, noise_dtype=noise_dtype)
+
+    dn_data = dask.array.asarray(dn.data)
+    data = dn_data.map_blocks(
+        _calibrate_block, lut_f, noise_f, new_axis=0, chunks=((len(names),),) + dn_data.chunks, dtype=dtype,
+        meta=np.array((), dtype=dtype),
+        name='blocks_calibration-%s' % dask.base.tokenize(dn_data, lut_f, noise_f, var_names, denoise, clip, dtype))
+    return xr.Dataset({name: (dn.dims, data[i]) for i, name in enumerate(names)}, coords=dn.coords)
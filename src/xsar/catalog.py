@@ -0,0 +1,321 @@
+"""
+Spatial and temporal index over `xsar.product_info` results.
+"""
+import logging
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from shapely.geometry import Point, box
+from shapely.geometry.base import BaseGeometry
+
+logger = logging.getLogger('xsar.catalog')
+logger.addHandler(logging.NullHandler())
+
+
+def _interval_bounds(intervals):
+    """left and right bounds of a pd.Interval series, as datetime64[ns] arrays"""
+    if not isinstance(intervals.dtype, pd.IntervalDtype):
+        intervals = pd.arrays.IntervalArray(np.asarray(intervals))
+    else:
+        intervals = intervals.array
+    return np.asarray(intervals.left, dtype='datetime64[ns]'), np.asarray(intervals.right, dtype='datetime64[ns]')
+
+
+def _concat_index(indexes, order):
+    """
+    concatenated MultiIndex `indexes`, sorted by `order`.
+    Faster than `MultiIndex.append` for a small subset of a big index, because levels are not merged.
+    """
+    return pd.MultiIndex.from_arrays(
+        [np.concatenate([index.get_level_values(i) for index in indexes])[order] for i in range(indexes[0].nlevels)],
+        names=indexes[0].names)
+
+
+class Catalog:
+    """
+    Persistent catalog of datasets, with footprint and time range queries.
+
+    Parameters
+    ----------
+    df: geopandas.GeoDataFrame or None, optional
+        result of `xsar.product_info(..., columns='spatial')`, indexed by (path, dsid).
+        'meta' column is dropped.
+    delta_size: int, optional
+        maximum number of inserted datasets not yet indexed. 10000 by default.
+
+    Notes
+    -----
+    Queries use an STRtree over footprints (`geopandas.GeoDataFrame.sindex`), and start dates sorted in a numpy
+    array: datasets overlapping a time window are found with two binary searches, because acquisition durations
+    are bounded by the longest one in the catalog.
+
+    Inserts (see `add`) are not indexed: they are kept in a delta, scanned linearly by queries, and merged in the
+    indexes when the delta has more than `delta_size` datasets (or when `df` is accessed). So alternating inserts
+    and queries doesn't rebuild indexes on each query.
+
+    Examples
+    --------
+        >>> catalog = xsar.Catalog(xsar.product_info(paths, columns='spatial'))
+        >>> catalog.add_paths(new_paths)
+        >>> catalog.save('catalog.parquet')
+        >>> catalog = xsar.Catalog.open('catalog.parquet')
+        >>> catalog.query(geometry=(-67, 20), start='2017-09-07', stop='2017-09-08')
+
+    See Also
+    --------
+    xsar.product_info
+    """
+
+    def __init__(self, df=None, delta_size=10000):
+        self.delta_size = delta_size
+        """maximum number of datasets inserted and not yet indexed (see `add`)"""
+        self._df = None
+        self._pending = []
+        self._delta = None
+        self._replaced = None
+        self._flat_index = None
+        if df is not None:
+            self.add(df)
+
+    @classmethod
+    def open(cls, catalog_file):
+        """
+        Open a catalog saved with `save`.
+
+        Parameters
+        ----------
+        catalog_file: str
+            GeoParquet file.
+
+        Returns
+        -------
+        xsar.Catalog
+        """
+        from .xsar import _read_info_cache
+        df = _read_info_cache(catalog_file)
+        df = df.drop(columns=['_source', '_mtime'], errors='ignore').set_index(['path', 'dsid'])
+        return cls(df)
+
+    def save(self, catalog_file):
+        """
+        Save catalog as a GeoParquet file (requires `pyarrow`).
+
+        Parameters
+        ----------
+        catalog_file: str
+        """
+        from .xsar import _write_info_cache
+        _write_info_cache(self.df.reset_index(), catalog_file)
+
+    def add(self, df):
+        """
+        Insert datasets in catalog. Datasets already in catalog (same (path, dsid) index) are replaced.
+        Inserted datasets are indexed only when more than `delta_size` datasets are waiting (see Notes in `Catalog`).
+
+        Parameters
+        ----------
+        df: geopandas.GeoDataFrame
+            result of `xsar.product_info(..., columns='spatial')`.
+        """
+        missing = {'time_range', 'geometry'} - set(df.columns)
+        if missing:
+            raise ValueError("Missing columns %s. Use xsar.product_info(..., columns='spatial')" % missing)
+        self._pending.append(df.drop(columns=['meta'], errors='ignore'))
+
+    def add_paths(self, paths, **kwargs):
+        """
+        Insert datasets from `paths`, with `xsar.product_info`.
+
+        Parameters
+        ----------
+        paths: str or iterable of str
+        kwargs: dict
+            passed to `xsar.product_info` (ie `scheduler`, `cache_file`)
+        """
+        from .xsar import product_info
+        kwargs.setdefault('columns',
+                          ['name', 'ipf', 'platform', 'swath', 'product', 'pols', 'time_range', 'geometry'])
+        self.add(product_info(paths, **kwargs))
+
+    @property
+    def df(self):
+        """all datasets, as a `geopandas.GeoDataFrame` (datasets not yet indexed are merged in the index)"""
+        self._update()
+        if self._delta is not None:
+            self._build()
+        return self._df
+
+    def __len__(self):
+        self._update()
+        if self._df is None:
+            return 0
+        size = len(self._df) - np.count_nonzero(self._replaced)
+        if self._delta is not None:
+            size += len(self._delta)
+        return size
+
+    def _update(self):
+        """move pending inserts to the unindexed delta, and merge the delta in the index if it's too big"""
+        if not self._pending:
+            return
+        dfs = self._pending if self._delta is None else [self._delta] + self._pending
+        self._pending = []
+        delta = pd.concat(dfs)
+        # last inserted wins
+        delta = delta[~delta.index.duplicated(keep='last')]
+        if self._df is None or len(delta) > self.delta_size:
+            self._delta = delta
+            self._build()
+            return
+        starts, stops = _interval_bounds(delta['time_range'])
+        order = np.argsort(starts, kind='stable')
+        self._delta = gpd.GeoDataFrame(delta.iloc[order], geometry='geometry', crs=self._df.crs)
+        self._delta_starts = starts[order]
+        self._delta_stops = stops[order]
+        self._delta_geometries = np.asarray(self._delta.geometry.values)
+        # indexed datasets replaced by the delta.
+        # lookup in a flat index of tuples is hashed, and doesn't recode the whole MultiIndex on each update
+        if self._flat_index is None:
+            self._flat_index = self._df.index.to_flat_index()
+        self._replaced = np.zeros(len(self._df), dtype=bool)
+        positions = self._flat_index.get_indexer(self._delta.index.to_flat_index())
+        self._replaced[positions[positions >= 0]] = True
+
+    def _build(self):
+        """merge the delta in the indexed datasets, and rebuild indexes"""
+        dfs, starts, stops = [], [], []
+        if self._df is not None:
+            dfs.append(self._df)
+            starts.append(self._starts)
+            stops.append(self._stops)
+        if self._delta is not None:
+            dfs.append(self._delta)
+            start, stop = _interval_bounds(self._delta['time_range'])
+            starts.append(start)
+            stops.append(stop)
+        self._delta = None
+        df = pd.concat(dfs)
+        starts = np.concatenate(starts)
+        stops = np.concatenate(stops)
+        # last inserted wins
+        keep = ~df.index.duplicated(keep='last')
+        # sorted by start date, so the time index is a view of the dataframe order
+        order = np.flatnonzero(keep)[np.argsort(starts[keep], kind='stable')]
+        self._df = gpd.GeoDataFrame(df.iloc[order], geometry='geometry', crs=dfs[-1].crs or 'EPSG:4326')
+        self._starts = starts[order]
+        self._stops = stops[order]
+        self._max_duration = (self._stops - self._starts).max() if len(order) else np.timedelta64(0, 'ns')
+        self._replaced = np.zeros(len(self._df), dtype=bool)
+        self._flat_index = None
+        # sindex is built by geopandas on first access
+        logger.debug('catalog index rebuilt with %d datasets' % len(self._df))
+
+    def _time_positions(self, start, stop):
+        """positions of indexed datasets overlapping [start, stop] (None for no bound)"""
+        i0, i1 = 0, len(self._starts)
+        if stop is not None:
+            i1 = np.searchsorted(self._starts, np.datetime64(pd.Timestamp(stop), 'ns'), side='right')
+        if start is None:
+            return np.arange(i0, i1)
+        start = np.datetime64(pd.Timestamp(start), 'ns')
+        # datasets overlapping start have a start date in [start - max_duration, start]
+        i0 = np.searchsorted(self._starts, start - self._max_duration, side='left')
+        return np.arange(i0, i1)[self._stops[i0:i1] >= start]
+
+    def _query_positions(self, geometry, start, stop, predicate):
+        """positions in self._df of indexed datasets matching query (see `query`), sorted"""
+        df = self._df
+        positions = None
+        if start is not None or stop is not None:
+            positions = self._time_positions(start, stop)
+        if geometry is not None:
+            if positions is None:
+                positions = np.sort(df.sindex.query(geometry, predicate=predicate))
+            elif predicate == 'intersects':
+                # bounding boxes candidates from tree, and exact predicate only on time matches
+                positions = np.intersect1d(positions, df.sindex.query(geometry), assume_unique=True)
+                positions = positions[df.geometry.values[positions].intersects(geometry)]
+            else:
+                positions = np.intersect1d(
+                    positions, df.sindex.query(geometry, predicate=predicate), assume_unique=True)
+        if positions is None:
+            positions = np.arange(len(df))
+        return positions[~self._replaced[positions]]
+
+    def _delta_positions(self, geometry, start, stop, predicate):
+        """positions in self._delta of datasets matching query, with a linear scan"""
+        mask = np.ones(len(self._delta), dtype=bool)
+        if start is not None:
+            mask &= self._delta_stops >= np.datetime64(pd.Timestamp(start), 'ns')
+        if stop is not None:
+            mask &= self._delta_starts <= np.datetime64(pd.Timestamp(stop), 'ns')
+        if geometry is not None:
+            # predicate(geometry, footprint), like `geopandas.sindex.SpatialIndex.query`
+            mask[mask] = getattr(shapely, predicate)(geometry, self._delta_geometries[mask])
+        return np.flatnonzero(mask)
+
+    def _query(self, geometry, start, stop, predicate):
+        """
+        (positions in self._df, positions in self._delta, order) of datasets matching query.
+        order sorts concatenated positions by start date, and is None if there is no delta.
+        """
+        self._update()
+        if self._df is None:
+            raise ValueError('Empty catalog')
+        if geometry is not None and not isinstance(geometry, BaseGeometry):
+            geometry = Point(*geometry) if len(geometry) == 2 else box(*geometry)
+        positions = self._query_positions(geometry, start, stop, predicate)
+        if self._delta is None:
+            return positions, None, None
+        delta_positions = self._delta_positions(geometry, start, stop, predicate)
+        order = np.argsort(
+            np.concatenate([self._starts[positions], self._delta_starts[delta_positions]]), kind='stable')
+        return positions, delta_positions, order
+
+    def query(self, geometry=None, start=None, stop=None, predicate='intersects'):
+        """
+        Find datasets by footprint and time range.
+
+        Parameters
+        ----------
+        geometry: shapely geometry, tuple or None, optional
+            (lon, lat) point, (minlon, minlat, maxlon, maxlat) box, or shapely geometry.
+            If None, no spatial selection.
+        start: str, datetime, pd.Timestamp or None, optional
+            datasets ending before `start` are excluded.
+        stop: str, datetime, pd.Timestamp or None, optional
+            datasets starting after `stop` are excluded.
+        predicate: str, optional
+            spatial predicate ('intersects' by default, 'contains', 'within', ...), as `predicate(geometry, footprint)`.
+            See `geopandas.sindex.SpatialIndex.query`
+
+        Returns
+        -------
+        geopandas.GeoDataFrame
+            matching datasets, sorted by start date.
+
+        See Also
+        --------
+        xsar.Catalog.query_index
+        """
+        positions, delta_positions, order = self._query(geometry, start, stop, predicate)
+        if order is None:
+            return self._df.iloc[positions]
+        df = pd.concat([self._df.iloc[positions], self._delta.iloc[delta_positions]], ignore_index=True)
+        return df.iloc[order].set_axis(
+            _concat_index([self._df.index[positions], self._delta.index[delta_positions]], order))
+
+    def query_index(self, geometry=None, start=None, stop=None, predicate='intersects'):
+        """
+        Like `query`, but only return the (path, dsid) index of matching datasets.
+        Faster than `query`, as no dataframe is built.
+
+        Returns
+        -------
+        pandas.MultiIndex
+        """
+        positions, delta_positions, order = self._query(geometry, start, stop, predicate)
+        if order is None:
+            return self._df.index[positions]
+        return _concat_index([self._df.index[positions], self._delta.index[delta_positions]], order)
@@ -0,0 +1,544 @@
+"""
+Interpolation on annotation grids (geolocation grid, calibration vectors, ...).
+"""
+import logging
+import numpy as np
+
+logger = logging.getLogger('xsar.interpolate')
+logger.addHandler(logging.NullHandler())
+
+
+def bracket(axis, coords, extrapolate=False):
+    """
+    Linear interpolation indices and weights of `coords` on sorted `axis`.
+
+    By default, coordinates outside `axis` are clamped to the nearest bound (no extrapolation),
+    like `scipy.interpolate.RectBivariateSpline`.
+
+    Parameters
+    ----------
+    axis: numpy.ndarray
+        1D strictly increasing array, with at least 2 values.
+    coords: numpy.ndarray
+        coordinates to interpolate at (any shape).
+    extrapolate: bool, optional
+        if True, coordinates outside `axis` are not clamped, and weights are outside [0, 1]
+        (linear extrapolation from first or last interval).
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        (idx, weight), with same shape as `coords`: interpolated value is
+        `v[idx] * (1 - weight) + v[idx + 1] * weight`
+    """
+    axis = np.asarray(axis, dtype=float)
+    coords = np.asarray(coords, dtype=float)
+    if not extrapolate:
+        coords = np.clip(coords, axis[0], axis[-1])
+    step = np.diff(axis)
+    if np.all(np.abs(step - step[0]) <= 1e-9 * step[0]):
+        # regularly spaced axis: no binary search
+        with np.errstate(invalid='ignore'):
+            idx = np.floor((coords - axis[0]) / step[0]).astype(np.intp)
+    else:
+        idx = np.searchsorted(axis, coords, side='right') - 1
+    idx = np.clip(idx, 0, axis.size - 2)
+    weight = (coords - axis[idx]) / (axis[idx + 1] - axis[idx])
+    return idx, weight
+
+
+class RectBilinear:
+    """
+    Bilinear interpolation on a rectilinear (atrack, xtrack) grid, for one or several variables.
+
+    Equivalent to `scipy.interpolate.RectBivariateSpline(atracks, xtracks, values, kx=1, ky=1)`, but
+    bracket indices and weights are computed once for all variables, and evaluated in one numpy pass.
+
+    Parameters
+    ----------
+    atracks: numpy.ndarray
+        1D increasing atrack coordinates of the grid.
+    xtracks: numpy.ndarray
+        1D increasing xtrack coordinates of the grid.
+    values: numpy.ndarray
+        values on grid, with shape (atracks.size, xtracks.size), or (n_vars, atracks.size, xtracks.size)
+        for several variables.
+
+    Examples
+    --------
+        >>> lonlat_f = RectBilinear(gcps.atrack, gcps.xtrack, np.stack([gcps.longitude, gcps.latitude]))
+        >>> lon, lat = lonlat_f(atracks, xtracks)  # 2D (atracks.size, xtracks.size) grids
+        >>> lon, lat = lonlat_f.ev(atracks, xtracks)  # points
+
+    Notes
+    -----
+    Grid evaluation first interpolates the few grid rows along xtrack, and then each output row is
+    `row[i] + weight * (row[i + 1] - row[i])`, computed by blocks of `block_rows` rows.
+
+    Instances are read only, so they can be shared between threads.
+    """
+
+    block_rows = 32
+    """output rows computed at once by `__call__`"""
+
+    def __init__(self, atracks, xtracks, values):
+        self.atracks = np.asarray(atracks, dtype=float)
+        self.xtracks = np.asarray(xtracks, dtype=float)
+        values = np.asarray(values, dtype=float)
+        self.multi = values.ndim == 3
+        """True if several variables are interpolated"""
+        self.values = values if self.multi else values[np.newaxis]
+        expected_shape = (self.atracks.size, self.xtracks.size)
+        if self.values.shape[1:] != expected_shape:
+            raise ValueError('values shape %s does not match grid shape %s' % (values.shape, expected_shape))
+
+    def _result(self, res):
+        return res if self.multi else res[0]
+
+    def __call__(self, atracks, xtracks, grid=True):
+        """
+        Evaluate on the grid defined by 1D `atracks` and `xtracks` (or on points if `grid` is False).
+
+        Returns
+        -------
+        numpy.ndarray
+            shape (atracks.size, xtracks.size), with a leading variable dimension if several variables.
+        """
+        if not grid:
+            return self.ev(atracks, xtracks)
+        atracks = np.atleast_1d(atracks)
+        xtracks = np.atleast_1d(xtracks)
+        res = np.empty((self.values.shape[0], atracks.size, xtracks.size))
+        for _ in self.blocks(atracks, xtracks, out=res):
+            pass
+        return self._result(res)
+
+    def blocks(self, atracks, xtracks, out=None, variables=None):
+        """
+        Evaluate on the grid defined by 1D `atracks` and `xtracks`, by blocks of a few rows, so the caller can
+        consume each block while it's in cpu cache, without allocating the whole result.
+
+        Parameters
+        ----------
+        atracks: numpy.ndarray
+        xtracks: numpy.ndarray
+        out: numpy.ndarray, optional
+            (n_vars, atracks.size, xtracks.size) array where blocks are written.
+            If None, a small buffer is reused for each block.
+        variables: list of int, optional
+            indexes of variables to evaluate (all variables if None).
+
+        Yields
+        ------
+        tuple(slice, numpy.ndarray)
+            atracks slice, and values with shape (n_vars, block size, xtracks.size) (always with variable dimension).
+        """
+        atracks = np.atleast_1d(atracks)
+        xtracks = np.atleast_1d(xtracks)
+        values = self.values if variables is None else self.values[list(variables)]
+        n_vars = values.shape[0]
+        ia, wa = bracket(self.atracks, atracks)
+        ix, wx = bracket(self.xtracks, xtracks)
+        # xtrack interpolation on the (small) grid rows: (n_vars, grid atracks, xtracks.size)
+        rows = values[:, :, ix] * (1 - wx) + values[:, :, ix + 1] * wx
+        rows_diff = np.diff(rows, axis=1)
+        # atrack interpolation: `atracks` are usually sorted, so they are split in a few runs
+        # with the same bracket index, and each run is an outer product written in place.
+        runs_start = np.flatnonzero(np.diff(ia)) + 1
+        if runs_start.size >= self.atracks.size:
+            # unsorted atracks: gather rows
+            res = rows_diff[:, ia] * wa[:, np.newaxis]
+            res += rows[:, ia]
+            if out is not None:
+                out[...] = res
+                res = out
+            yield slice(0, atracks.size), res
+            return
+        if out is None:
+            buffer = np.empty((n_vars, min(self.block_rows, atracks.size), xtracks.size))
+        # runs are also split in blocks of a few rows, so the add is done while the block is in cpu cache
+        blocks_start = np.union1d(runs_start, np.arange(0, ia.size, self.block_rows))
+        for start, stop in zip(blocks_start, np.r_[blocks_start[1:], ia.size]):
+            i = ia[start]
+            block = out[:, start:stop] if out is not None else buffer[:, :stop - start]
+            for v in range(n_vars):
+                np.multiply(wa[start:stop, np.newaxis], rows_diff[v, i], out=block[v])
+                block[v] += rows[v, i]
+            yield slice(start, stop), block
+
+    @classmethod
+    def stack(cls, interpolators):
+        """
+        Stack several interpolators as one multi variables interpolator, so bracket indices and weights are computed
+        once for all of them (ie sigma0 and gamma0 calibration luts, for all polarizations).
+
+        Grids may differ: values are evaluated on the union of the grids axes, which is exact for bilinear interpolation.
+
+        Parameters
+        ----------
+        interpolators: list of RectBilinear
+
+        Returns
+        -------
+        RectBilinear
+            with variables of all `interpolators`, in order.
+        """
+        atracks = interpolators[0].atracks
+        xtracks = interpolators[0].xtracks
+        same_grid = all(np.array_equal(f.atracks, atracks) and np.array_equal(f.xtracks, xtracks)
+                        for f in interpolators[1:])
+        if same_grid:
+            return cls(atracks, xtracks, np.concatenate([f.values for f in interpolators]))
+        logger.debug('stacking %d interpolators on union grid' % len(interpolators))
+        atracks = np.unique(np.concatenate([f.atracks for f in interpolators]))
+        xtracks = np.unique(np.concatenate([f.xtracks for f in interpolators]))
+        values = np.concatenate([f(atracks, xtracks).reshape(-1, atracks.size, xtracks.size) for f in interpolators])
+        return cls(atracks, xtracks, values)
+
+    def _corners(self, ia, ix):
+        """values at cell corners (ia, ix), (ia, ix + 1), (ia + 1, ix), (ia + 1, ix + 1)"""
+        nx = self.xtracks.size
+        v = self.values.reshape(self.values.shape[0], -1)
+        flat = ia * nx + ix
+        return v.take(flat, axis=1), v.take(flat + 1, axis=1), v.take(flat + nx, axis=1), v.take(flat + nx + 1, axis=1)
+
+    def ev(self, atracks, xtracks, extrapolate=False):
+        """
+        Evaluate at points (`atracks[i]`, `xtracks[i]`).
+
+        Parameters
+        ----------
+        atracks: numpy.ndarray
+        xtracks: numpy.ndarray
+        extrapolate: bool, optional
+            if True, points outside the grid are linearly extrapolated, instead of clamped to the grid bounds.
+
+        Returns
+        -------
+        numpy.ndarray
+            same shape as `atracks`, with a leading variable dimension if several variables.
+        """
+        ia, wa = bracket(self.atracks, atracks, extrapolate=extrapolate)
+        ix, wx = bracket(self.xtracks, xtracks, extrapolate=extrapolate)
+        v00, v01, v10, v11 = self._corners(ia, ix)
+        # in place, to limit temporaries on large point sets
+        row0 = v01 - v00
+        row0 *= wx
+        row0 += v00
+        res = v11 - v10
+        res *= wx
+        res += v10
+        res -= row0
+        res *= wa
+        res += row0
+        return self._result(res)
+
+    def _ev_jacobian(self, atracks, xtracks):
+        """values, and derivatives along atrack and xtrack, at points (with linear extrapolation)"""
+        ia, wa = bracket(self.atracks, atracks, extrapolate=True)
+        ix, wx = bracket(self.xtracks, xtracks, extrapolate=True)
+        v00, v01, v10, v11 = self._corners(ia, ix)
+        row0 = v00 + (v01 - v00) * wx
+        row1 = v10 + (v11 - v10) * wx
+        value = row0 + (row1 - row0) * wa
+        d_atrack = (row1 - row0) / (self.atracks[ia + 1] - self.atracks[ia])
+        d_xtrack = ((v01 - v00) * (1 - wa) + (v11 - v10) * wa) / (self.xtracks[ix + 1] - self.xtracks[ix])
+        return value, d_atrack, d_xtrack
+
+    def solve(self, targets, atracks, xtracks, tol=1e-3, max_iter=10):
+        """
+        Inverse interpolation, for 2 variables: find `(atracks, xtracks)` such as `self.ev(atracks, xtracks) == targets`,
+        with Newton iterations on the bilinear mapping (linearly extrapolated outside the grid).
+
+        Parameters
+        ----------
+        targets: tuple of 2 numpy.ndarray
+            values of the 2 variables (ie (longitude, latitude)).
+        atracks: numpy.ndarray
+            first guess for atracks, broadcastable to `targets` shape.
+        xtracks: numpy.ndarray
+            first guess for xtracks, broadcastable to `targets` shape.
+        tol: float, optional
+            convergence tolerance, in atrack/xtrack units: iterations stop for a point when the Newton step is
+            smaller than `tol`.
+        max_iter: int, optional
+            maximum number of iterations.
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+            (atracks, xtracks, residuals), with same shape as `targets`.
+            `residuals` is the norm of the last Newton step, in atrack/xtrack units (an upper bound of the error once
+            converged). It's greater than `tol` for points that didn't converge, and nan (like atracks and xtracks)
+            for non finite inputs.
+        """
+        if self.values.shape[0] != 2:
+            raise ValueError('solve needs 2 variables, not %d' % self.values.shape[0])
+        target0, target1 = np.broadcast_arrays(*[np.asarray(t, dtype=float) for t in targets])
+        shape = target0.shape
+        target0 = target0.ravel()
+        target1 = target1.ravel()
+        atracks = np.array(np.broadcast_to(atracks, shape), dtype=float).ravel()
+        xtracks = np.array(np.broadcast_to(xtracks, shape), dtype=float).ravel()
+        residuals = np.full(atracks.shape, np.inf)
+        valid = np.isfinite(target0) & np.isfinite(target1) & np.isfinite(atracks) & np.isfinite(xtracks)
+        atracks[~valid] = np.nan
+        xtracks[~valid] = np.nan
+        residuals[~valid] = np.nan
+        # iterate only on points not converged
+        active = np.flatnonzero(valid)
+        for _ in range(max_iter):
+            if active.size == 0:
+                break
+            value, d_atrack, d_xtrack = self._ev_jacobian(atracks[active], xtracks[active])
+            r0 = target0[active] - value[0]
+            r1 = target1[active] - value[1]
+            # solve 2x2 jacobian system
+            with np.errstate(divide='ignore', invalid='ignore'):
+                det = d_atrack[0] * d_xtrack[1] - d_xtrack[0] * d_atrack[1]
+                step_atrack = (d_xtrack[1] * r0 - d_xtrack[0] * r1) / det
+                step_xtrack = (d_atrack[0] * r1 - d_atrack[1] * r0) / det
+            atracks[active] += step_atrack
+            xtracks[active] += step_xtrack
+            residuals[active] = np.hypot(step_atrack, step_xtrack)
+            active = active[residuals[active] > tol]
+        if active.size:
+            logger.debug('%d points did not converge in %d iterations' % (active.size, max_iter))
+        return atracks.reshape(shape), xtracks.reshape(shape), residuals.reshape(shape)
+
+
+class PiecewiseAffine:
+    """
+    Piecewise affine approximation of a 2 variables `RectBilinear` (ie (longitude, latitude)),
+    on a regular grid of (atrack, xtrack) tiles, with a bounded error.
+
+    Parameters
+    ----------
+    interpolator: RectBilinear
+        2 variables interpolator to approximate.
+    max_error: float
+        maximum error allowed, as returned by `distance`.
+    distance: function, optional
+        `distance(values, approx_values)` returning the error for each point, where `values` and `approx_values` are
+        (2, n) arrays. Default to euclidean distance.
+    max_tiles: int, optional
+        maximum number of tiles along each dimension.
+    bounds: tuple or None, optional
+        ((atrack_min, atrack_max), (xtrack_min, xtrack_max)) extent of the tiles.
+        If None (default), the grid extent of `interpolator`. Outside the grid, `interpolator` values are clamped.
+
+    Notes
+    -----
+    Tiles count is doubled along both dimensions until the error is lower than `max_error`.
+    On each tile, the affine transform is a least square fit of the interpolator on tile bounds and grid nodes
+    inside the tile. The difference between an affine and a bilinear function is bilinear, so the maximum error
+    is reached on those points, and the error bound holds (relative to `interpolator`) everywhere in `bounds`.
+    Outside `bounds`, border tiles are extrapolated, and the error is not bounded.
+    """
+
+    def __init__(self, interpolator, max_error, distance=None, max_tiles=1024, bounds=None):
+        if interpolator.values.shape[0] != 2:
+            raise ValueError('PiecewiseAffine needs 2 variables, not %d' % interpolator.values.shape[0])
+        if distance is None:
+            distance = lambda v, v_approx: np.hypot(*(v - v_approx))
+        self.interpolator = interpolator
+        self.max_error = max_error
+        axes = (interpolator.atracks, interpolator.xtracks)
+        if bounds is None:
+            bounds = [axis[[0, -1]] for axis in axes]
+        self.bounds = tuple(np.asarray(b, dtype=float) for b in bounds)
+        """((atrack_min, atrack_max), (xtrack_min, xtrack_max)) extent where the error is bounded"""
+        # regular tiles are on the grid extent. Outside the grid, interpolator values are clamped, so they are not
+        # bilinear across grid bounds: a border tile is added on each side where `bounds` is bigger than the grid.
+        self._grid_bounds = tuple(
+            np.array([max(b[0], axis[0]), min(b[1], axis[-1])]) for b, axis in zip(self.bounds, axes))
+        self._borders = tuple((int(b[0] < g[0]), int(b[1] > g[1])) for b, g in zip(self.bounds, self._grid_bounds))
+        n_tiles = (1, 1)
+        while True:
+            coefs, error = self._fit(n_tiles, distance)
+            if error <= max_error or max(n_tiles) >= max_tiles:
+                break
+            n_tiles = (n_tiles[0] * 2, n_tiles[1] * 2)
+        if error > max_error:
+            logger.warning('piecewise affine error %f is greater than %f with %s tiles' % (error, max_error, n_tiles))
+        self._n_tiles = n_tiles
+        self.shape = tuple(n + sum(borders) for n, borders in zip(n_tiles, self._borders))
+        """number of tiles along atrack and xtrack"""
+        self.error = error
+        """maximum error"""
+        # (2 variables, 3 coefs [atrack, xtrack, 1], tiles)
+        self.coefs = coefs
+        # inverse transform (2 coords, 3 coefs [v0, v1, 1], tiles)
+        a, b, c, d = coefs[0, 0], coefs[0, 1], coefs[1, 0], coefs[1, 1]
+        det = a * d - b * c
+        inv = np.stack([np.stack([d, -b]), np.stack([-c, a])]) / det
+        offsets = -np.einsum('ijt,jt->it', inv, coefs[:, 2])
+        self.inv_coefs = np.concatenate([inv, offsets[:, np.newaxis]], axis=1)
+
+    def _tiles_edges(self, n_tiles):
+        """tiles edges, for `n_tiles` regular tiles on the grid extent, and border tiles"""
+        return [
+            np.concatenate([b[:1] if lower else [], np.linspace(g[0], g[1], n + 1), b[1:] if upper else []])
+            for b, g, n, (lower, upper) in zip(self.bounds, self._grid_bounds, n_tiles, self._borders)
+        ]
+
+    def _fit(self, n_tiles, distance):
+        """affine coefs for each tile, and max error"""
+        edges = self._tiles_edges(n_tiles)
+        shape = tuple(e.size - 1 for e in edges)
+        axes = (self.interpolator.atracks, self.interpolator.xtracks)
+        # nodes are tile edges and grid nodes, so each tile is a rectangle of nodes (edges are shared by 2 tiles)
+        nodes = [np.union1d(axis[(axis > edge[0]) & (axis < edge[-1])], edge) for axis, edge in zip(axes, edges)]
+        values = self.interpolator(*nodes)
+        # normalized coordinates, for conditioning
+        norm = [(n - b[0]) / (b[1] - b[0]) for n, b in zip(nodes, self.bounds)]
+        # first and last node index of each tile
+        first = [np.searchsorted(n, e[:-1]) for n, e in zip(nodes, edges)]
+        last = [np.searchsorted(n, e[1:]) for n, e in zip(nodes, edges)]
+
+        def tile_sums_1d(arr, dim):
+            csum = np.concatenate([[0], np.cumsum(arr)])
+            return csum[last[dim] + 1] - csum[first[dim]]
+
+        def tile_sums_2d(arr):
+            # summed area table, for (..., atrack, xtrack) arr
+            sat = np.zeros(arr.shape[:-2] + (arr.shape[-2] + 1, arr.shape[-1] + 1))
+            sat[..., 1:, 1:] = arr.cumsum(-2).cumsum(-1)
+            a0, a1 = first[0][:, np.newaxis], last[0][:, np.newaxis] + 1
+            x0, x1 = first[1][np.newaxis, :], last[1][np.newaxis, :] + 1
+            return sat[..., a1, x1] - sat[..., a0, x1] - sat[..., a1, x0] + sat[..., a0, x0]
+
+        # normal equations of least squares fit `v = cu * u + cw * w + c1`, with (u, w) normalized coordinates
+        u, w = norm
+        n_u, n_w = [tile_sums_1d(np.ones(n.size), dim) for dim, n in enumerate(nodes)]
+        s_u, s_uu = tile_sums_1d(u, 0), tile_sums_1d(u ** 2, 0)
+        s_w, s_ww = tile_sums_1d(w, 1), tile_sums_1d(w ** 2, 1)
+        outer = lambda ta, tx: np.multiply.outer(ta, tx).ravel()
+        lhs = np.stack([
+            np.stack([outer(s_uu, n_w), outer(s_u, s_w), outer(s_u, n_w)], axis=-1),
+            np.stack([outer(s_u, s_w), outer(n_u, s_ww), outer(n_u, s_w)], axis=-1),
+            np.stack([outer(s_u, n_w), outer(n_u, s_w), outer(n_u, n_w)], axis=-1),
+        ], axis=-2)
+        rhs = np.stack([
+            tile_sums_2d(values * u[:, np.newaxis]),
+            tile_sums_2d(values * w[np.newaxis, :]),
+            tile_sums_2d(values),
+        ], axis=-1).reshape(2, -1, 3)
+        # (tiles, 3, 2 variables)
+        c = np.linalg.solve(lhs, rhs.transpose(1, 2, 0))
+        # back to atrack, xtrack coordinates
+        (a0, a1), (x0, x1) = self.bounds
+        coefs = np.stack([
+            c[:, 0] / (a1 - a0),
+            c[:, 1] / (x1 - x0),
+            c[:, 2] - c[:, 0] * a0 / (a1 - a0) - c[:, 1] * x0 / (x1 - x0)
+        ]).transpose(2, 0, 1)
+
+        # error on nodes, for all tiles sharing a node
+        xtracks2D, atracks2D = np.meshgrid(nodes[1], nodes[0])
+        tiles_idx = [
+            [np.clip(np.searchsorted(e, n, side=side) - 1, 0, len(e) - 2) for side in ['left', 'right']]
+            for n, e in zip(nodes, edges)
+        ]
+        max_error = 0
+        for ia in tiles_idx[0]:
+            for ix in tiles_idx[1]:
+                tiles = (ia[:, np.newaxis] * shape[1] + ix[np.newaxis, :]).ravel()
+                approx = self._apply(coefs, tiles, atracks2D.ravel(), xtracks2D.ravel())
+                max_error = max(max_error, np.max(distance(values.reshape(2, -1), approx)))
+        return coefs, max_error
+
+    def _tiles(self, atracks, xtracks):
+        """flat tile index of points"""
+        idx = []
+        for c, g, n, (lower, _), size in zip((atracks, xtracks), self._grid_bounds, self._n_tiles, self._borders,
+                                             self.shape):
+            with np.errstate(invalid='ignore'):
+                i = np.floor((np.asarray(c, dtype=float) - g[0]) / (g[1] - g[0]) * n).astype(np.intp)
+            if lower:
+                i += 1
+            idx.append(np.clip(i, 0, size - 1))
+        return idx[0] * self.shape[1] + idx[1]
+
+    @staticmethod
+    def _apply(coefs, tiles, c0, c1):
+        """affine transform of (c0, c1) points, with `coefs` of `tiles`"""
+        res = np.empty((2,) + np.shape(tiles))
+        for v in range(2):
+            # take from contiguous 1D coefs is much faster than fancy indexing on last axis
+            res_v = res[v, ...]
+            np.multiply(np.ascontiguousarray(coefs[v, 0]).take(tiles), c0, out=res_v)
+            res_v += np.ascontiguousarray(coefs[v, 1]).take(tiles) * c1
+            res_v += np.ascontiguousarray(coefs[v, 2]).take(tiles)
+        return res
+
+    def __call__(self, atracks, xtracks, grid=True):
+        """
+        Evaluate on the grid defined by 1D `atracks` and `xtracks` (or on points if `grid` is False).
+
+        Returns
+        -------
+        numpy.ndarray
+            shape (2, atracks.size, xtracks.size) (or (2, *atracks.shape) for points)
+        """
+        if not grid:
+            return self.ev(atracks, xtracks)
+        atracks = np.atleast_1d(np.asarray(atracks, dtype=float))
+        xtracks = np.atleast_1d(np.asarray(xtracks, dtype=float))
+        tiles_a = self._tiles(atracks, self.bounds[1][0]) // self.shape[1]
+        tiles_x = self._tiles(self.bounds[0][0], xtracks)
+        res = np.empty((2, atracks.size, xtracks.size))
+        # one outer sum per (atrack run, xtrack run) of tiles
+        runs = []
+        for tiles in (tiles_a, tiles_x):
+            starts = np.r_[0, np.flatnonzero(np.diff(tiles)) + 1]
+            runs.append(list(zip(starts, np.r_[starts[1:], tiles.size])))
+        for a_start, a_stop in runs[0]:
+            for x_start, x_stop in runs[1]:
+                c = self.coefs[:, :, tiles_a[a_start] * self.shape[1] + tiles_x[x_start]]
+                res[:, a_start:a_stop, x_start:x_stop] = \
+                    (c[:, 0, np.newaxis] * atracks[a_start:a_stop])[:, :, np.newaxis] \
+                    + (c[:, 1, np.newaxis] * xtracks[x_start:x_stop] + c[:, 2, np.newaxis])[:, np.newaxis, :]
+        return res
+
+    def ev(self, atracks, xtracks):
+        """
+        Evaluate at points (`atracks[i]`, `xtracks[i]`).
+
+        Returns
+        -------
+        numpy.ndarray
+            shape (2, *atracks.shape)
+        """
+        atracks, xtracks = np.broadcast_arrays(np.asarray(atracks, dtype=float), np.asarray(xtracks, dtype=float))
+        return self._apply(self.coefs, self._tiles(atracks, xtracks), atracks, xtracks)
+
+    def inverse(self, v0, v1, atracks, xtracks, max_iter=5):
+        """
+        Inverse transform: (atracks, xtracks) from (v0, v1) values.
+
+        Parameters
+        ----------
+        v0: numpy.ndarray
+        v1: numpy.ndarray
+        atracks: numpy.ndarray
+            first guess, used to find the tile.
+        xtracks: numpy.ndarray
+            first guess, used to find the tile.
+        max_iter: int, optional
+            maximum number of tile changes.
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+            (atracks, xtracks)
+        """
+        v0, v1 = np.broadcast_arrays(np.asarray(v0, dtype=float), np.asarray(v1, dtype=float))
+        tiles = self._tiles(np.broadcast_to(atracks, v0.shape), np.broadcast_to(xtracks, v0.shape))
+        for _ in range(max_iter):
+            atracks, xtracks = self._apply(self.inv_coefs, tiles, v0, v1)
+            new_tiles = self._tiles(atracks, xtracks)
+            if np.array_equal(new_tiles, tiles):
+                break
+            tiles = new_tiles
+        return atracks, xtracks
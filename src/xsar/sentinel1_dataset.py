@@ -20,6 +20,9 @@ from affine import Affine
 from functools import partial
 from .sentinel1_meta import Sentinel1Meta
 from .ipython_backends import repr_mimebundle
+from .xarray_backends import LonLatBackendArray
+from .interpolate import RectBilinear
+from .calibration import calibrate_dataarray
 
 logger = logging.getLogger('xsar.sentinel1_dataset')
 logger.addHandler(logging.NullHandler())
@@ -28,6 +31,30 @@ logger.addHandler(logging.NullHandler())
 warnings.filterwarnings("ignore", category=rasterio.errors.NotGeoreferencedWarning)
 
 
+def _resolve_dependencies(variables, dependencies):
+    """
+    `variables` and all the variables they depend on.
+
+    Parameters
+    ----------
+    variables: iterable of str
+    dependencies: dict
+        variables needed to compute the key variable (ie `{'sigma0': ['sigma0_raw', 'nesz']}`).
+
+    Returns
+    -------
+    set of str
+    """
+    resolved = set()
+    todo = list(variables)
+    while todo:
+        var = todo.pop()
+        if var not in resolved:
+            resolved.add(var)
+            todo.extend(dependencies.get(var, []))
+    return resolved
+
+
 class Sentinel1Dataset:
     """
     Handle a SAFE subdataset.
@@ -50,6 +77,21 @@ class Sentinel1Dataset:
         dict with keys ['pol','atrack','xtrack'] (dask chunks).
     dtypes: None or dict, optional
         Specify the data type for each variable.
+    parser_concurrency: int or None, optional
+        number of threads used to parse xml files before building the dataset (see `xsar.Sentinel1Meta.prefetch_xml`).
+        If None (default), xml files are parsed on demand, so only files needed by `variables` are parsed.
+        Prefetching is faster when most variables are needed, and on multi-core hosts.
+    lazy_lonlat: bool, optional
+        if `True`, `longitude` and `latitude` are not dask arrays, but lazily indexed arrays computed from the gcps
+        grid only for the selected region (see `xsar.xarray_backends.LonLatBackendArray`).
+        Useful for big products, when lon/lat are only needed on a subset, or for plotting. False by default.
+    variables: list of str or None, optional
+        variables to return (ie `['sigma0', 'longitude', 'latitude']`). Only those variables and their dependencies
+        are built, so open time and dask graph are smaller than with `dataset.drop_vars`.
+        `time` is always returned. If None, all variables are returned (default).
+    interpolate_heading: bool, optional
+        if `True`, `ground_heading` is interpolated from the gcps grid (see `xsar.Sentinel1Meta.coords2heading`):
+        much faster, but less accurate near the pole. False by default (heading computed at each pixel).
 
     See Also
     --------
@@ -59,7 +101,7 @@ class Sentinel1Dataset:
     def __init__(self, dataset_id, resolution=None,
                  resampling=rasterio.enums.Resampling.average,
                  luts=False, chunks={'atrack': 5000, 'xtrack': 5000},
-                 dtypes=None):
+                 dtypes=None, parser_concurrency=None, lazy_lonlat=False, variables=None, interpolate_heading=False):
 
         # default dtypes (TODO: find defaults, so science precision is not affected)
         self._dtypes = {
@@ -94,7 +136,8 @@ class Sentinel1Dataset:
             xml_parser = XmlParser(
                 xpath_mappings=sentinel1_xml_mappings.xpath_mappings,
                 compounds_vars=sentinel1_xml_mappings.compounds_vars,
-                namespaces=sentinel1_xml_mappings.namespaces)
+                namespaces=sentinel1_xml_mappings.namespaces,
+                streamers=sentinel1_xml_mappings.streamers)
             self.s1meta = Sentinel1Meta(dataset_id, xml_parser=xml_parser)
         else:
             self.s1meta = dataset_id
@@ -104,6 +147,9 @@ class Sentinel1Dataset:
                 """Can't open an multi-dataset. Use `xsar.Sentinel1Meta('%s').subdatasets` to show availables ones""" % self.s1meta.path
             )
 
+        if parser_concurrency is not None:
+            self.s1meta.prefetch_xml(concurrency=parser_concurrency)
+
         self._dataset = self._load_digital_number(resolution=resolution, resampling=resampling, chunks=chunks)
 
         # set time(atrack) from s1meta.time_range
@@ -116,10 +162,11 @@ class Sentinel1Dataset:
         # dataset no-pol template for function evaluation on coordinates (*no* values used)
         # what's matter here is the shape of the image, not the values.
         with warnings.catch_warnings():
-            warnings.simplefilter("ignore", np.ComplexWarning)
+            # np.ComplexWarning moved to np.exceptions in numpy 1.25, and removed from np in numpy 2
+            warnings.simplefilter("ignore", getattr(np, 'exceptions', np).ComplexWarning)
             self._da_tmpl = xr.DataArray(
                 dask.array.empty_like(
-                    self._dataset.digital_number.isel(pol=0).drop('pol'),
+                    self._dataset.digital_number.isel(pol=0).drop_vars('pol'),
                     dtype=np.int8, name="empty_var_tmpl-%s" % dask.base.tokenize(self.s1meta.name)),
                 dims=('atrack', 'xtrack'),
                 coords={'atrack': self._dataset.digital_number.atrack,
@@ -161,35 +208,76 @@ class Sentinel1Dataset:
         # variables not returned to the user (unless luts=True)
         self._hidden_vars = ['sigma0_lut', 'gamma0_lut', 'noise_lut', 'noise_lut_range', 'noise_lut_azi']
 
-        self._luts = self._lazy_load_luts(self._map_lut_files.keys())
+        # dict mapping for variables dependencies (variables needed to compute the key variable)
+        self._map_var_deps = {
+            'sigma0_raw': ['sigma0_lut'],
+            'gamma0_raw': ['gamma0_lut'],
+            'nesz': ['sigma0_lut', 'noise_lut_range', 'noise_lut_azi'],
+            'negz': ['gamma0_lut', 'noise_lut_range', 'noise_lut_azi'],
+            'sigma0': ['sigma0_raw', 'nesz'],
+            'gamma0': ['gamma0_raw', 'negz'],
+            'noise_lut': ['noise_lut_range', 'noise_lut_azi'],
+        }
+
+        # variables to build
+        if isinstance(variables, str):
+            variables = [variables]
+        needed = self._resolve_variables(variables)
+
+        self._luts = self._lazy_load_luts([lut_name for lut_name in self._map_lut_files.keys() if lut_name in needed])
 
         # noise_lut is noise_lut_range * noise_lut_azi
-        if 'noise_lut_range' in self._luts.keys() and 'noise_lut_azi' in self._luts.keys():
+        if 'noise_lut' in needed and 'noise_lut_range' in self._luts.keys() and 'noise_lut_azi' in self._luts.keys():
             self._luts = self._luts.assign(noise_lut=self._luts.noise_lut_range * self._luts.noise_lut_azi)
 
-        lon_lat = self._load_lon_lat()
+        ds_merge_list = [self._dataset]
+
+        if needed & {'longitude', 'latitude'}:
+            ds_merge_list.append(self._load_lon_lat(lazy=lazy_lonlat))
 
-        self._raster_masks = self._load_raster_masks()
+        self._raster_masks = self._load_raster_masks(
+            masks=[mask for mask in self.s1meta._mask_features.keys() if '%s_mask' % mask in needed])
+        ds_merge_list.append(self._raster_masks)
 
-        ds_merge_list = [self._dataset, lon_lat, self._raster_masks, self._load_ground_heading(),
-                         self._luts.drop_vars(self._hidden_vars, errors='ignore')]
+        if 'ground_heading' in needed:
+            ds_merge_list.append(self._load_ground_heading(interpolate=interpolate_heading))
+
+        # hidden luts are returned if luts=True, or if explicitly asked in `variables`
+        hidden_vars = [var for var in self._hidden_vars
+                       if var in self._luts and not luts and (variables is None or var not in variables)]
+        ds_merge_list.append(self._luts.drop_vars(hidden_vars))
 
-        if luts:
-            ds_merge_list.append(self._luts[self._hidden_vars])
         attrs = self._dataset.attrs
         self._dataset = xr.merge(ds_merge_list)
         self._dataset.attrs = attrs
 
+        calibrated_vars = []
         for var_name, lut_name in self._map_var_lut.items():
+            if var_name not in needed and 'ne%sz' % var_name[0] not in needed:
+                continue
             if lut_name in self._luts:
-                # merge var_name into dataset (not denoised)
-                self._dataset = self._dataset.merge(self._apply_calibration_lut(var_name))
-                # merge noise equivalent for var_name (named 'ne%sz' % var_name[0)
-                self._dataset = self._dataset.merge(self._get_noise(var_name))
+                calibrated_vars.append(var_name)
             else:
                 logger.debug("Skipping variable '%s' ('%s' lut is missing)" % (var_name, lut_name))
+        if calibrated_vars:
+            # merge calibrated vars into dataset, with noise equivalent (named 'ne%sz' % var_name[0])
+            # and denoised vars if needed
+            noise = any('ne%sz' % var_name[0] in needed for var_name in calibrated_vars)
+            self._dataset = self._dataset.merge(self._apply_calibration_luts(calibrated_vars, noise=noise))
+
+        self._dataset = self._add_denoised(
+            self._dataset, vars=[var for var in ['sigma0', 'beta0', 'gamma0'] if var in needed])
+
+        # digital_number might be dropped, but its dtype is needed by `reverse_calibration_lut`
+        self._digital_number_dtype = self._dataset.digital_number.dtype
+        if variables is not None:
+            keep = set(variables) | {'time'}
+            if luts:
+                keep.update(self._hidden_vars)
+            # pol coordinate is kept, even if no variable has a pol dimension
+            self._dataset = self._dataset[[var for var in self._dataset.data_vars if var in keep]].assign_coords(
+                pol=self._dataset.pol)
 
-        self._dataset = self._add_denoised(self._dataset)
         self._dataset.attrs = self._recompute_attrs()
 
         self.coords2ll = self.s1meta.coords2ll
@@ -279,7 +367,7 @@ class Sentinel1Dataset:
 
         """
         if isinstance(args[0], shapely.geometry.base.BaseGeometry):
-            return self.s1meta.ll2coords_shapely(args[0].intersection(self.geometry))
+            return self.s1meta.ll2coords(args[0].intersection(self.geometry))
 
         atrack, xtrack = self.s1meta.ll2coords(*args)
 
@@ -335,6 +423,36 @@ class Sentinel1Dataset:
     def _regularly_spaced(self):
         return max([np.unique(np.diff(self._dataset[dim].values)).size for dim in ['atrack', 'xtrack']]) == 1
 
+    def _resolve_variables(self, variables):
+        """
+        Variables to build to get `variables`, with their dependencies.
+
+        Parameters
+        ----------
+        variables: list of str or None
+            if None, all variables.
+
+        Returns
+        -------
+        set of str
+
+        Raises
+        ------
+        ValueError
+            if a variable is unknown.
+        """
+        available = ['digital_number', 'time', 'longitude', 'latitude', 'ground_heading']
+        available += ['%s_mask' % mask for mask in self.s1meta._mask_features.keys()]
+        available += list(self._map_lut_files.keys()) + self._hidden_vars
+        for var_name in self._map_var_lut.keys():
+            available += [var_name, 'ne%sz' % var_name[0], var_name.replace('_raw', '')]
+        if variables is None:
+            return set(available)
+        unknown = set(variables) - set(available)
+        if unknown:
+            raise ValueError("Unknown variables %s. Allowed: %s" % (sorted(unknown), available))
+        return _resolve_dependencies(variables, self._map_var_deps)
+
     def _recompute_attrs(self):
         if not self._regularly_spaced:
             warnings.warn(
@@ -361,7 +479,10 @@ class Sentinel1Dataset:
 
         """
 
+        luts = xr.Dataset()
         luts_list = []
+        # lut functions, by (lut_name, pol) (pol is None for luts without pol)
+        self._luts_f = {}
         # dask array template from digital_number (no pol)
         lut_tmpl = self._dataset.digital_number.isel(pol=0)
 
@@ -377,7 +498,7 @@ class Sentinel1Dataset:
                 # luts are identical in all pols: take the fist one
                 xml_files = xml_files.iloc[[0]]
 
-            for pol_code, xml_file in xml_files.iteritems():
+            for pol_code, xml_file in xml_files.items():
                 pol = self.s1meta.files['polarization'].cat.categories[pol_code]
                 if self._vars_with_pol[lut_name]:
                     name = "%s_%s" % (lut_name, pol)
@@ -387,6 +508,7 @@ class Sentinel1Dataset:
                     xml_file, lut_name, dask_key_name="xml_%s-%s" % (name, dask.base.tokenize(xml_file)))
                 # 1s faster, but lut_f will be loaded, even if not used
                 # lut_f_delayed = lut_f_delayed.persist()
+                self._luts_f[(lut_name, pol if self._vars_with_pol[lut_name] else None)] = lut_f_delayed
 
                 lut = map_blocks_coords(self._da_tmpl.astype(self._dtypes[lut_name]), lut_f_delayed,
                                         name='blocks_%s' % name)
@@ -399,9 +521,10 @@ class Sentinel1Dataset:
                 luts_list.append(lut)
             luts = xr.combine_by_coords(luts_list)
 
-            # convert pol_code to string
-            pols = self.s1meta.files['polarization'].cat.categories[luts.pol_code.values.tolist()]
-            luts = luts.rename({'pol_code': 'pol'}).assign_coords({'pol': pols})
+            if 'pol_code' in luts.coords:
+                # convert pol_code to string (no pol_code if only luts without pol, like incidence)
+                pols = self.s1meta.files['polarization'].cat.categories[luts.pol_code.values.tolist()]
+                luts = luts.rename({'pol_code': 'pol'}).assign_coords({'pol': pols})
         return luts
 
     @timing
@@ -556,10 +679,15 @@ class Sentinel1Dataset:
         return ds
 
     @timing
-    def _load_lon_lat(self):
+    def _load_lon_lat(self, lazy=False):
         """
         Load longitude and latitude using `self.s1meta.gcps`.
 
+        Parameters
+        ----------
+        lazy: bool, optional
+            if `True`, variables are `xsar.xarray_backends.LonLatBackendArray`, instead of dask arrays.
+
         Returns
         -------
         tuple xarray.Dataset
@@ -567,9 +695,24 @@ class Sentinel1Dataset:
                 dataset with `longitude` and `latitude` variables, with same shape as mono-pol digital_number.
         """
 
+        # closures must not reference self, or the whole Sentinel1Dataset will be pickled with each task
+        s1meta = self.s1meta
+
+        if lazy:
+            # no graph tasks: values are computed on indexing
+            coords = {'atrack': self._da_tmpl.atrack, 'xtrack': self._da_tmpl.xtrack}
+            try:
+                return xr.Dataset({
+                    ll: LonLatBackendArray(s1meta, coords['atrack'].values, coords['xtrack'].values, ll,
+                                           dtype=self._dtypes[ll]).to_variable()
+                    for ll in ['longitude', 'latitude']
+                }, coords=coords)
+            except NotImplementedError as e:
+                warnings.warn('%s. Using dask arrays for longitude and latitude' % str(e))
+
         def coords2ll(*args):
             # *args[1:] to skip dummy 'll' dimension
-            return np.stack(self.s1meta.coords2ll(*args[1:], to_grid=True))
+            return np.stack(s1meta.coords2ll(*args[1:], to_grid=True))
 
         ll_coords = ['longitude', 'latitude']
         # ll_tmpl is like self._da_tmpl stacked 2 times (for both longitude and latitude)
@@ -581,31 +724,52 @@ class Sentinel1Dataset:
         return ll_ds
 
     @timing
-    def _load_ground_heading(self):
-        coords2heading = bind(self.s1meta.coords2heading, ..., ..., to_grid=True, approx=False)
+    def _load_ground_heading(self, interpolate=False):
+        if interpolate:
+            coords2heading = bind(self.s1meta.coords2heading, ..., ..., to_grid=True, interpolate=True)
+        else:
+            coords2heading = bind(self.s1meta.coords2heading, ..., ..., to_grid=True, approx=False)
         gh = map_blocks_coords(self._da_tmpl.astype(self._dtypes['ground_heading']), coords2heading,
                                name='ground_heading')
         return gh.to_dataset(name='ground_heading')
 
     @timing
-    def _load_raster_masks(self):
+    def _load_raster_masks(self, masks=None):
+        """
+        Load raster masks, from `self.s1meta.get_mask`
+
+        Parameters
+        ----------
+        masks: list of str or None, optional
+            masks names (ie `['land']`). If None, all masks from `self.s1meta`.
+
+        Returns
+        -------
+        xarray.Dataset
+            dataset with variables named `'%s_mask' % mask`.
+        """
+        # closures must not reference self, or the whole Sentinel1Dataset will be pickled with each task
+        s1meta = self.s1meta
+        if masks is None:
+            masks = list(s1meta._mask_features.keys())
+
         def _rasterize_mask_by_chunks(atrack, xtrack, mask='land'):
             chunk_coords = bbox_coords(atrack, xtrack, pad=None)
             # chunk footprint polygon, in dataset coordinates (with buffer, to enlarge a little the footprint)
             chunk_footprint_coords = Polygon(chunk_coords).buffer(10)
             # chunk footprint polygon, in lon/lat
-            chunk_footprint_ll = self.s1meta.coords2ll(chunk_footprint_coords)
+            chunk_footprint_ll = s1meta.coords2ll(chunk_footprint_coords)
 
             # get vector mask over chunk
             # FIXME: speedup if get_mask is first called outside worker
-            vector_mask_ll = self.s1meta.get_mask(mask).intersection(chunk_footprint_ll)
+            vector_mask_ll = s1meta.get_mask(mask).intersection(chunk_footprint_ll)
 
             if vector_mask_ll.is_empty:
                 # no intersection with mask, return zeros
                 return np.zeros((atrack.size, xtrack.size))
 
             # vector mask, in atrack/xtrack coordinates
-            vector_mask_coords = self.s1meta.ll2coords(vector_mask_ll)
+            vector_mask_coords = s1meta.ll2coords(vector_mask_ll)
 
             raster_mask = rasterio.features.rasterize(
                 [vector_mask_coords],
@@ -620,7 +784,7 @@ class Sentinel1Dataset:
                 self._da_tmpl,
                 _rasterize_mask_by_chunks,
                 func_kwargs={'mask': mask}
-            ).to_dataset(name='%s_mask' % mask) for mask in self.s1meta._mask_features.keys()
+            ).to_dataset(name='%s_mask' % mask) for mask in masks
         ]
         return xr.merge(da_list)
 
@@ -647,29 +811,88 @@ class Sentinel1Dataset:
             raise ValueError("can't find lut from name '%s' for variable '%s' " % (lut_name, var_name))
         return lut
 
-    def _apply_calibration_lut(self, var_name):
+    def _get_calibration_lut_f(self, var_names):
+        """
+        Get calibration luts functions for `var_names`, stacked as one `xsar.interpolate.RectBilinear`
+        (variables ordered by var_name, then by pol), so interpolation weights are shared.
+
+        Parameters
+        ----------
+        var_names: list of str
+
+        Returns
+        -------
+        dask.delayed.Delayed
         """
-        Apply calibration lut to `digital_number` to compute `var_name`.
+        pols = self._dataset.digital_number.pol.values.tolist()
+        luts_f = []
+        for var_name in var_names:
+            lut_name = self._get_lut(var_name).name  # raise ValueError if lut is missing
+            luts_f += [self._luts_f[(lut_name, pol)] for pol in pols]
+        return dask.delayed(RectBilinear.stack)(
+            luts_f, dask_key_name='calibration_lut_f-%s' % dask.base.tokenize(luts_f))
+
+    def _apply_calibration_luts(self, var_names, noise=False):
+        """
+        Apply calibration luts to `digital_number` to compute `var_names`, in one pass on `digital_number` chunks.
         see https://sentinel.esa.int/web/sentinel/radiometric-calibration-of-level-1-products
 
+        Calibration and noise luts are interpolated by blocks of rows, so full resolution luts
+        (ie `sigma0_lut`, `noise_lut`) are not computed (see `xsar.calibration.calibrate`).
+
+        Parameters
+        ----------
+        var_names: list of str
+            Variables names to compute by applying lut. Must exist in `self._map_var_lut`` to be able to get the
+            corresponding lut.
+        noise: bool, optional
+            if True, also compute noise equivalent variables (named `'ne%sz' % var_name[0]`), and denoised variables
+            (named like `var_name` without '_raw' suffix, see `_add_denoised`).
+
+        Returns
+        -------
+        xarray.Dataset
+            with variables named by `var_names`, and noise and denoised variables.
+        """
+        noise_f = None
+        denoise = False
+        if noise:
+            pols = self._dataset.digital_number.pol.values.tolist()
+            noise_f = dask.delayed([
+                (self._luts_f[('noise_lut_range', pol)], self._luts_f[('noise_lut_azi', pol)]) for pol in pols])
+            # denoised only if no polarization is already denoised.
+            # already denoised products only have aliases, and semi denoised products are handled by `_add_denoised`
+            denoise = not any(self.s1meta.denoised.values())
+        names = list(var_names)
+        if noise:
+            names += ['ne%sz' % var_name[0] for var_name in var_names]
+            if denoise:
+                names += [var_name.replace('_raw', '') for var_name in var_names]
+        dtypes = [self._dtypes.get(name) for name in names]
+        # computed as float64, and converted afterward if dtypes differs
+        dtype = dtypes[0] if len(set(dtypes)) == 1 else None
+        ds = calibrate_dataarray(self._dataset.digital_number, self._get_calibration_lut_f(var_names), var_names,
+                                 noise_f=noise_f, denoise=denoise, dtype=dtype,
+                                 noise_dtype=self._dtypes['noise_lut'])
+        for name, astype in zip(names, dtypes):
+            if astype is not None and ds[name].dtype != astype:
+                ds[name] = ds[name].astype(astype)
+        return ds
+
+    def _apply_calibration_lut(self, var_name):
+        """
+        Apply calibration lut to `digital_number` to compute `var_name` (see `_apply_calibration_luts`).
+
         Parameters
         ----------
         var_name: str
-            Variable name to compute by applying lut. Must exist in `self._map_var_lut`` to be able to get the corresponding lut.
 
         Returns
         -------
         xarray.Dataset
             with one variable named by `var_name`
         """
-        lut = self._get_lut(var_name)
-        res = (np.abs(self._dataset.digital_number) ** 2. / (lut ** 2))
-        # dn default value is 0: convert to Nan
-        res = res.where(res > 0)
-        astype = self._dtypes.get(var_name)
-        if astype is not None:
-            res = res.astype(astype)
-        return res.to_dataset(name=var_name)
+        return self._apply_calibration_luts([var_name])
 
     def reverse_calibration_lut(self, ds_var):
         """
@@ -698,7 +921,7 @@ class Sentinel1Dataset:
             raise ValueError(
                 "Unable to find lut for var '%s'. Allowed : %s" % (var_name, str(self._map_var_lut.keys())))
         da_var = ds_var[var_name]
-        lut = self._luts[self._map_var_lut[var_name]]
+        lut = self._get_lut(var_name)
 
         # resize lut with same a/xtrack as da_var
         lut = lut.sel(atrack=da_var.atrack, xtrack=da_var.xtrack, method='nearest')
@@ -711,10 +934,10 @@ class Sentinel1Dataset:
         # revert lut to get dn
         dn = np.sqrt(da_var * lut ** 2)
 
-        if self._dataset.digital_number.dtype == np.complex and dn.dtype != np.complex:
+        if self._digital_number_dtype == np.complex128 and dn.dtype != np.complex128:
             warnings.warn(
                 "Unable to retrieve 'digital_number' as dtype '%s'. Fallback to '%s'"
-                % (str(self._dataset.digital_number.dtype), str(dn.dtype))
+                % (str(self._digital_number_dtype), str(dn.dtype))
             )
 
         name = 'digital_number'
@@ -722,30 +945,6 @@ class Sentinel1Dataset:
 
         return ds
 
-    def _get_noise(self, var_name):
-        """
-        Get noise equivalent for  `var_name`.
-        see https://sentinel.esa.int/web/sentinel/radiometric-calibration-of-level-1-products
-
-        Parameters
-        ----------
-        var_name: str
-            Variable name to compute. Must exist in `self._map_var_lut` to be able to get the corresponding lut.
-
-        Returns
-        -------
-        xarray.Dataset
-            with one variable named by `'ne%sz' % var_name[0]` (ie 'nesz' for 'sigma0', 'nebz' for 'beta0', etc...)
-        """
-        noise_lut = self._luts['noise_lut']
-        lut = self._get_lut(var_name)
-        dataarr = noise_lut / lut ** 2
-        name = 'ne%sz' % var_name[0]
-        astype = self._dtypes.get(name)
-        if astype is not None:
-            dataarr = dataarr.astype(astype)
-        return dataarr.to_dataset(name=name)
-
     def _add_denoised(self, ds, clip=True, vars=None):
         """add denoised vars to dataset
 
@@ -768,7 +967,8 @@ class Sentinel1Dataset:
         for varname in vars:
             varname_raw = varname + '_raw'
             noise = 'ne%sz' % varname[0]
-            if varname_raw not in ds:
+            if varname_raw not in ds or varname in ds:
+                # not calibrated, or already denoised by `_apply_calibration_luts`
                 continue
             if all(self.s1meta.denoised.values()):
                 # already denoised, just add an alias
@@ -7,21 +7,26 @@ import xarray as xr
 import pandas as pd
 import geopandas as gpd
 import rasterio
-from scipy.interpolate import RectBivariateSpline
 from shapely.geometry import Polygon
 from shapely.ops import unary_union
 import shapely
-from .utils import to_lon180, haversine, timing
+from .utils import to_lon180, haversine, timing, bind, transform_geometry
+from .interpolate import RectBilinear, PiecewiseAffine
 from . import sentinel1_xml_mappings
 from .xml_parser import XmlParser
 from affine import Affine
 import os
+from concurrent.futures import ThreadPoolExecutor
 from .ipython_backends import repr_mimebundle
 
 logger = logging.getLogger('xsar.sentinel1_meta')
 logger.addHandler(logging.NullHandler())
 
 
+def _land_feature():
+    return cartopy.feature.NaturalEarthFeature('physical', 'land', '10m')
+
+
 class Sentinel1Meta:
     """
     Handle dataset metadata.
@@ -32,16 +37,20 @@ class Sentinel1Meta:
     ----------
     name: str
         path or gdal identifier like `'SENTINEL1_DS:%s:WV_001' % path`
+    xml_parser: xsar.xml_parser.XmlParser, optional
+        parser used to read xml files. A parser with `cache_dir` set can be used
+        to reuse decoded xml variables between processes.
 
     """
 
     @timing
-    def __init__(self, name, xml_parser=None, driver='GTiff'):
+    def __init__(self, name, xml_parser=None, driver='GTiff', _safe_files=None):
         if xml_parser is None:
             xml_parser = XmlParser(
                 xpath_mappings=sentinel1_xml_mappings.xpath_mappings,
                 compounds_vars=sentinel1_xml_mappings.compounds_vars,
-                namespaces=sentinel1_xml_mappings.namespaces)
+                namespaces=sentinel1_xml_mappings.namespaces,
+                streamers=sentinel1_xml_mappings.streamers)
         self.xml_parser = xml_parser
         self.driver = driver
         """GDAL driver used. ('auto' for SENTINEL1, or 'GTiff')"""
@@ -66,7 +75,8 @@ class Sentinel1Meta:
         """Product type, like 'GRDH', 'SLC', etc .."""
         self.manifest = os.path.join(self.path, 'manifest.safe')
         self.manifest_attrs = self.xml_parser.get_compound_var(self.manifest, 'safe_attributes')
-        self._safe_files = None
+        # `_safe_files` may be given by a multidataset for its subdatasets (same SAFE), to avoid recomputing it
+        self._safe_files = _safe_files
         self.multidataset = False
         """True if multi dataset"""
         self.subdatasets = []
@@ -85,11 +95,23 @@ class Sentinel1Meta:
         self.platform = self.manifest_attrs['mission'] + self.manifest_attrs['satellite']
         """Mission platform"""
         self._gcps = None
+        # geolocation interpolator and cross_antemeridian, computed once from gcps
+        self._lonlat_interpolator = None
+        self._lonlat_affine = None
+        self._ll2coords_grid = None
+        self._piecewise_affine = {}
+        self._heading_interp = None
+        self.ll2coords_grid_shape = (200, 200)
+        """(longitudes, latitudes) size of the lookup grid used by `ll2coords(..., method='grid')`"""
+        self._cross_antemeridian = None
         self._time_range = None
         self._mask_features = {}
         self._mask_intersecting_geometries = {}
         self._mask_geometry = {}
-        self.set_mask_feature('land', cartopy.feature.NaturalEarthFeature('physical', 'land', '10m'))
+        # land feature is instantiated on first use (see `_get_mask_feature`), so metadata only access is lightweight
+        self._mask_features['land'] = _land_feature
+        self._mask_intersecting_geometries['land'] = None
+        self._mask_geometry['land'] = None
         self._orbit_pass = None
         self._platform_heading = None
 
@@ -108,64 +130,66 @@ class Sentinel1Meta:
         """
         return name == self.name or name in self.subdatasets
 
-    def _get_gcps(self):
-        rio_gcps, crs = self.rio.get_gcps()
-
-        gcps_xtracks, gcps_atracks = [
-            np.array(arr) for arr in zip(
-                *[(g.col, g.row) for g in rio_gcps]
-            )
-        ]
+    @timing
+    def prefetch_xml(self, concurrency=4):
+        """
+        Parse and decode all xml files (annotation, calibration and noise) in a thread pool.
+        Subsequent xml accesses (luts, time_range, denoised, etc...) will use `self.xml_parser` cache.
 
-        gcps_xtracks, gcps_atracks = [np.array(arr) for arr in [gcps_xtracks, gcps_atracks]]
+        Parameters
+        ----------
+        concurrency: int, optional
+            number of threads. xml files are parsed sequentially if <= 1. (default to 4)
+        """
+        if self.multidataset:
+            files = self.safe_files
+        else:
+            files = self.files
+        jobs = [(xml_file, file_type) for file_type in ['annotation', 'calibration', 'noise'] for xml_file in
+                files[file_type]]
 
-        (xtracks, xtracks_gcps_idx), (atracks, atracks_gcps_idx) = [
-            np.unique(arr, return_inverse=True) for arr in [gcps_xtracks, gcps_atracks]
-        ]
+        def prefetch(job):
+            self.xml_parser.prefetch(*job)
 
-        # assert regularly gridded
-        assert xtracks.size * atracks.size == len(rio_gcps)
+        if concurrency is None or concurrency <= 1:
+            for job in jobs:
+                prefetch(job)
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                # list() to raise exceptions from threads
+                list(executor.map(prefetch, jobs))
 
-        da_list = []
+    def _get_gcps(self):
+        rio = self.rio
+        rio_gcps, crs = rio.get_gcps()
 
-        # grid gcps index as an xarray(atrack,xtrack)
-        np_gcps_idx = (xtracks_gcps_idx + atracks_gcps_idx * len(xtracks)).reshape(atracks.size, xtracks.size)
-        gcps_idx = xr.DataArray(
-            np_gcps_idx,
-            coords={'atrack': atracks, 'xtrack': xtracks},
-            dims=['atrack', 'xtrack'],
-            name='index'
-        )
-        da_list.append(gcps_idx)
-
-        # grid gcps with similar xarray
-        np_gcps = np.array([rio_gcps[i] for i in np_gcps_idx.flat]).reshape(np_gcps_idx.shape)
-        gcps = xr.DataArray(
-            np_gcps,
-            coords={'atrack': atracks, 'xtrack': xtracks},
-            dims=['atrack', 'xtrack'],
-            name='gcp'
-        ).astype(object)
-        da_list.append(gcps)
-
-        # same for 'longitude', 'latitude', 'altitude'
-        gcps_mappings = {
-            'longitude': 'x',
-            'latitude': 'y',
-            'altitude': 'z'
-        }
+        # columnar gcps, from a single pass over rasterio objects
+        gcps_atracks, gcps_xtracks, lon, lat, alt = np.array(
+            [(g.row, g.col, g.x, g.y, g.z) for g in rio_gcps], dtype=float).T
 
-        for var_name, gcp_attr in gcps_mappings.items():
-            np_arr = np.array([getattr(rio_gcps[i], gcp_attr) for i in np_gcps_idx.flat]).reshape(np_gcps_idx.shape)
-            da_arr = xr.DataArray(
-                np_arr,
-                coords={'atrack': atracks, 'xtrack': xtracks},
-                dims=['atrack', 'xtrack'],
-                name=var_name
-            )
-            da_list.append(da_arr)
+        # gcps order on the (atrack, xtrack) grid
+        grid_idx = np.lexsort((gcps_xtracks, gcps_atracks))
+        atracks = np.unique(gcps_atracks)
+        xtracks = np.unique(gcps_xtracks)
+        shape = (atracks.size, xtracks.size)
 
-        gcps_ds = xr.merge(da_list)
+        # assert regularly gridded
+        assert xtracks.size * atracks.size == len(rio_gcps)
+        grid_idx = grid_idx.reshape(shape)
+        assert np.all(gcps_atracks[grid_idx] == atracks[:, np.newaxis])
+        assert np.all(gcps_xtracks[grid_idx] == xtracks[np.newaxis, :])
+
+        dims = ['atrack', 'xtrack']
+        gcps_ds = xr.Dataset(
+            {
+                # index of gcp in `rio.get_gcps()`
+                'index': (dims, grid_idx),
+                'longitude': (dims, lon[grid_idx]),
+                'latitude': (dims, lat[grid_idx]),
+                'altitude': (dims, alt[grid_idx]),
+            },
+            coords={'atrack': atracks, 'xtrack': xtracks}
+        )
 
         # add attributes
 
@@ -177,22 +201,19 @@ class Sentinel1Meta:
         # affine parameters are swaped, to be compatible with xsar (atrack, xtrack) coordinates ordering
         attrs['approx_transform'] = approx_transform * Affine.permutation()
 
-        footprint_dict = {}
-        for ll in ['longitude', 'latitude']:
-            footprint_dict[ll] = [
-                gcps_ds[ll].isel(atrack=a, xtrack=x).values for a, x in [(0, 0), (0, -1), (-1, -1), (-1, 0)]
-            ]
         # compute attributes (footprint, coverage, pixel_size)
-        corners = list(zip(footprint_dict['longitude'], footprint_dict['latitude']))
+        corners_idx = grid_idx[[0, 0, -1, -1], [0, -1, -1, 0]]
+        corners = list(zip(lon[corners_idx], lat[corners_idx]))
         attrs['footprint'] = Polygon(corners)
         # compute acquisition size/resolution in meters
         # first vector is on xtrack
         acq_xtrack_meters, _ = haversine(*corners[0], *corners[1])
         # second vector is on atrack
         acq_atrack_meters, _ = haversine(*corners[1], *corners[2])
-        rio = self.rio
         pix_xtrack_meters = acq_xtrack_meters / rio.width
         pix_atrack_meters = acq_atrack_meters / rio.height
+        # gcps grid may not cover the last lines or pixels
+        attrs['image_shape'] = (rio.height, rio.width)
         attrs['coverage'] = "%dkm * %dkm (atrack * xtrack )" % (
             acq_atrack_meters / 1000, acq_xtrack_meters / 1000)
         attrs['pixel_xtrack_m'] = int(np.round(pix_xtrack_meters * 10)) / 10
@@ -299,17 +320,25 @@ class Sentinel1Meta:
 
         """
         if self._safe_files is None:
-            files = self.xml_parser.get_compound_var(self.manifest, 'files')
-            # add path
-            for f in ['annotation', 'measurement', 'noise', 'calibration']:
-                files[f] = files[f].map(lambda f: os.path.join(self.path, f))
-
-            # set "polarization" as a category, so sorting dataframe on polarization
-            # will return the dataframe in same order as self._safe_attributes['polarizations']
-            files["polarization"] = files.polarization.astype('category').cat.reorder_categories(
-                self.manifest_attrs['polarizations'], ordered=True)
-            # replace 'dsid' with full path, compatible with gdal sentinel1 driver
-            files['dsid'] = files['dsid'].map(lambda dsid: "SENTINEL1_DS:%s:%s" % (self.path, dsid))
+            # new dataframe, because the parser cache may be shared with other Sentinel1Meta (ie subdatasets)
+            manifest_files = self.xml_parser.get_compound_var(self.manifest, 'files')
+            files = pd.DataFrame(
+                {
+                    # set "polarization" as a category, so sorting dataframe on polarization
+                    # will return the dataframe in same order as self._safe_attributes['polarizations']
+                    'polarization': pd.Categorical(
+                        manifest_files['polarization'], categories=list(self.manifest_attrs['polarizations']),
+                        ordered=True),
+                    # replace 'dsid' with full path, compatible with gdal sentinel1 driver
+                    'dsid': ["SENTINEL1_DS:%s:%s" % (self.path, dsid) for dsid in manifest_files['dsid']],
+                    # add path
+                    **{
+                        f: [os.path.join(self.path, p) for p in manifest_files[f]]
+                        for f in ['annotation', 'measurement', 'noise', 'calibration']
+                    }
+                },
+                index=manifest_files.index
+            )
             files.sort_values('polarization', inplace=True)
             self._safe_files = files
         return self._safe_files
@@ -332,14 +361,36 @@ class Sentinel1Meta:
 
         Returns
         -------
-        xarray.DataArray
-             xarray.DataArray with atracks/xtracks coordinates, and gcps as values.
+        xarray.Dataset
+             xarray.Dataset with atracks/xtracks coordinates, and 'longitude', 'latitude', 'altitude' and 'index'
+             (index in `rio.get_gcps()`) variables.
              attrs is a dict with keys ['footprint', 'coverage', 'pixel_atrack_m', 'pixel_xtrack_m' ]
+
+        See Also
+        --------
+        xsar.Sentinel1Meta.gcps_objects
         """
         if self._gcps is None:
             self._gcps = self._get_gcps()
         return self._gcps
 
+    @property
+    def gcps_objects(self):
+        """
+        gcps as `rasterio.control.GroundControlPoint` objects, gridded like `gcps`.
+        Not cached, as object arrays are heavy to pickle.
+
+        Returns
+        -------
+        xarray.DataArray
+            object DataArray, with atracks/xtracks coordinates.
+        """
+        rio_gcps, _ = self.rio.get_gcps()
+        np_gcps = np.empty(len(rio_gcps), dtype=object)
+        np_gcps[:] = rio_gcps
+        gcps_idx = self.gcps['index']
+        return xr.DataArray(np_gcps[gcps_idx.values], coords=gcps_idx.coords, dims=gcps_idx.dims, name='gcp')
+
     @property
     def footprint(self):
         """footprint, as a shapely polygon or multi polygon"""
@@ -385,7 +436,6 @@ class Sentinel1Meta:
             # (so we can use `mask=` in gpd.read_file)
             import fiona
             import pyproj
-            from shapely.ops import transform
             with fiona.open(feature) as fshp:
                 try:
                     # proj6 give a " FutureWarning: '+init=<authority>:<code>' syntax is deprecated.
@@ -395,7 +445,7 @@ class Sentinel1Meta:
                     crs_in = fshp.crs
                 crs_in = pyproj.CRS(crs_in)
             proj_transform = pyproj.Transformer.from_crs(pyproj.CRS('EPSG:4326'), crs_in, always_xy=True).transform
-            footprint_crs = transform(proj_transform, self.footprint)
+            footprint_crs = transform_geometry(self.footprint, proj_transform)
 
             with warnings.catch_warnings():
                 # ignore "RuntimeWarning: Sequential read of iterator was interrupted. Resetting iterator."
@@ -433,9 +483,17 @@ class Sentinel1Meta:
     def _get_mask_intersecting_geometries(self, name):
         if self._mask_intersecting_geometries[name] is None:
             self._mask_intersecting_geometries[name] = gpd.GeoSeries(
-                self._mask_features[name].intersecting_geometries(self.footprint.bounds))
+                self._get_mask_feature(name).intersecting_geometries(self.footprint.bounds))
         return self._mask_intersecting_geometries[name]
 
+    def _get_mask_feature(self, name):
+        feature = self._mask_features[name]
+        if not isinstance(feature, cartopy.feature.Feature):
+            # lazy feature
+            feature = feature()
+            self._mask_features[name] = feature
+        return feature
+
     @property
     def coverage(self):
         """coverage, as a string like '251km * 170km (xtrack * atrack )'"""
@@ -502,50 +560,106 @@ class Sentinel1Meta:
     @property
     def cross_antemeridian(self):
         """True if footprint cross antemeridian"""
-        return (np.max(self.gcps['longitude']) - np.min(self.gcps['longitude'])) > 180
+        if self._cross_antemeridian is None:
+            lon = self.gcps['longitude'].values
+            self._cross_antemeridian = bool((np.max(lon) - np.min(lon)) > 180)
+        return self._cross_antemeridian
 
     @property
-    def _dict_coords2ll(self):
+    def _coords2ll_interpolator(self):
         """
-        dict with keys ['longitude', 'latitude'] with interpolation function (RectBivariateSpline) as values.
+        `xsar.interpolate.RectBilinear` interpolator from gcps, for ['longitude', 'latitude'].
 
         Examples:
         ---------
-            get longitude at atrack=100 and xtrack=200:
+            get longitude and latitude at atrack=100 and xtrack=200:
             ```
-            >>> self._dict_coords2ll['longitude'].ev(100,200)
-            array(-66.43947434)
+            >>> self._coords2ll_interpolator.ev(100,200)
+            array([-66.43947434,  20.02155225])
             ```
         Notes:
         ------
             if self.cross_antemeridian is True, 'longitude' will be in range [0, 360]
-        """
-        resdict = {}
-        gcps = self.gcps
-        if self.cross_antemeridian:
-            gcps['longitude'] = gcps['longitude'] % 360
 
-        idx_xtrack = np.array(gcps.xtrack)
-        idx_atrack = np.array(gcps.atrack)
+            The interpolator is built once, and is read only, so it can be shared between threads.
+            If several threads build it at the same time, they get equivalent objects, and the last one is kept.
+        """
+        if self._lonlat_interpolator is None:
+            gcps = self.gcps
+            # copy, so self.gcps is not modified
+            lon = np.array(gcps['longitude'])
+            if self.cross_antemeridian:
+                lon = lon % 360
+            self._lonlat_interpolator = RectBilinear(
+                gcps.atrack.values, gcps.xtrack.values, np.stack([lon, gcps['latitude'].values]))
 
-        for ll in ['longitude', 'latitude']:
-            resdict[ll] = RectBivariateSpline(idx_atrack, idx_xtrack, np.asarray(gcps[ll]), kx=1, ky=1)
+        return self._lonlat_interpolator
 
-        return resdict
+    @property
+    def _ll2coords_affine(self):
+        """
+        (2, 3) matrix, from (longitude, latitude, 1) to (atrack, xtrack), fitted on gcps.
+        Longitudes are like in `_coords2ll_interpolator`, so it's also valid across the antemeridian.
+        """
+        if self._lonlat_affine is None:
+            interpolator = self._coords2ll_interpolator
+            lon, lat = interpolator.values
+            xtracks2D, atracks2D = np.meshgrid(interpolator.xtracks, interpolator.atracks)
+            lonlat1 = np.column_stack([lon.ravel(), lat.ravel(), np.ones(lon.size)])
+            coefs, _, _, _ = np.linalg.lstsq(lonlat1, np.column_stack([atracks2D.ravel(), xtracks2D.ravel()]),
+                                             rcond=None)
+            self._lonlat_affine = coefs.T
+        return self._lonlat_affine
+
+    def _get_ll2coords_grid(self):
+        """
+        `xsar.interpolate.RectBilinear` interpolator from (longitude, latitude) to (atrack, xtrack), on a regular
+        lon/lat grid of shape `ll2coords_grid_shape` over the gcps bounds. Grid nodes are computed once with
+        `ll2coords`.
+        """
+        if self._ll2coords_grid is None or self._ll2coords_grid.values.shape[1:] != tuple(self.ll2coords_grid_shape):
+            lon, lat = self._coords2ll_interpolator.values
+            lon_axis = np.linspace(lon.min(), lon.max(), self.ll2coords_grid_shape[0])
+            lat_axis = np.linspace(lat.min(), lat.max(), self.ll2coords_grid_shape[1])
+            lat2D, lon2D = np.meshgrid(lat_axis, lon_axis)
+            atrack_guess, xtrack_guess = np.tensordot(
+                self._ll2coords_affine, np.stack([lon2D, lat2D, np.ones_like(lon2D)]), axes=1)
+            atrack, xtrack, _ = self._coords2ll_interpolator.solve(
+                (lon2D, lat2D), atrack_guess, xtrack_guess, tol=1e-6, max_iter=20)
+            self._ll2coords_grid = RectBilinear(lon_axis, lat_axis, np.stack([atrack, xtrack]))
+        return self._ll2coords_grid
+
+    def _get_piecewise_affine(self, max_error):
+        """
+        `xsar.interpolate.PiecewiseAffine` approximation of `_coords2ll_interpolator`, with `max_error` meters
+        over the whole image (and the gcps grid, if bigger).
+        Cached by `max_error`.
+        """
+        max_error = float(max_error)
+        if max_error not in self._piecewise_affine:
+            gcps = self.gcps
+            bounds = [
+                (min(0, coords[0]), max(size - 1, coords[-1]))
+                for coords, size in zip((gcps.atrack.values, gcps.xtrack.values), gcps.attrs['image_shape'])
+            ]
+            self._piecewise_affine[max_error] = PiecewiseAffine(
+                self._coords2ll_interpolator, max_error,
+                distance=lambda lonlat, lonlat_approx: haversine(*lonlat, *lonlat_approx)[0], bounds=bounds)
+        return self._piecewise_affine[max_error]
 
     def _coords2ll_shapely(self, shape, approx=False):
-        if approx:
+        if approx is True:
             (xoff, a, b, yoff, d, e) = self.approx_transform.to_gdal()
             return shapely.affinity.affine_transform(shape, (a, b, d, e, xoff, yoff))
         else:
-            return shapely.ops.transform(self.coords2ll, shape)
+            return transform_geometry(shape, bind(self.coords2ll, ..., ..., approx=approx))
 
     def _ll2coords_shapely(self, shape, approx=False):
-        if approx:
+        if approx is True:
             (xoff, a, b, yoff, d, e) = (~self.approx_transform).to_gdal()
             return shapely.affinity.affine_transform(shape, (a, b, d, e, xoff, yoff))
         else:
-            return shapely.ops.transform(self.ll2coords, shape)
+            return transform_geometry(shape, bind(self.ll2coords, ..., ..., approx=approx))
 
     def coords2ll(self, *args, to_grid=False, approx=False):
         """
@@ -560,6 +674,12 @@ class Sentinel1Meta:
         to_grid: bool, default False
             If True, `atracks` and `xtracks` must be 1D arrays. The results will be 2D array of shape (atracks.size, xtracks.size).
 
+        approx: bool or float, default False
+            If True, use `approx_transform` (fast, but errors up to 600 meters).
+            If a float, use a piecewise affine transform, with a maximum error of `approx` meters
+            (relative to the default bilinear interpolation of gcps) inside the image.
+            Tiles are computed on first use, and cached for each `approx` value.
+
         Returns
         -------
         tuple of np.array or tuple of float
@@ -572,8 +692,12 @@ class Sentinel1Meta:
 
         """
 
+        if isinstance(approx, (bool, np.bool_)):
+            # boolean-like values are not an error budget (ie `np.True_` is not 1 meter)
+            approx = bool(approx)
+
         if isinstance(args[0], shapely.geometry.base.BaseGeometry):
-            return self._coords2ll_shapely(args[0])
+            return self._coords2ll_shapely(args[0], approx=approx)
 
         atracks, xtracks = args
 
@@ -581,7 +705,9 @@ class Sentinel1Meta:
         if hasattr(atracks, '__iter__'):
             scalar = False
 
-        if approx:
+        if not isinstance(approx, bool) and approx:
+            lon, lat = self._get_piecewise_affine(approx)(atracks, xtracks, grid=to_grid)
+        elif approx:
             if to_grid:
                 xtracks2D, atracks2D = np.meshgrid(xtracks, atracks)
                 lon, lat = self.approx_transform * (atracks2D, xtracks2D)
@@ -589,18 +715,14 @@ class Sentinel1Meta:
             else:
                 lon, lat = self.approx_transform * (atracks, xtracks)
         else:
-            dict_coords2ll = self._dict_coords2ll
-            if to_grid:
-                lon = dict_coords2ll['longitude'](atracks, xtracks)
-                lat = dict_coords2ll['latitude'](atracks, xtracks)
-            else:
-                lon = dict_coords2ll['longitude'].ev(atracks, xtracks)
-                lat = dict_coords2ll['latitude'].ev(atracks, xtracks)
+            # longitude and latitude are interpolated together
+            lon, lat = self._coords2ll_interpolator(atracks, xtracks, grid=to_grid)
 
         if self.cross_antemeridian:
-            lon = to_lon180(lon)
+            # asarray, because scalars can't be modified in place
+            lon = to_lon180(np.asarray(lon))
 
-        if scalar and hasattr(lon, '__iter__'):
+        if scalar and isinstance(lon, (np.ndarray, np.generic)):
             lon = lon.item()
             lat = lat.item()
 
@@ -610,7 +732,8 @@ class Sentinel1Meta:
 
         return lon, lat
 
-    def ll2coords(self, *args, dataset=None):
+    def ll2coords(self, *args, dataset=None, tol=1e-3, max_iter=10, return_residuals=False, method='newton',
+                  approx=False):
         """
         Get `(atracks, xtracks)` from `(lon, lat)`,
         or convert a lon/lat shapely shapely object to atrack/xtrack coordinates.
@@ -619,10 +742,34 @@ class Sentinel1Meta:
         ----------
         *args: lon, lat or shapely object
             lon and lat might be iterables or scalars
+        tol: float, optional
+            convergence tolerance, in pixels.
+        max_iter: int, optional
+            maximum number of iterations.
+        return_residuals: bool, optional
+            if True, also return residuals (norm of the last correction, in pixels).
+            Residuals greater than `tol` are for points that didn't converge.
+        method: str, optional
+            'newton' (default): iterative and accurate.
+            'grid': one bilinear lookup in a regular lon/lat grid, built on first use and cached with the meta
+            (see `ll2coords_grid_shape`). Faster for repeated calls, but errors are up to ~0.01 pixel
+            (or ~0.5 pixel at high latitudes) with default grid shape.
+            `tol` and `max_iter` are not used, and residuals are nan.
+        approx: bool or float, optional
+            If True, use `approx_transform` (fast, but errors up to 600 meters).
+            If a float, use the inverse of the piecewise affine transform of `coords2ll(..., approx=approx)`.
+            `method`, `tol` and `max_iter` are not used, and residuals are nan.
 
         Returns
         -------
         tuple of np.array or tuple of float (atracks, xtracks) , or a shapely object
+            (atracks, xtracks, residuals) if `return_residuals` is True.
+
+        Notes
+        -----
+        `(atracks, xtracks)` are found with Newton iterations on the bilinear interpolation of gcps used by
+        `coords2ll`, from a first guess given by an affine fit of gcps.
+        Points outside the gcps grid are linearly extrapolated.
 
         Examples
         --------
@@ -643,30 +790,49 @@ class Sentinel1Meta:
             ### FIXME remove deprecation
             warnings.warn("dataset kw is deprecated. See xsar.Sentinel1Dataset.ll2coords")
 
+        if isinstance(approx, (bool, np.bool_)):
+            # boolean-like values are not an error budget (ie `np.True_` is not 1 meter)
+            approx = bool(approx)
+
         if isinstance(args[0], shapely.geometry.base.BaseGeometry):
-            return self._ll2coords_shapely(args[0])
+            return self._ll2coords_shapely(args[0], approx=approx)
 
         lon, lat = args
 
-        # approximation with global inaccurate transform
-        atrack_approx, xtrack_approx = ~self.approx_transform * (np.asarray(lon), np.asarray(lat))
-
-        # Theoretical identity. It should be the same, but the difference show the error.
-        lon_identity, lat_identity = self.coords2ll(atrack_approx, xtrack_approx, to_grid=False)
-        atrack_identity, xtrack_identity = ~self.approx_transform * (lon_identity, lat_identity)
-
-        # we are now able to compute the error, and make a correction
-        atrack_error = atrack_identity - atrack_approx
-        xtrack_error = xtrack_identity - xtrack_approx
-
-        atrack = atrack_approx - atrack_error
-        xtrack = xtrack_approx - xtrack_error
-
         if hasattr(lon, '__iter__'):
             scalar = False
         else:
             scalar = True
 
+        lon = np.asarray(lon, dtype=float)
+        lat = np.asarray(lat, dtype=float)
+        if self.cross_antemeridian:
+            # same longitude range as interpolator
+            lon = lon % 360
+
+        if approx is True:
+            atrack, xtrack = ~self.approx_transform * (to_lon180(lon) if self.cross_antemeridian else lon, lat)
+            residuals = np.full(np.shape(atrack), np.nan)
+        elif approx:
+            atrack_guess, xtrack_guess = np.tensordot(
+                self._ll2coords_affine, np.stack([lon, lat, np.ones_like(lon)]), axes=1)
+            atrack, xtrack = self._get_piecewise_affine(approx).inverse(lon, lat, atrack_guess, xtrack_guess)
+            residuals = np.full(atrack.shape, np.nan)
+        elif method == 'grid':
+            atrack, xtrack = self._get_ll2coords_grid().ev(lon, lat, extrapolate=True)
+            residuals = np.full(atrack.shape, np.nan)
+        elif method == 'newton':
+            # first guess from affine fit, and newton iterations on bilinear interpolation
+            atrack_guess, xtrack_guess = np.tensordot(
+                self._ll2coords_affine, np.stack([lon, lat, np.ones_like(lon)]), axes=1)
+            atrack, xtrack, residuals = self._coords2ll_interpolator.solve(
+                (lon, lat), atrack_guess, xtrack_guess, tol=tol, max_iter=max_iter)
+        else:
+            raise ValueError("Unknown method '%s'. Use 'newton' or 'grid'" % method)
+
+        if scalar:
+            atrack, xtrack, residuals = atrack.item(), xtrack.item(), residuals.item()
+
         if dataset is not None:
             # xtrack, atrack are float coordinates.
             # try to convert them to the nearest coordinates in dataset
@@ -685,9 +851,35 @@ class Sentinel1Meta:
                 # if ds is resampled, tolerance should be computed from resolution/2 (for ex 5 for a resolution of 10)
                 (atrack, xtrack) = (atrack * np.nan, xtrack * np.nan)
 
+        if return_residuals:
+            return atrack, xtrack, residuals
         return atrack, xtrack
 
-    def coords2heading(self, atracks, xtracks, to_grid=False, approx=True):
+    @property
+    def _heading_interpolator(self):
+        """
+        (`xsar.interpolate.RectBilinear`, reference heading, wrap), to interpolate heading from gcps grid.
+        Interpolated values are heading deviations from reference heading if heading varies less than 90 degrees,
+        or (sin, cos) of heading otherwise (reference heading is None).
+        wrap is True if heading + reference may be outside [-180, 180] (bilinear values are bounded by grid values).
+        """
+        if self._heading_interp is None:
+            gcps = self.gcps
+            atracks, xtracks = gcps.atrack.values, gcps.xtrack.values
+            heading = self.coords2heading(atracks, xtracks, to_grid=True, approx=False)
+            ref = heading[heading.shape[0] // 2, heading.shape[1] // 2]
+            deviation = (heading - ref + 180) % 360 - 180
+            if np.ptp(deviation) < 90:
+                # no wrap around: heading can be interpolated directly
+                wrap = not (-180 < ref + deviation.min() and ref + deviation.max() < 180)
+                self._heading_interp = (RectBilinear(atracks, xtracks, deviation), ref, wrap)
+            else:
+                heading = np.deg2rad(heading)
+                self._heading_interp = (RectBilinear(atracks, xtracks, np.stack([np.sin(heading), np.cos(heading)])),
+                                        None, False)
+        return self._heading_interp
+
+    def coords2heading(self, atracks, xtracks, to_grid=False, approx=True, interpolate=False):
         """
         Get image heading (atracks increasing direction) at coords `atracks`, `xtracks`.
 
@@ -697,6 +889,15 @@ class Sentinel1Meta:
         xtracks: np.array or scalar
         to_grid: bool
             If True, `atracks` and `xtracks` must be 1D arrays. The results will be 2D array of shape (atracks.size, xtracks.size).
+        approx: bool or float
+            see `xsar.Sentinel1Meta.coords2ll`
+        interpolate: bool
+            If True, heading is computed once on the gcps grid (with `approx=False`), and bilinearly interpolated
+            (`approx` is not used). This is much faster, and the interpolated heading is smooth.
+            Maximum differences with `approx=False`, measured on synthetic geometries, are 0.04 degree below 50
+            degrees of latitude, but grow quickly near the pole (EW swath): 0.7 degree from 78 degrees of latitude,
+            1.0 degree from 80, and 6 degrees from 84. They come from the derivative of the gcps bilinear
+            interpolation, which is discontinuous on gcps lines.
 
         Returns
         -------
@@ -704,6 +905,23 @@ class Sentinel1Meta:
             `heading` , with shape depending on `to_grid` keyword.
 
         """
+        if interpolate:
+            interpolator, ref, wrap = self._heading_interpolator
+            values = interpolator(atracks, xtracks, grid=to_grid)
+            if ref is None:
+                heading = np.rad2deg(np.arctan2(*values))
+            else:
+                # in place, values are not used elsewhere
+                heading = np.asarray(values)
+                if wrap:
+                    heading += ref + 180
+                    np.mod(heading, 360, out=heading)
+                    heading -= 180
+                else:
+                    heading += ref
+            if not hasattr(atracks, '__iter__'):
+                heading = np.asarray(heading).item()
+            return heading
 
         lon1, lat1 = self.coords2ll(atracks - 1, xtracks, to_grid=to_grid, approx=approx)
         lon2, lat2 = self.coords2ll(atracks + 1, xtracks, to_grid=to_grid, approx=approx)
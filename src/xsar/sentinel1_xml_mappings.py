@@ -4,14 +4,12 @@ xpath mapping from xml file, with convertion functions
 
 from datetime import datetime
 import numpy as np
-from scipy.interpolate import RectBivariateSpline, interp1d
-from shapely.geometry import box
+from scipy.interpolate import interp1d
 import pandas as pd
-import xarray as xr
-import warnings
-import geopandas as gpd
 from shapely.geometry import Polygon
 import os.path
+from lxml import etree
+from .interpolate import RectBilinear
 
 namespaces = {
     "xfdu": "urn:ccsds:schema:xfdu:1",
@@ -22,18 +20,82 @@ namespaces = {
     "gml": "http://www.opengis.net/gml"
 }
 
+# np.loadtxt is implemented in C since numpy 1.23 (pure python before)
+_fast_loadtxt = np.lib.NumpyVersion(np.__version__) >= '1.23.0'
+
+
+def ragged_fromstring(x, dtype=float):
+    """
+    Decode a list of strings of space separated values, with only one call to `numpy.fromstring`.
+
+    Parameters
+    ----------
+    x: list of str
+        strings to decode. Non str items (ie scalar pyval from lxml.objectify) are converted with `str`.
+    dtype: numpy.dtype
+
+    Returns
+    -------
+    tuple(numpy.ndarray, numpy.ndarray)
+        (values, offsets), where values is the 1D array of all decoded values,
+        and values of row `i` are `values[offsets[i]:offsets[i+1]]`
+    """
+    strings = [str(s).strip() for s in x]
+    joined = ' '.join(strings)
+    if '  ' in joined or '\t' in joined or '\n' in joined or '\r' in joined:
+        # irregular whitespace (or empty strings): values are counted and decoded from the same split
+        tokens = [s.split() for s in strings]
+        counts = np.array([len(t) for t in tokens], dtype=int)
+        strings = [' '.join(t) for t in tokens]
+        joined = ' '.join(strings)
+    else:
+        # values are separated by exactly one space
+        counts = np.array([s.count(' ') + 1 for s in strings], dtype=int)
+    if _fast_loadtxt and np.issubdtype(dtype, np.floating) and counts.size and np.all(counts == counts[0]):
+        # rows of same size: np.loadtxt (C implementation in numpy>=1.23) is faster than np.fromstring for floats
+        try:
+            values = np.loadtxt(strings, dtype=dtype, ndmin=2).ravel()
+        except ValueError:
+            values = None
+        if values is not None and values.size == counts.sum():
+            offsets = np.arange(counts.size + 1) * counts[0]
+            return values, offsets
+    values = np.fromstring(joined, dtype=dtype, sep=' ')
+    if values.size != counts.sum():
+        raise ValueError('Unable to decode %d values (%d found)' % (counts.sum(), values.size))
+    offsets = np.zeros(len(strings) + 1, dtype=int)
+    np.cumsum(counts, out=offsets[1:])
+    return values, offsets
+
+
+def ragged_split(values, offsets):
+    """split values from `ragged_fromstring` as a list of 1D arrays (views on values)"""
+    offsets = offsets.tolist()
+    return [values[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])]
+
+
+def float_2Darray_from_string_list(x):
+    """decode list of strings with the same values count as a 2D array"""
+    values, offsets = ragged_fromstring(x, dtype=float)
+    counts = np.diff(offsets)
+    if np.any(counts != counts[0]):
+        raise ValueError('Unable to build a 2D array from rows of different sizes')
+    return values.reshape(len(counts), counts[0])
+
+
 # xpath convertion function: they take only one args (list returned by xpath)
 scalar = lambda x: x[0]
 scalar_float = lambda x: float(x[0])
 date_converter = lambda x: datetime.strptime(x[0], '%Y-%m-%dT%H:%M:%S.%f')
-datetime64_array = lambda x: np.array([np.datetime64(date_converter([sx])) for sx in x])
+datetime64_array = lambda x: np.array(x, dtype='datetime64[us]')
 int_1Darray_from_string = lambda x: np.fromstring(x[0], dtype=int, sep=' ')
-float_2Darray_from_string_list = lambda x: np.vstack([np.fromstring(e, dtype=float, sep=' ') for e in x])
+int_1Darray_list_from_string_list = lambda x: ragged_split(*ragged_fromstring(x, dtype=int))
+float_1Darray_list_from_string_list = lambda x: ragged_split(*ragged_fromstring(x, dtype=float))
 int_1Darray_from_join_strings = lambda x: np.fromstring(" ".join(x), dtype=int, sep=' ')
 float_1Darray_from_join_strings = lambda x: np.fromstring(" ".join(x), dtype=float, sep=' ')
 int_array = lambda x: np.array(x, dtype=int)
 uniq_sorted = lambda x: np.array(sorted(set(x)))
-ordered_category = lambda x:  pd.Categorical(x).reorder_categories(x,ordered=True)
+ordered_category = lambda x: pd.Categorical(x, categories=x, ordered=True)
 normpath = lambda paths: [ os.path.normpath(p) for p in paths ]
 
 def or_ipf28(xpath):
@@ -87,22 +149,22 @@ xpath_mappings = {
         'polarization': (scalar, '/noise/adsHeader/polarisation'),
         'range': {
             'atrack': (int_array, or_ipf28('/noise/noiseRangeVectorList/noiseRangeVector/line')),
-            'xtrack': (lambda x: [np.fromstring(s, dtype=int, sep=' ') for s in x],
+            'xtrack': (int_1Darray_list_from_string_list,
                        or_ipf28('/noise/noiseRangeVectorList/noiseRangeVector/pixel')),
             'noiseLut': (
-                lambda x: [np.fromstring(s, dtype=float, sep=' ') for s in x],
+                float_1Darray_list_from_string_list,
                 or_ipf28('/noise/noiseRangeVectorList/noiseRangeVector/noiseRangeLut'))
         },
         'azi': {
             'swath': '/noise/noiseAzimuthVectorList/noiseAzimuthVector/swath',
-            'atrack': (lambda x: [np.fromstring(str(s), dtype=int, sep=' ') for s in x],
+            'atrack': (int_1Darray_list_from_string_list,
                        '/noise/noiseAzimuthVectorList/noiseAzimuthVector/line'),
             'atrack_start': (int_array, '/noise/noiseAzimuthVectorList/noiseAzimuthVector/firstAzimuthLine'),
             'atrack_stop': (int_array, '/noise/noiseAzimuthVectorList/noiseAzimuthVector/lastAzimuthLine'),
             'xtrack_start': (int_array, '/noise/noiseAzimuthVectorList/noiseAzimuthVector/firstRangeSample'),
             'xtrack_stop': (int_array, '/noise/noiseAzimuthVectorList/noiseAzimuthVector/lastRangeSample'),
             'noiseLut': (
-                lambda x: [np.fromstring(str(s), dtype=float, sep=' ') for s in x],
+                float_1Darray_list_from_string_list,
                 '/noise/noiseAzimuthVectorList/noiseAzimuthVector/noiseAzimuthLut'),
         }
     },
@@ -124,50 +186,227 @@ xpath_mappings = {
 }
 
 
+# streaming readers (see `xsar.xml_parser.XmlParser`)
+# manifest variables: (tags from element to farthest ancestor, attribute or None). Must match xpath_mappings['manifest']
+_manifest_stream_paths = {
+    'ipf_version': (('safe:software', 'safe:facility', 'safe:processing', 'xmlData'), 'version'),
+    'swath_type': (('s1sarl1:mode', 's1sarl1:instrumentMode'), None),
+    'polarizations': (('s1sarl1:transmitterReceiverPolarisation', 's1sarl1:standAloneProductInformation'), None),
+    'footprints': (('gml:coordinates', 'safe:footPrint', 'safe:frame'), None),
+    'product_type': (('s1sarl1:productType', 's1sarl1:standAloneProductInformation'), None),
+    'mission': (('safe:familyName', 'safe:platform'), None),
+    'satellite': (('safe:number', 'safe:platform'), None),
+    'start_date': (('safe:startTime', 'safe:acquisitionPeriod'), None),
+    'stop_date': (('safe:stopTime', 'safe:acquisitionPeriod'), None),
+}
+
+# manifest files variables: repID in '/xfdu:XFDU/dataObjectSection/*/byteStream/fileLocation/@href'
+_manifest_stream_files = {
+    'annotation_files': 's1Level1ProductSchema',
+    'measurement_files': 's1Level1MeasurementSchema',
+    'noise_files': 's1Level1NoiseSchema',
+    'calibration_files': 's1Level1CalibrationSchema'
+}
+
+
+def _clark(tag):
+    """'prefix:name' tag to lxml '{uri}name' notation"""
+    if ':' in tag:
+        prefix, name = tag.split(':')
+        return '{%s}%s' % (namespaces[prefix], name)
+    return tag
+
+
+def manifest_streamer(manifest):
+    """
+    Read manifest.safe with `lxml.etree.iterparse`, without building an objectify tree and evaluating xpath.
+
+    Parameters
+    ----------
+    manifest: str
+        manifest.safe path
+
+    Returns
+    -------
+    dict
+        raw xpath results, as `{xpath: list}`, for all xpath in `xpath_mappings['manifest']`
+    """
+    handlers = {}
+    results = {}
+    for var_name, (tags, attr) in _manifest_stream_paths.items():
+        tags = tuple(_clark(t) for t in tags)
+        xpath = xpath_mappings['manifest'][var_name][1]
+        handlers.setdefault(tags[0], []).append((tags[1:], attr, results.setdefault(xpath, [])))
+    files = {}
+    for var_name, rep_id in _manifest_stream_files.items():
+        files[rep_id] = results.setdefault(xpath_mappings['manifest'][var_name][1], [])
+    xfdu_tag = _clark('xfdu:XFDU')
+
+    for _, elem in etree.iterparse(manifest, events=('end',), tag=list(handlers) + ['fileLocation']):
+        if elem.tag == 'fileLocation':
+            byte_stream = elem.getparent()
+            data_object = byte_stream.getparent()
+            section = data_object.getparent()
+            if byte_stream.tag == 'byteStream' and section.tag == 'dataObjectSection' \
+                    and section.getparent().tag == xfdu_tag and section.getparent().getparent() is None:
+                try:
+                    files[data_object.get('repID')].append(elem.get('href'))
+                except KeyError:
+                    pass
+            continue
+        for ancestors, attr, result in handlers[elem.tag]:
+            parent = elem.getparent()
+            for tag in ancestors:
+                if parent is None or parent.tag != tag:
+                    break
+                parent = parent.getparent()
+            else:
+                if attr is None:
+                    result.append(elem.text or '')
+                elif attr in elem.attrib:
+                    result.append(elem.get(attr))
+    return results
+
+
+# {file_type: func(xml_file)}, returning raw xpath results
+streamers = {
+    'manifest': manifest_streamer
+}
+
+
 # compounds variables converters
 
 def signal_lut(atrack, xtrack, lut):
-    lut_f = RectBivariateSpline(atrack, xtrack, lut, kx=1, ky=1)
+    lut_f = RectBilinear(atrack, xtrack, lut)
     return lut_f
 
 
 
 class _NoiseLut:
-    """small internal class that return a lut function(atracks, xtracks) defined on all the image, from blocks in the image"""
+    """
+    small internal class that return a lut function(atracks, xtracks) defined on all the image, from blocks in the image.
+
+    Blocks bounds are stored as interval arrays sorted by atrack start, so blocks intersecting a chunk are found
+    with a binary search, and block values are written directly into the returned array.
+
+    Parameters
+    ----------
+    bounds: numpy.ndarray
+        (n_blocks, 4) array of blocks inclusive bounds (atrack_min, xtrack_min, atrack_max, xtrack_max).
+    luts: list of callable
+        `lut(atracks, xtracks)` for each block, returning an array broadcastable to (atracks.size, xtracks.size).
+        Where blocks overlap, the last one is used.
+    """
 
-    def __init__(self, blocks):
-        self.blocks = blocks
+    def __init__(self, bounds, luts):
+        self.bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+        self.luts = luts
+        self._order = np.argsort(self.bounds[:, 0], kind='stable')
+        self._bounds = self.bounds[self._order]
+        # running max of atrack_max: blocks before searchsorted(self._atrack_max, a) all end before a
+        self._atrack_max = np.maximum.accumulate(self._bounds[:, 2])
+
+    def _intersect(self, a_min, x_min, a_max, x_max):
+        """indexes of blocks intersecting [a_min, a_max] * [x_min, x_max], in blocks order"""
+        i0 = np.searchsorted(self._atrack_max, a_min, side='left')
+        i1 = np.searchsorted(self._bounds[:, 0], a_max, side='right')
+        bounds = self._bounds[i0:i1]
+        match = (bounds[:, 2] >= a_min) & (bounds[:, 1] <= x_max) & (bounds[:, 3] >= x_min)
+        return np.sort(self._order[i0:i1][match])
 
     def __call__(self, atracks, xtracks):
-        """ return noise[a.size,x.size], by finding the intersection with blocks and calling the corresponding block.lut_f"""
-        if len(self.blocks) == 0:
+        """ return noise[a.size,x.size], by finding the intersection with blocks and calling the corresponding lut"""
+        if len(self.luts) == 0:
             # no noise (ie no azi noise for ipf < 2.9)
             return 1
-        else:
-            # the array to be returned
-            noise = xr.DataArray(
-                np.ones((atracks.size, xtracks.size)) * np.nan,
-                dims=('atrack', 'xtrack'),
-                coords={'atrack': atracks, 'xtrack': xtracks}
-            )
-            # find blocks that intersects with asked_box
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                # the box coordinates of the returned array
-                asked_box = box(max(0, atracks[0] - 0.5), max(0, xtracks[0] - 0.5), atracks[-1] + 0.5,
-                                xtracks[-1] + 0.5)
-                # set match_blocks as the non empty intersection with asked_box
-                match_blocks = self.blocks.copy()
-                match_blocks.geometry = self.blocks.geometry.intersection(asked_box)
-                match_blocks = match_blocks[~match_blocks.is_empty]
-            for i, block in match_blocks.iterrows():
-                (sub_a_min, sub_x_min, sub_a_max, sub_x_max) = map(int, block.geometry.bounds)
-                sub_a = atracks[(atracks >= sub_a_min) & (atracks <= sub_a_max)]
-                sub_x = xtracks[(xtracks >= sub_x_min) & (xtracks <= sub_x_max)]
-                noise.loc[dict(atrack=sub_a, xtrack=sub_x)] = block.lut_f(sub_a, sub_x)
-
-        # values returned as np array
-        return noise.values
+        # atracks and xtracks are sorted
+        noise = np.full((atracks.size, xtracks.size), np.nan)
+        for i in self._intersect(atracks[0], xtracks[0], atracks[-1], xtracks[-1]):
+            a_min, x_min, a_max, x_max = self.bounds[i]
+            a0, a1 = np.searchsorted(atracks, [a_min, a_max], side='left')
+            a1 += a1 < atracks.size and atracks[a1] == a_max
+            x0, x1 = np.searchsorted(xtracks, [x_min, x_max], side='left')
+            x1 += x1 < xtracks.size and xtracks[x1] == x_max
+            if a0 < a1 and x0 < x1:
+                noise[a0:a1, x0:x1] = self.luts[i](atracks[a0:a1], xtracks[x0:x1])
+        return noise
+
+
+class _NoiseLutRange:
+    """
+    small internal class that return the range noise lut function(atracks, xtracks), from range noise vectors.
+
+    Vectors are stored as one ragged array, and each image line uses the vector with the last start line before it.
+    A chunk is evaluated with one linear interpolation for all the vectors it uses.
+
+    Parameters
+    ----------
+    atracks_start: numpy.ndarray
+        first line where each vector is used, sorted.
+    xtracks: list of numpy.ndarray
+        sorted pixels of each vector.
+    luts: list of numpy.ndarray
+        noise values of each vector, same structure as xtracks.
+    """
+
+    def __init__(self, atracks_start, xtracks, luts):
+        self.atracks_start = np.asarray(atracks_start)
+        counts = np.array([len(x) for x in xtracks], dtype=int)
+        self.offsets = np.zeros(counts.size + 1, dtype=int)
+        np.cumsum(counts, out=self.offsets[1:])
+        self.xtracks = np.concatenate(xtracks).astype(float) if counts.size else np.array([])
+        self.luts = np.concatenate(luts).astype(float) if counts.size else np.array([])
+
+    def __call__(self, atracks, xtracks):
+        """ return noise[a.size,x.size]"""
+        noise = np.empty((atracks.size, xtracks.size))
+        # atracks are sorted: lines before first vector start line are the first ones
+        i0 = np.searchsorted(atracks, self.atracks_start[0], side='left') if self.atracks_start.size else atracks.size
+        noise[:i0] = np.nan
+        if i0 == atracks.size:
+            return noise
+        # vectors are sorted, so each one is used on a run of lines
+        vectors, counts = np.unique(np.searchsorted(self.atracks_start, atracks[i0:], side='right') - 1,
+                                    return_counts=True)
+
+        # like scipy.interpolate.interp1d(kind='linear', bounds_error=False, fill_value=np.nan), for all vectors
+        xtracks = np.asarray(xtracks, dtype=float)
+        first = self.offsets[vectors]
+        last = self.offsets[vectors + 1] - 1
+        # vectors with at least 2 samples are interpolated
+        ok = last > first
+        values = np.full((vectors.size, xtracks.size), np.nan) if not ok.all() else None
+        if ok.any():
+            first_ok = first[ok]
+            last_ok = last[ok]
+            hi = np.empty((first_ok.size, xtracks.size), dtype=np.intp)
+            for k, (o0, o1) in enumerate(zip(first_ok, last_ok + 1)):
+                hi[k] = np.searchsorted(self.xtracks[o0:o1], xtracks, side='left')
+            # indexes in ragged arrays
+            hi += first_ok[:, np.newaxis]
+            np.clip(hi, first_ok[:, np.newaxis] + 1, last_ok[:, np.newaxis], out=hi)
+            lo = hi - 1
+            x_lo = self.xtracks[lo]
+            y_lo = self.luts[lo]
+            values_ok = (self.luts[hi] - y_lo) / (self.xtracks[hi] - x_lo) * (xtracks - x_lo) + y_lo
+            outside = (xtracks < self.xtracks[first_ok][:, np.newaxis]) | \
+                      (xtracks > self.xtracks[last_ok][:, np.newaxis])
+            values_ok[outside] = np.nan
+            if values is None:
+                values = values_ok
+            else:
+                values[ok] = values_ok
+        # vectors with one sample are only defined at this sample (and empty vectors are nan)
+        single = last == first
+        if single.any():
+            values[single] = np.where(xtracks == self.xtracks[first[single]][:, np.newaxis],
+                                      self.luts[first[single]][:, np.newaxis], np.nan)
+
+        stops = i0 + np.cumsum(counts)
+        for v, start, stop in zip(values, stops - counts, stops):
+            noise[start:stop] = v
+        return noise
+
 
 def noise_lut_range(atracks, xtracks, noiseLuts):
     """
@@ -183,44 +422,40 @@ def noise_lut_range(atracks, xtracks, noiseLuts):
 
     Returns
     -------
-    geopandas.GeoDataframe
-        noise range geometry.
-        'geometry' is the polygon where 'lut_f' is defined.
-        attrs['type'] set to 'xtrack'
-
+    _NoiseLutRange
+        noise range lut function.
 
     """
 
-    class Lut_box_range:
-        def __init__(self, a_start, a_stop, x, l):
-            self.atracks = np.arange(a_start, a_stop)
-            self.xtracks = x
-            self.area = box(a_start, x[0], a_stop, x[-1])
-            self.lut_f = interp1d(x, l, kind='linear', fill_value=np.nan, assume_sorted=True, bounds_error=False)
-
-        def __call__(self, atracks, xtracks):
-            lut = np.tile(self.lut_f(xtracks), (atracks.size, 1))
-            return lut
-
-    blocks = []
     # atracks is where lut is defined. compute atracks interval validity
+    # (interval ends are next vector start line, so only start lines are needed)
     atracks_start = (atracks - np.diff(atracks, prepend=0) / 2).astype(int)
-    atracks_stop = np.ceil(
-        atracks + np.diff(atracks, append=atracks[-1] + 1) / 2
-    ).astype(int)  # end is not included in the interval
-    atracks_stop[-1] = 65535  # be sure to include all image if last azimuth line, is not last azimuth image
-    for a_start, a_stop, x, l in zip(atracks_start, atracks_stop, xtracks, noiseLuts):
-        lut_f = Lut_box_range(a_start, a_stop, x, l)
-        block = pd.Series(dict([
-            ('lut_f', lut_f),
-            ('geometry', lut_f.area)]))
-        blocks.append(block)
 
-    # to geopandas
-    blocks = pd.concat(blocks, axis=1).T
-    blocks = gpd.GeoDataFrame(blocks)
+    return _NoiseLutRange(atracks_start, xtracks, noiseLuts)
+
 
-    return _NoiseLut(blocks)
+class _LutBoxAzi:
+    """azimuth noise lut function(atracks, xtracks) for one block, broadcasted along xtracks"""
+
+    def __init__(self, a, lut):
+        self.lut_f = None
+        self.lut = None
+        if len(lut) > 1:
+            self.lut_f = interp1d(a, lut, kind='linear', fill_value='extrapolate', assume_sorted=True, bounds_error=False)
+        else:
+            # not enought values to do interpolation
+            # noise will be constant on this box!
+            self.lut = lut
+
+    def __call__(self, atracks, xtracks):
+        lut = self.lut if self.lut_f is None else self.lut_f(atracks)
+        # broadcasted along xtracks
+        return np.asarray(lut)[:, np.newaxis]
+
+
+def _no_noise(atracks, xtracks):
+    """noise lut function for blocks without noise"""
+    return 1
 
 
 def noise_lut_azi(atrack_azi, atrack_azi_start,
@@ -240,54 +475,29 @@ def noise_lut_azi(atrack_azi, atrack_azi_start,
 
     Returns
     -------
-    geopandas.GeoDataframe
-        noise range geometry.
-        'geometry' is the polygon where 'lut_f' is defined.
-        attrs['type'] set to 'atrack'
+    _NoiseLut
+        noise azimuth lut function, with one block per azimuth vector.
     """
 
-    class Lut_box_azi:
-        def __init__(self, sw, a, a_start, a_stop, x_start, x_stop, lut):
-            self.atracks = a
-            self.xtracks = np.arange(x_start, x_stop + 1)
-            self.area = box(max(0, a_start - 0.5), max(0, x_start - 0.5), a_stop + 0.5, x_stop + 0.5)
-            if len(lut) > 1:
-                self.lut_f = interp1d(a, lut, kind='linear', fill_value='extrapolate', assume_sorted=True, bounds_error=False)
-            else:
-                # not enought values to do interpolation
-                # noise will be constant on this box!
-                self.lut_f = lambda _a: lut
-
-        def __call__(self, atracks, xtracks):
-            return np.tile(self.lut_f(atracks), (xtracks.size, 1)).T
-
-    blocks = []
-    for sw, a, a_start, a_stop, x_start, x_stop, lut in zip(swath, atrack_azi, atrack_azi_start, atrack_azi_stop,
-                                                            xtrack_azi_start,
-                                                            xtrack_azi_stop, noise_azi_lut):
-        lut_f = Lut_box_azi(sw, a, a_start, a_stop, x_start, x_stop, lut)
-        block = pd.Series(dict([
-            ('lut_f', lut_f),
-            ('geometry', lut_f.area)]))
-        blocks.append(block)
-
-    if len(blocks) == 0:
+    bounds = []
+    luts = []
+    for a, a_start, a_stop, x_start, x_stop, lut in zip(atrack_azi, atrack_azi_start, atrack_azi_stop,
+                                                        xtrack_azi_start, xtrack_azi_stop, noise_azi_lut):
+        # pixels boxes [start - 0.5, stop + 0.5], truncated to integers
+        bounds.append((int(max(0, a_start - 0.5)), int(max(0, x_start - 0.5)), a_stop, x_stop))
+        luts.append(_LutBoxAzi(a, lut))
+
+    if len(luts) == 0:
         # no azi noise (ipf < 2.9) or WV
-        blocks.append(pd.Series(dict([
-            ('atracks', np.array([])),
-            ('xtracks', np.array([])),
-            ('lut_f', lambda a, x: 1),
-            ('geometry', box(0, 0, 65535, 65535))])))  # arbitrary large box (bigger than whole image)
+        bounds.append((0, 0, 65535, 65535))  # arbitrary large box (bigger than whole image)
+        luts.append(_no_noise)
 
-    # to geopandas
-    blocks = pd.concat(blocks, axis=1).T
-    blocks = gpd.GeoDataFrame(blocks)
+    return _NoiseLut(bounds, luts)
 
-    return _NoiseLut(blocks)
 
 def annotation_angle(atrack, xtrack, angle):
     lut = angle.reshape(atrack.size, xtrack.size)
-    lut_f = RectBivariateSpline(atrack, xtrack, lut, kx=1, ky=1)
+    lut_f = RectBilinear(atrack, xtrack, lut)
     return lut_f
 
 def datetime64_array(dates):
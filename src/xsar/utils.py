@@ -10,12 +10,17 @@ import xarray as xr
 import dask
 from functools import reduce, partial
 import rasterio
+import shapely
+import shapely.geometry
 
 logger = logging.getLogger('xsar.utils')
 logger.addHandler(logging.NullHandler())
 
 mem_monitor = True
 
+# shapely >= 2 has vectorized `shapely.transform`
+_shapely_transform = hasattr(shapely, 'transform')
+
 try:
     from psutil import Process
 except ImportError:
@@ -75,6 +80,53 @@ def to_lon180(lon):
     return lon
 
 
+def _geometry_coords(geometry):
+    """list of (n, 2) coordinates arrays of all points, lines and rings in `geometry`"""
+    if geometry.is_empty:
+        return []
+    if geometry.geom_type == 'Polygon':
+        return [np.asarray(ring.coords)[:, :2] for ring in [geometry.exterior, *geometry.interiors]]
+    if hasattr(geometry, 'geoms'):
+        return [coords for geom in geometry.geoms for coords in _geometry_coords(geom)]
+    return [np.asarray(geometry.coords)[:, :2]]
+
+
+def _geometry_rebuild(geometry, coords_iter):
+    """rebuild `geometry`, with new coordinates from `coords_iter` (same order as `_geometry_coords`)"""
+    if geometry.is_empty:
+        return geometry
+    if geometry.geom_type == 'Polygon':
+        return shapely.geometry.Polygon(next(coords_iter), [next(coords_iter) for _ in geometry.interiors])
+    if hasattr(geometry, 'geoms'):
+        return type(geometry)([_geometry_rebuild(geom, coords_iter) for geom in geometry.geoms])
+    return type(geometry)(next(coords_iter))
+
+
+def transform_geometry(geometry, func):
+    """
+    Like `shapely.ops.transform`, but `func` is called only once, with all the vertices of `geometry`.
+
+    Parameters
+    ----------
+    geometry: shapely geometry
+    func: function
+        `func(x, y)` returning `(x, y)` , with x and y 1D arrays.
+
+    Returns
+    -------
+    shapely geometry
+        2D geometry, with same type as `geometry`
+    """
+    if _shapely_transform:
+        return shapely.transform(geometry, lambda coords: np.column_stack(func(coords[:, 0], coords[:, 1])))
+    coords = _geometry_coords(geometry)
+    if not coords:
+        return geometry
+    x, y = func(*np.concatenate(coords).T)
+    new_coords = np.split(np.column_stack([x, y]), np.cumsum([len(c) for c in coords])[:-1])
+    return _geometry_rebuild(geometry, iter(new_coords))
+
+
 def haversine(lon1, lat1, lon2, lat2):
     """
     Compute distance in meters, and bearing in degrees from point1 to point2, assuming spherical earth.
@@ -310,6 +362,40 @@ def map_blocks_coords(da, func,  func_kwargs={}, **kwargs):
                            )
     return dataarr
 
+def dask_graph_sizes(obj):
+    """
+    Measure the pickled size of each task in the dask graph of `obj`, as sent to dask distributed workers.
+
+    Parameters
+    ----------
+    obj: dask collection
+        like `xarray.Dataset`, `xarray.DataArray` or `dask.array.Array`
+
+    Returns
+    -------
+    pandas.DataFrame
+        one row per graph layer, indexed by layer name, with columns
+            * tasks     : tasks count
+            * bytes     : total pickled size of tasks, in bytes
+            * max_bytes : pickled size of the biggest task, in bytes
+        sorted by decreasing 'bytes'.
+
+    Notes
+    -----
+    Tasks are pickled one by one, so objects shared by several tasks (ie `Sentinel1Meta`) are counted for each task.
+    """
+    import cloudpickle
+    import pandas as pd
+
+    graph = obj.__dask_graph__()
+    rows = {}
+    for name, layer in graph.layers.items():
+        sizes = [len(cloudpickle.dumps(task)) for task in layer.values()]
+        rows[name] = {'tasks': len(sizes), 'bytes': sum(sizes), 'max_bytes': max(sizes, default=0)}
+    df = pd.DataFrame.from_dict(rows, orient='index', columns=['tasks', 'bytes', 'max_bytes'])
+    return df.sort_values('bytes', ascending=False)
+
+
 def rioread(subdataset, out_shape, winsize, resampling=rasterio.enums.Resampling.rms):
     """
     wrapper around rasterio.read, to replace self.rio.read and
@@ -1,13 +1,24 @@
+import numpy as np
 import xarray as xr
+from xarray.core import indexing
 import xsar
 import rasterio
 import warnings
 
+try:
+    # not in xarray public namespace, but it's the way documented for backends to defer indexing
+    # (see 'How to add a new backend' in xarray documentation). Available since xarray 0.18.
+    from xarray.core.indexing import LazilyIndexedArray
+except ImportError:
+    LazilyIndexedArray = None
+
 class XsarXarrayBackend(xr.backends.common.BackendEntrypoint):
     def open_dataset(self,
                      dataset_id, resolution=None, resampling=rasterio.enums.Resampling.average,
-                     luts=False, dtypes=None, drop_variables=[]):
-        ds = xsar.open_dataset(dataset_id, resolution=resolution, resampling=resampling, luts=luts, dtypes=dtypes)
+                     luts=False, dtypes=None, lazy_lonlat=False, variables=None, interpolate_heading=False,
+                     drop_variables=[]):
+        ds = xsar.open_dataset(dataset_id, resolution=resolution, resampling=resampling, luts=luts, dtypes=dtypes,
+                               lazy_lonlat=lazy_lonlat, variables=variables, interpolate_heading=interpolate_heading)
         if not list(ds.chunks):
             warnings.warn('Not using `chunks` kw is discouraged when openning SAFE')
         return ds.drop_vars(drop_variables, errors='ignore')
@@ -18,3 +29,72 @@ class XsarXarrayBackend(xr.backends.common.BackendEntrypoint):
         if isinstance(filename_or_obj, str) and '.SAFE' in filename_or_obj:
             return True
         return False
+
+
+class LonLatBackendArray(xr.backends.BackendArray):
+    """
+    Lazy `longitude` or `latitude` array, computed with `xsar.Sentinel1Meta.coords2ll` (gcps grid interpolator)
+    only for the indexed values.
+
+    Parameters
+    ----------
+    s1meta: xsar.Sentinel1Meta
+    atracks: numpy.ndarray
+        1D atrack coordinates.
+    xtracks: numpy.ndarray
+        1D xtrack coordinates.
+    var: str
+        'longitude' or 'latitude'.
+    dtype: str or numpy.dtype, optional
+        ('f4' by default)
+
+    Notes
+    -----
+    Wrapped in a lazily indexed variable (see `to_variable`), indexing is deferred until values are needed, so
+    only the selected region is ever computed. The array only holds `s1meta` and coordinates, so it's cheap to pickle.
+
+    Examples
+    --------
+        >>> var = LonLatBackendArray(s1meta, atracks, xtracks, 'longitude').to_variable()
+    """
+
+    def __init__(self, s1meta, atracks, xtracks, var, dtype='f4'):
+        if var not in ('longitude', 'latitude'):
+            raise ValueError("var must be 'longitude' or 'latitude', not %s" % var)
+        self.s1meta = s1meta
+        self.atracks = np.asarray(atracks)
+        self.xtracks = np.asarray(xtracks)
+        self.var = var
+        self.shape = (self.atracks.size, self.xtracks.size)
+        self.dtype = np.dtype(dtype)
+
+    def to_variable(self):
+        """
+        Lazily indexed `xarray.Variable`, with dims ('atrack', 'xtrack').
+
+        Returns
+        -------
+        xarray.Variable
+
+        Raises
+        ------
+        NotImplementedError
+            if lazy indexing is not available in installed xarray version.
+        """
+        if LazilyIndexedArray is None:
+            raise NotImplementedError('lazy indexing is not available in xarray %s' % xr.__version__)
+        return xr.Variable(('atrack', 'xtrack'), LazilyIndexedArray(self))
+
+    def __getitem__(self, key):
+        return indexing.explicit_indexing_adapter(key, self.shape, indexing.IndexingSupport.OUTER,
+                                                  self._raw_indexing_method)
+
+    def _raw_indexing_method(self, key):
+        atracks = self.atracks[key[0]]
+        xtracks = self.xtracks[key[1]]
+        shape = np.shape(atracks) + np.shape(xtracks)
+        if 0 in shape:
+            return np.empty(shape, dtype=self.dtype)
+        lon, lat = self.s1meta.coords2ll(np.atleast_1d(atracks), np.atleast_1d(xtracks), to_grid=True)
+        values = lon if self.var == 'longitude' else lat
+        return values.astype(self.dtype, copy=False).reshape(shape)
@@ -1,12 +1,202 @@
 import os
-from lxml import objectify
+import pickle
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict, Counter
+from contextlib import contextmanager
+from lxml import objectify, etree
 import jmespath
 import logging
 from collections.abc import Iterable
+from importlib.metadata import version, PackageNotFoundError
 
 logger = logging.getLogger('xsar.xml_parser')
 logger.addHandler(logging.NullHandler())
 
+try:
+    xsar_version = version('xsar')
+except PackageNotFoundError:
+    # not installed (ie used from a source tree): only `decoders_version` is used in `DiskCache` keys
+    xsar_version = None
+
+decoders_version = 1
+"""
+version of decoded variables, used in `DiskCache` keys.
+Must be incremented when decoders output change (ie in `xsar.sentinel1_xml_mappings`), so old entries are not used.
+"""
+
+
+class DiskCache:
+    """
+    Persistent cache of pickled objects, stored as one file per entry in `cache_dir`.
+    Least recently used entries are removed when the cache grows beyond `max_size`.
+
+    The cache can be shared between processes: entries are written atomically,
+    and a missing or corrupted entry is handled as a cache miss.
+
+    Parameters
+    ----------
+    cache_dir: str
+        cache directory. Created if it doesn't exist.
+    max_size: int or None, optional
+        maximum cache size, in bytes. No limit if None. (default to 1Gb)
+    """
+
+    def __init__(self, cache_dir, max_size=1024 ** 3):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_size = max_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # estimated cache size, computed on first write
+        self._size = None
+        self.evictions = 0
+        """number of evicted entries"""
+
+    @staticmethod
+    def key(xml_file, *args):
+        """
+        Get cache key for `xml_file` and `args`.
+        The key change if the file is modified (size or mtime change), or if xsar version or `decoders_version`
+        change, so outdated entries are never used.
+
+        Parameters
+        ----------
+        xml_file: str
+        *args: tuple of str
+            additional identifiers (ie jmespath, xpath)
+
+        Returns
+        -------
+        str
+        """
+        stat = os.stat(xml_file)
+        ident = (xsar_version, decoders_version, os.path.abspath(xml_file), stat.st_size, stat.st_mtime_ns) + args
+        return hashlib.sha1(repr(ident).encode()).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, '%s.pkl' % key)
+
+    def get(self, key):
+        """
+        Get object from cache.
+
+        Parameters
+        ----------
+        key: str
+
+        Returns
+        -------
+        object
+            cached object
+
+        Raises
+        ------
+        KeyError
+            if `key` is not in cache
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'rb') as f:
+                result = pickle.load(f)
+        except FileNotFoundError:
+            raise KeyError(key)
+        except (EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            logger.debug("removing corrupted cache entry %s: %s" % (entry_path, str(e)))
+            self._remove(entry_path)
+            raise KeyError(key)
+        # update mtime, so this entry is the most recently used
+        try:
+            os.utime(entry_path)
+        except FileNotFoundError:
+            # removed by another process
+            pass
+        return result
+
+    def set(self, key, value):
+        """
+        Store `value` in cache, and evict least recently used entries if needed.
+
+        Parameters
+        ----------
+        key: str
+        value: object
+            picklable object
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(tmp_path)
+            entry_path = self._entry_path(key)
+            try:
+                # replaced entry size
+                size -= os.path.getsize(entry_path)
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, entry_path)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            # not picklable: not cached
+            logger.debug("unable to store %s in disk cache: %s" % (key, str(e)))
+            self._remove(tmp_path)
+            return
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+
+        if self.max_size is not None:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += size
+            if self._size > self.max_size:
+                self._evict()
+
+    def _entries(self):
+        """list of (mtime, size, path) for all entries"""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith('.pkl'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """remove least recently used entries, until the cache size is 90% of max_size"""
+        entries = sorted(self._entries())
+        size = sum(size for _, size, _ in entries)
+        target = self.max_size * 0.9
+        evicted = 0
+        for _, entry_size, entry_path in entries:
+            if size <= target:
+                break
+            self._remove(entry_path)
+            size -= entry_size
+            evicted += 1
+        self.evictions += evicted
+        logger.debug("evicted %d entries from disk cache %s" % (evicted, self.cache_dir))
+        self._size = size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """remove all entries from cache"""
+        for _, _, entry_path in self._entries():
+            self._remove(entry_path)
+        self._size = 0
+
 
 class XmlParser:
     """
@@ -29,16 +219,77 @@ class XmlParser:
     namespaces: dict
         xml namespaces, passed to lxml.xpath.
         namespaces are mutualised between all handled xml files.
+    cache_dir: str or None, optional
+        if not None, decoded variables from `get_var` are also stored in this directory,
+        so they can be reused by other processes without parsing xml files. (see `xsar.xml_parser.DiskCache`)
+    cache_size: int or None, optional
+        maximum size of `cache_dir`, in bytes. (default to 1Gb)
+    max_roots: int or None, optional
+        maximum number of parsed xml trees kept in memory. No limit if None (default).
+    max_roots_size: int or None, optional
+        maximum estimated memory used by parsed xml trees, in bytes. No limit if None (default).
+    pickle_vars: bool, optional
+        if True (default), decoded variables are pickled with the parser (see Notes).
+    streamers: dict, optional
+        `{file_type: func}`, where `func(xml_file)` returns raw xpath results for this file type, as `{xpath: list}`.
+        Used instead of the objectify tree (ie with `lxml.etree.iterparse`), for small files read at high rate.
+        xpath not returned by `func` are evaluated from the xml tree.
+
+    Notes
+    -----
+    xpath found in `xpath_mappings` are compiled once (`lxml.etree.XPath`).
+    When a xml file is first accessed by `get_var` or `get_compound_var`,
+    all the xpath for this file type are evaluated in one batch, while the xml tree is loaded.
+
+    When `max_roots` or `max_roots_size` is reached, the least recently used xml tree is removed,
+    with its raw xpath results. Decoded variables (from `get_var` and `get_compound_var`) are kept.
+
+    XmlParser is thread safe. If several threads ask for the same variable (or xml tree) at the same time,
+    only one thread compute it, and others wait for the result.
+
+    When pickled (ie sent to dask distributed workers), the parser is kept lightweight:
+        * xml trees and raw xpath results are never pickled.
+        * decoded variables and already computed compound variables (ie compact lut functions) are pickled,
+          unless `pickle_vars` is False. Compound variables that can't be pickled are rebuilt by the worker
+          from decoded variables, without parsing xml files.
+          If `pickle_vars` is False, workers may warm from a disk cache shared with the client (see `cache_dir`).
     """
 
-    def __init__(self, xpath_mappings={}, compounds_vars={}, namespaces={}):
-        self._xml_roots = {}
+    # parsed xml tree memory is estimated as xml file size * _root_size_factor
+    _root_size_factor = 3
+
+    def __init__(self, xpath_mappings={}, compounds_vars={}, namespaces={}, cache_dir=None, cache_size=1024 ** 3,
+                 max_roots=None, max_roots_size=None, pickle_vars=True, streamers={}):
+        # _lock protects caches structures. _key_locks are per key locks, so a key is computed by only one thread
+        self._lock = threading.RLock()
+        self._key_locks = {}
+        # per thread lxml parsers (a lxml parser can't parse several files at the same time)
+        self._local = threading.local()
+        self._xml_roots = OrderedDict()
+        self._xml_roots_size = {}
+        self.max_roots = max_roots
+        self.max_roots_size = max_roots_size
+        self.pickle_vars = pickle_vars
+        self._stats = Counter()
         self._xpath_cache = {}
         self._var_cache = {}
         self._compounds_vars_cache = {}
+        # {key: bool} picklability of compound variables, checked on first pickling
+        self._compounds_picklable = {}
         self._namespaces = namespaces
         self._xpath_mappings = xpath_mappings
         self._compounds_vars = compounds_vars
+        self._streamers = streamers
+        # {jpath: (func, xpath)} for all leaves in xpath_mappings
+        self._leaves = dict(self._iter_leaves(xpath_mappings))
+        # {file_type: [xpath, ...]}
+        self._file_type_xpaths = {}
+        for jpath, (_, xpath) in self._leaves.items():
+            self._file_type_xpaths.setdefault(jpath.split('.')[0], []).append(xpath)
+        self._compiled_xpaths = {}
+        self._disk_cache = None
+        if cache_dir is not None:
+            self._disk_cache = DiskCache(cache_dir, max_size=cache_size)
 
     def xpath(self, xml_file, path):
         """
@@ -57,23 +308,190 @@ class XmlParser:
             same list as lxml.xpath
 
         """
-        if xml_file not in self._xml_roots:
-            xml_root = objectify.parse(xml_file).getroot()
-            self._namespaces.update(xml_root.nsmap)
-            self._xml_roots[xml_file] = xml_root
+        with self._key_lock(('xpath', xml_file)):
+            with self._lock:
+                xpath_cache = self._xpath_cache.setdefault(xml_file, {})
+            if path not in xpath_cache:
+                logger.debug("xpath no cache hit for '%s' on file %s" % (path, os.path.basename(xml_file)))
+                self._count('xpath_misses')
+                self._xpath_batch(xml_file, [path], xpath_cache)
+            else:
+                logger.debug("xpath cache hit for '%s' on file %s" % (path, os.path.basename(xml_file)))
+                self._count('xpath_hits')
 
-        if xml_file not in self._xpath_cache:
-            self._xpath_cache[xml_file] = {}
+            return xpath_cache[path]
 
-        if path not in self._xpath_cache[xml_file]:
-            logger.debug("xpath no cache hit for '%s' on file %s" % (path, os.path.basename(xml_file)))
-            xml_root = self._xml_roots[xml_file]
-            result = xml_root.xpath(path, namespaces=self._namespaces)
-            self._xpath_cache[xml_file][path] = [getattr(e, 'pyval', e) for e in result]
-        else:
-            logger.debug("xpath cache hit for '%s' on file %s" % (path, os.path.basename(xml_file)))
+    def _xpath_batch(self, xml_file, paths, xpath_cache):
+        """
+        evaluate all `paths` not already in `xpath_cache` for `xml_file`, with only one xml tree access.
+        Must be called with ('xpath', xml_file) key lock held.
+        """
+        paths = [path for path in paths if path not in xpath_cache]
+        if not paths:
+            return
+        xml_root = self._get_root(xml_file)
+        for path in paths:
+            result = self._compiled_xpath(path)(xml_root)
+            xpath_cache[path] = [getattr(e, 'pyval', e) for e in result]
+
+    def _parser(self):
+        """objectify parser for current thread"""
+        try:
+            return self._local.parser
+        except AttributeError:
+            self._local.parser = objectify.makeparser()
+            return self._local.parser
+
+    @contextmanager
+    def _key_lock(self, key):
+        """hold lock for `key`. The lock is removed once no thread holds it or waits for it."""
+        with self._lock:
+            # [lock, number of threads holding or waiting for lock]
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+    def _count(self, name):
+        """increment stats counter `name`"""
+        with self._lock:
+            self._stats[name] += 1
+
+    def _compiled_xpath(self, path):
+        """get compiled `lxml.etree.XPath` for path"""
+        try:
+            return self._compiled_xpaths[path]
+        except KeyError:
+            with self._lock:
+                namespaces = {k: v for k, v in self._namespaces.items() if k is not None}
+            compiled = etree.XPath(path, namespaces=namespaces, smart_strings=False)
+            self._compiled_xpaths[path] = compiled
+            return compiled
+
+    @staticmethod
+    def _iter_leaves(mappings, prefix=None):
+        """yield (jpath, (func, xpath)) for all leaves in mappings. func is None if there is no decoder."""
+        for key, value in mappings.items():
+            jpath = key if prefix is None else '%s.%s' % (prefix, key)
+            if isinstance(value, dict):
+                yield from XmlParser._iter_leaves(value, prefix=jpath)
+            elif isinstance(value, tuple) and callable(value[0]) and isinstance(value[1], str):
+                yield jpath, value
+            elif isinstance(value, str):
+                yield jpath, (None, value)
+
+    def _get_root(self, xml_file):
+        """get parsed xml tree root for xml_file, and mark it as the most recently used"""
+        with self._key_lock(('root', xml_file)):
+            with self._lock:
+                if xml_file in self._xml_roots:
+                    self._stats['roots_hits'] += 1
+                    self._xml_roots.move_to_end(xml_file)
+                    return self._xml_roots[xml_file]
+                self._stats['roots_misses'] += 1
+
+            # parse without holding self._lock, so other files can be parsed at the same time
+            xml_root = objectify.parse(xml_file, parser=self._parser()).getroot()
+            with self._lock:
+                self._namespaces.update(xml_root.nsmap)
+                self._xml_roots[xml_file] = xml_root
+                self._xml_roots_size[xml_file] = os.path.getsize(xml_file) * self._root_size_factor
+                self._evict_roots(keep=xml_file)
+            return xml_root
+
+    def _evict_roots(self, keep=None):
+        """remove least recently used xml roots (and their xpath cache), until max_roots and max_roots_size are honored"""
+
+        def over_budget():
+            if self.max_roots is not None and len(self._xml_roots) > self.max_roots:
+                return True
+            if self.max_roots_size is not None and sum(self._xml_roots_size.values()) > self.max_roots_size:
+                return True
+            return False
+
+        # called with self._lock held
+        while over_budget():
+            xml_file = next(iter(self._xml_roots))
+            if xml_file == keep:
+                # the most recently used root is never evicted
+                break
+            logger.debug("evicting xml root for file %s" % os.path.basename(xml_file))
+            self._stats['roots_evictions'] += 1
+            del self._xml_roots[xml_file]
+            del self._xml_roots_size[xml_file]
+            if self._xpath_cache.pop(xml_file, None) is not None:
+                self._stats['xpath_evictions'] += 1
+
+    def clear_roots(self):
+        """remove all parsed xml trees and raw xpath results from memory. Decoded variables are kept."""
+        with self._lock:
+            self._xml_roots.clear()
+            self._xml_roots_size.clear()
+            self._xpath_cache.clear()
+
+    def clear(self, prefix=None):
+        """
+        remove parsed xml trees, raw xpath results, decoded and compound variables from memory.
+        Disk cache (see `cache_dir`) is not modified.
 
-        return self._xpath_cache[xml_file][path]
+        Parameters
+        ----------
+        prefix: str or None, optional
+            only remove cached values for xml files starting with `prefix` (ie a SAFE path).
+            If None, all values are removed.
+        """
+        if prefix is not None:
+            prefix = os.path.normpath(prefix)
+
+        def match(xml_file):
+            return prefix is None or os.path.normpath(xml_file).startswith(prefix)
+
+        with self._lock:
+            for xml_file in [f for f in self._xml_roots if match(f)]:
+                del self._xml_roots[xml_file]
+                del self._xml_roots_size[xml_file]
+            for xml_file in [f for f in self._xpath_cache if match(f)]:
+                del self._xpath_cache[xml_file]
+            for cache in [self._var_cache, self._compounds_vars_cache, self._compounds_picklable]:
+                for key in [k for k in cache if match(k[0])]:
+                    del cache[key]
+
+    @property
+    def stats(self):
+        """
+        Cache counters, as a dict like `{'roots': {'hits': 2, 'misses': 1, 'evictions': 0}, ...}`.
+
+        Caches are:
+            * roots    : parsed xml trees
+            * stream   : xml files read by `streamers` (misses only)
+            * xpath    : raw xpath results
+            * var      : decoded variables from `get_var`
+            * compound : decoded variables from `get_compound_var`
+            * disk     : disk cache (if `cache_dir` is set)
+
+        Returns
+        -------
+        dict
+        """
+        stats = {}
+        with self._lock:
+            counters = self._stats.copy()
+        for cache in ['roots', 'stream', 'xpath', 'var', 'compound', 'disk']:
+            stats[cache] = {event: counters['%s_%s' % (cache, event)] for event in ['hits', 'misses', 'evictions']}
+        if self._disk_cache is not None:
+            stats['disk']['evictions'] = self._disk_cache.evictions
+        return stats
+
+    def reset_stats(self):
+        """reset cache counters"""
+        with self._lock:
+            self._stats.clear()
 
     def get_var(self, xml_file, jpath):
         """
@@ -92,30 +510,99 @@ class XmlParser:
             xpath list, or decoded object, if a conversion function was specified in xpath_mappings
         """
 
-        if (xml_file, jpath) in self._var_cache:
-            logger.debug("get_var cache hit for jpath '%s' on file %s" % (jpath, os.path.basename(xml_file)))
-            return self._var_cache[(xml_file, jpath)]
-
-        logger.debug("get_var no cache hit for jpath '%s' on file %s" % (jpath, os.path.basename(xml_file)))
-        func = None
-        xpath = jmespath.search(jpath, self._xpath_mappings)
-        if xpath is None:
-            raise KeyError('jmespath "%s" not found in xpath_mappings' % jpath)
-
-        if isinstance(xpath, tuple) and callable(xpath[0]):
-            func, xpath = xpath
+        key = (xml_file, jpath)
+        try:
+            result = self._var_cache[key]
+        except KeyError:
+            with self._key_lock(('var',) + key):
+                # cache is checked again, because another thread may have computed the result while we were waiting
+                if key not in self._var_cache:
+                    logger.debug("get_var no cache hit for jpath '%s' on file %s" % (jpath, os.path.basename(xml_file)))
+                    self._count('var_misses')
+                    self._var_cache[key] = self._get_var(xml_file, jpath)
+                    return self._var_cache[key]
+                result = self._var_cache[key]
+
+        logger.debug("get_var cache hit for jpath '%s' on file %s" % (jpath, os.path.basename(xml_file)))
+        self._count('var_hits')
+        return result
 
-        if not isinstance(xpath, str):
+    def _get_var(self, xml_file, jpath):
+        """get_var, without memory cache"""
+        try:
+            func, xpath = self._leaves[jpath]
+        except KeyError:
+            xpath = jmespath.search(jpath, self._xpath_mappings)
+            if xpath is None:
+                raise KeyError('jmespath "%s" not found in xpath_mappings' % jpath)
             raise NotImplementedError('Non leaf xpath of type "%s" instead of str' % type(xpath).__name__)
 
+        disk_key = None
+        if self._disk_cache is not None:
+            disk_key = self._disk_cache.key(xml_file, jpath, xpath)
+            try:
+                result = self._disk_cache.get(disk_key)
+                logger.debug("get_var disk cache hit for jpath '%s' on file %s" % (jpath, os.path.basename(xml_file)))
+                self._count('disk_hits')
+                return result
+            except KeyError:
+                self._count('disk_misses')
+
+        with self._key_lock(('xpath', xml_file)):
+            with self._lock:
+                xpath_cache = self._xpath_cache.setdefault(xml_file, {})
+            if xpath not in xpath_cache:
+                # first access to this file: get all xpath for this file type
+                file_type = jpath.split('.')[0]
+                if file_type in self._streamers:
+                    logger.debug("streaming file %s" % os.path.basename(xml_file))
+                    self._count('stream_misses')
+                    xpath_cache.update(self._streamers[file_type](xml_file))
+                self._xpath_batch(xml_file, self._file_type_xpaths[file_type], xpath_cache)
         result = self.xpath(xml_file, xpath)
         if func is not None:
             result = func(result)
 
-        self._var_cache[(xml_file, jpath)] = result
+        if disk_key is not None:
+            self._disk_cache.set(disk_key, result)
 
         return result
 
+    def prefetch(self, xml_file, file_type):
+        """
+        Parse `xml_file`, and decode all variables for `file_type`, so subsequent calls to
+        `get_var` or `get_compound_var` for this file will not parse xml.
+        Usefull to load several files from a thread pool (lxml releases the GIL while parsing).
+        Variables not found in `xml_file` (ie not available for this ipf version) are skipped, and will
+        raise on access. If `xml_file` can't be read or parsed, it's skipped, and will raise on access.
+
+        Raises
+        ------
+        Exception
+            decoding errors, for variables found in `xml_file`.
+
+        Parameters
+        ----------
+        xml_file: str
+            xml filename
+        file_type: str
+            first level key in xpath_mappings (ie 'annotation')
+        """
+        for jpath, (_, xpath) in self._leaves.items():
+            if jpath.split('.')[0] != file_type:
+                continue
+            try:
+                self.get_var(xml_file, jpath)
+            except (OSError, etree.XMLSyntaxError) as e:
+                logger.debug("prefetch skipped file %s: %s" % (os.path.basename(xml_file), str(e)))
+                return
+            except Exception as e:
+                if self.xpath(xml_file, xpath):
+                    # variable found, but not decoded: not an ipf version issue
+                    raise
+                logger.debug("prefetch skipped jpath '%s' on file %s: %s" % (
+                    jpath, os.path.basename(xml_file), str(e)))
+
     def get_compound_var(self, xml_file, var_name):
         """
 
@@ -132,12 +619,26 @@ class XmlParser:
 
         """
 
-        if (xml_file, var_name) in self._compounds_vars_cache:
-            logger.debug("get_compound_var cache hit for '%s' on file %s" % (var_name, os.path.basename(xml_file)))
-            return self._compounds_vars_cache[(xml_file, var_name)]
+        key = (xml_file, var_name)
+        try:
+            result = self._compounds_vars_cache[key]
+        except KeyError:
+            with self._key_lock(('compound',) + key):
+                if key not in self._compounds_vars_cache:
+                    logger.debug(
+                        "get_compound_var no cache hit for '%s' on file %s" % (var_name, os.path.basename(xml_file)))
+                    self._count('compound_misses')
+                    self._compounds_vars_cache[key] = self._get_compound_var(xml_file, var_name)
+                    return self._compounds_vars_cache[key]
+                result = self._compounds_vars_cache[key]
+
+        logger.debug("get_compound_var cache hit for '%s' on file %s" % (var_name, os.path.basename(xml_file)))
+        self._count('compound_hits')
+        return result
 
+    def _get_compound_var(self, xml_file, var_name):
+        """get_compound_var, without memory cache"""
         var_object = self._compounds_vars[var_name]
-        logger.debug("get_compound_var no cache hit for '%s' on file %s" % (var_name, os.path.basename(xml_file)))
 
         func = None
         if isinstance(var_object,dict) and 'func' in var_object and callable(var_object['func']):
@@ -164,6 +665,51 @@ class XmlParser:
             # apply converter
             result = func(*result)
 
-        # store result in cache for subsequent call
-        self._compounds_vars_cache[(xml_file, var_name)] = result
         return result
+
+    def __getstate__(self):
+        # see pickling policy in class docstring.
+        state = self.__dict__.copy()
+        for attr in ['_lock', '_key_locks', '_local', '_compiled_xpaths', '_xml_roots', '_xml_roots_size',
+                     '_xpath_cache', '_compounds_vars_cache', '_compounds_picklable', '_stats']:
+            del state[attr]
+        if not self.pickle_vars:
+            del state['_var_cache']
+        else:
+            with self._lock:
+                state['_var_cache'] = self._var_cache.copy()
+                compounds_vars = self._compounds_vars_cache.copy()
+            state['_compounds_vars_cache'] = {
+                key: value for key, value in compounds_vars.items() if self._is_picklable(key, value)}
+        return state
+
+    def _is_picklable(self, key, value):
+        """True if compound variable `value` can be pickled (checked only once by key)"""
+        try:
+            return self._compounds_picklable[key]
+        except KeyError:
+            pass
+        try:
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            picklable = True
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            logger.debug("compound variable %s will not be pickled: %s" % (str(key), str(e)))
+            picklable = False
+        self._compounds_picklable[key] = picklable
+        return picklable
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+        self._key_locks = {}
+        self._local = threading.local()
+        self._compiled_xpaths = {}
+        self._xml_roots = OrderedDict()
+        self._xml_roots_size = {}
+        self._xpath_cache = {}
+        self._compounds_picklable = {}
+        self._stats = Counter()
+        if '_var_cache' not in state:
+            self._var_cache = {}
+        if '_compounds_vars_cache' not in state:
+            self._compounds_vars_cache = {}
@@ -48,6 +48,7 @@ config = _load_config()
 
 from .sentinel1_meta import Sentinel1Meta, SentinelMeta
 from .sentinel1_dataset import Sentinel1Dataset, SentinelDataset
+from .catalog import Catalog
 
 logger = logging.getLogger('xsar')
 """
@@ -78,6 +79,10 @@ def open_dataset(*args, **kwargs):
 
     >>> xsar.Sentinel1Dataset(*args, **kwargs).dataset
 
+    Use `variables` to only build some variables and their dependencies:
+
+    >>> xsar.open_dataset(dataset_id, variables=['sigma0'])
+
     See Also
     --------
     xsar.Sentinel1Dataset
@@ -147,7 +152,101 @@ def apply_cf_convention(dataset):
 
     return dataset
 
-def product_info(path, columns='minimal', include_multi=False, driver='GTiff', _xml_parser=None):
+def _meta2df(meta, columns):
+    """one line dataframe from a Sentinel1Meta object"""
+    df = pd.Series(data=meta.to_dict([c for c in columns if c != 'meta'])).to_frame().T
+    if 'meta' in columns:
+        df['meta'] = meta
+    return df
+
+
+def _product_info_path(path, columns, include_multi, driver, xml_parser):
+    """list of one line dataframes for a SAFE path (with subdatasets if multidataset)"""
+    df_list = []
+    s1meta = Sentinel1Meta(path, xml_parser=xml_parser, driver=driver)
+    if s1meta.multidataset and include_multi:
+        df_list.append(_meta2df(s1meta, columns))
+    elif not s1meta.multidataset:
+        df_list.append(_meta2df(s1meta, columns))
+    if s1meta.multidataset:
+        # subdatasets share the parser and the files list, so the manifest is read only once
+        for n in s1meta.subdatasets:
+            sub_meta = Sentinel1Meta(n, xml_parser=xml_parser, driver=driver, _safe_files=s1meta.safe_files)
+            df_list.append(_meta2df(sub_meta, columns))
+    return df_list
+
+
+def _product_info_batch(paths, columns, include_multi, driver, xml_parser):
+    """`_product_info_path` for several paths, as a dict (path as key)"""
+    res = {}
+    for p in paths:
+        res[p] = _product_info_path(p, columns, include_multi, driver, xml_parser)
+        # parser is shared by all paths: remove cached values for this SAFE, so memory doesn't grow with paths count
+        xml_parser.clear(prefix=_safe_path(p))
+    return res
+
+
+def _safe_path(path):
+    """SAFE path for a SAFE path or gdal url"""
+    if path.startswith('SENTINEL1_DS:'):
+        path = ':'.join(path.split(':')[1:-1])
+    return path
+
+
+def _safe_mtime(path):
+    """manifest modification time (ns) for a SAFE path or gdal url"""
+    return os.stat(os.path.join(_safe_path(path), 'manifest.safe')).st_mtime_ns
+
+
+# pd.Interval columns are stored as '<col>_left' and '<col>_right' in product_info cache file
+_cache_interval_columns = ['time_range']
+
+
+def _read_info_cache(cache_file):
+    """read product_info cache file, as a (Geo)DataFrame with '_source' and '_mtime' columns"""
+    import pyarrow.parquet as pq
+    if b'geo' in (pq.read_schema(cache_file).metadata or {}):
+        df = gpd.read_parquet(cache_file)
+    else:
+        df = pd.read_parquet(cache_file)
+    for col in _cache_interval_columns:
+        if '%s_left' % col in df:
+            df[col] = [
+                pd.Interval(left, right, closed='both') for left, right in zip(df.pop('%s_left' % col),
+                                                                               df.pop('%s_right' % col))
+            ]
+    # same dtypes as a product_info result
+    for col in df.columns:
+        if col not in ['geometry', '_mtime']:
+            df[col] = df[col].astype(object)
+    return df
+
+
+def _write_info_cache(df, cache_file, params=None):
+    """
+    write product_info result `df` (with '_source' and '_mtime' columns) to cache file.
+    `params` (product_info arguments that change rows, like `include_multi`) are stored in parquet metadata,
+    and read back in `df.attrs['product_info']` by `_read_info_cache`.
+    """
+    df = df.drop(columns=['meta'], errors='ignore').reset_index(drop=True)
+    for col in _cache_interval_columns:
+        if col in df:
+            intervals = df.pop(col)
+            df['%s_left' % col] = [i.left for i in intervals]
+            df['%s_right' % col] = [i.right for i in intervals]
+    for col in df.columns:
+        if df[col].dtype == object and col != 'geometry':
+            df[col] = df[col].infer_objects()
+    df.attrs = {}
+    if params is not None:
+        df.attrs['product_info'] = params
+    tmp_file = '%s.tmp%d' % (cache_file, os.getpid())
+    df.to_parquet(tmp_file)
+    os.replace(tmp_file, cache_file)
+
+
+def product_info(path, columns='minimal', include_multi=False, driver='GTiff', scheduler=None, num_workers=None,
+                 cache_file=None, _xml_parser=None):
     """
 
     Parameters
@@ -160,6 +259,17 @@ def product_info(path, columns='minimal', include_multi=False, driver='GTiff', _
         Might be a list of properties from `xsar.Sentinel1Meta`
     include_multi: bool, optional
         False by default: don't include multi datasets
+    scheduler: str or None, optional
+        dask scheduler used to read paths in parallel (ie 'threads', 'processes', or a `dask.distributed.Client`).
+        By default, paths are read sequentially.
+    num_workers: int or None, optional
+        number of workers, for 'threads' or 'processes' scheduler (default to cpu count)
+    cache_file: str or None, optional
+        parquet file, for incremental scans: only paths not found in `cache_file`, or with a modified manifest,
+        are read, and `cache_file` is updated. Requires `pyarrow`.
+        The 'meta' column is not stored in `cache_file`: if requested, it is rebuilt from manifests (fast).
+        If `cache_file` doesn't have all requested columns, or was built with other `include_multi` or `driver`,
+        it's rebuilt from scratch.
 
     Returns
     -------
@@ -187,36 +297,85 @@ def product_info(path, columns='minimal', include_multi=False, driver='GTiff', _
         add_cols.append('path')
     if 'dsid' not in real_cols:
         add_cols.append('dsid')
-
-    def _meta2df(meta):
-        df = pd.Series(data=meta.to_dict(add_cols + real_cols)).to_frame().T
-        if 'meta' in columns:
-            df['meta'] = meta
-        return df
+    # 'meta' column is the last one
+    all_cols = add_cols + real_cols + [c for c in columns if c == 'meta']
 
     if isinstance(path, str):
         path = [path]
+    path = list(path)
 
     if _xml_parser is None:
         _xml_parser = XmlParser(
             xpath_mappings=sentinel1_xml_mappings.xpath_mappings,
             compounds_vars=sentinel1_xml_mappings.compounds_vars,
-            namespaces=sentinel1_xml_mappings.namespaces)
+            namespaces=sentinel1_xml_mappings.namespaces,
+            streamers=sentinel1_xml_mappings.streamers)
+
+    # cached lines, by path
+    cached = {}
+    mtimes = {}
+    cache_df = None
+    # arguments changing the rows: cache is rebuilt if they differ
+    cache_params = {'include_multi': bool(include_multi), 'driver': driver}
+    if cache_file is not None:
+        mtimes = {p: _safe_mtime(p) for p in path}
+        if os.path.exists(cache_file):
+            cache_df = _read_info_cache(cache_file)
+            if not set(add_cols + real_cols).issubset(cache_df.columns):
+                logger.info('product_info cache %s has not all requested columns. Rebuilding.' % cache_file)
+                cache_df = None
+            elif cache_df.attrs.get('product_info') != cache_params:
+                logger.info('product_info cache %s was built with other arguments (%s). Rebuilding.' % (
+                    cache_file, cache_df.attrs.get('product_info')))
+                cache_df = None
+        if cache_df is not None:
+            for p, df_p in cache_df.groupby('_source', sort=False):
+                if p in mtimes and (df_p['_mtime'] == mtimes[p]).all():
+                    cached[p] = df_p
+    todo = [p for p in path if p not in cached]
+
+    if scheduler is None or len(todo) <= 1:
+        computed = _product_info_batch(todo, all_cols, include_multi, driver, _xml_parser)
+    else:
+        import dask
+        n_batches = min(len(todo), 4 * (num_workers or os.cpu_count() or 1))
+        batches = [todo[i::n_batches] for i in range(n_batches)]
+        compute_kwargs = {'scheduler': scheduler}
+        if num_workers is not None:
+            compute_kwargs['num_workers'] = num_workers
+        computed = {}
+        for res in dask.compute(
+                *[dask.delayed(_product_info_batch)(b, all_cols, include_multi, driver, _xml_parser) for b in
+                  batches], **compute_kwargs):
+            computed.update(res)
 
     df_list = []
     for p in path:
-        s1meta = Sentinel1Meta(p, driver=driver)
-        if s1meta.multidataset and include_multi:
-            df_list.append(_meta2df(s1meta))
-        elif not s1meta.multidataset:
-            df_list.append(_meta2df(s1meta))
-        if s1meta.multidataset:
-            for n in s1meta.subdatasets:
-                s1meta = Sentinel1Meta(n, driver=driver)
-                df_list.append(_meta2df(s1meta))
+        if p in computed:
+            df_p = pd.concat(computed[p])
+            if cache_file is not None:
+                df_p['_source'] = p
+                df_p['_mtime'] = mtimes[p]
+        else:
+            df_p = cached[p].copy()
+            if 'meta' in columns:
+                metas = {}
+                for df_meta in _product_info_path(p, ['dsid', 'meta'], include_multi, driver, _xml_parser):
+                    metas[df_meta['dsid'].iloc[0]] = df_meta['meta'].iloc[0]
+                _xml_parser.clear(prefix=_safe_path(p))
+                df_p['meta'] = [metas[dsid] for dsid in df_p['dsid']]
+        df_list.append(df_p)
     df = pd.concat(df_list).reset_index(drop=True)
     if 'geometry' in df:
-        df = gpd.GeoDataFrame(df).set_crs(epsg=4326)
+        df = gpd.GeoDataFrame(df).set_crs(epsg=4326, allow_override=True)
+
+    if cache_file is not None and computed:
+        cache_update = df
+        if cache_df is not None:
+            # keep lines from other paths
+            cache_update = pd.concat([cache_df[~cache_df['_source'].isin(path)], df])
+        _write_info_cache(cache_update, cache_file, params=cache_params)
+    df = df.drop(columns=['_source', '_mtime'], errors='ignore')[all_cols]
 
     df = df.set_index(['path', 'dsid'], drop=False)
     if add_cols:
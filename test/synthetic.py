@@ -0,0 +1,424 @@
+"""
+synthetic Sentinel-1 xml files and SAFEs, with realistic sizes, for tests and benchmarks (no network access needed)
+"""
+import os
+import numpy as np
+
+time_fmt = '2017-09-07T10:30:%09.6f'
+
+
+def _values(arr, fmt='%.6e'):
+    return ' '.join(fmt % v for v in arr)
+
+
+def calibration_xml(path, n_vectors=30, n_pixels=660, atrack_step=600, xtrack_step=40, seed=0):
+    """
+    write a calibration xml file to `path`.
+    IW GRDH calibration files have ~30 vectors of ~660 pixels. EW or SLC files may have hundreds of vectors.
+    """
+    rng = np.random.default_rng(seed)
+    pixels = _values(np.arange(n_pixels) * xtrack_step, '%d')
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<calibration>',
+        '<adsHeader><polarisation>VV</polarisation></adsHeader>',
+        '<calibrationVectorList count="%d">' % n_vectors
+    ]
+    for i in range(n_vectors):
+        sigma0 = 500 + 100 * rng.random(n_pixels)
+        lines.append(
+            '<calibrationVector>'
+            '<azimuthTime>%s</azimuthTime><line>%d</line>'
+            '<pixel count="%d">%s</pixel>'
+            '<sigmaNought count="%d">%s</sigmaNought>'
+            '<betaNought count="%d">%s</betaNought>'
+            '<gamma count="%d">%s</gamma>'
+            '<dn count="%d">%s</dn>'
+            '</calibrationVector>' % (
+                time_fmt % (i * 0.1), i * atrack_step,
+                n_pixels, pixels,
+                n_pixels, _values(sigma0),
+                n_pixels, _values(np.full(n_pixels, 237.)),
+                n_pixels, _values(sigma0 * 0.9),
+                n_pixels, _values(np.full(n_pixels, 237.))
+            )
+        )
+    lines += ['</calibrationVectorList>', '</calibration>']
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines))
+    return path
+
+
+def noise_xml(path, n_range=500, n_pixels=660, n_swaths=3, n_blocks=4, atrack_size=16000, xtrack_size=25000,
+              range_atrack_step=32, azi_atrack_step=100, xtrack_step=40, seed=0):
+    """
+    write a noise xml file (ipf >= 2.9) to `path`.
+    Range noise vectors are sampled every `range_atrack_step` lines.
+    Azimuth noise is made of `n_blocks` blocks per swath.
+    """
+    rng = np.random.default_rng(seed)
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<noise>',
+        '<adsHeader><polarisation>VV</polarisation></adsHeader>',
+        '<noiseRangeVectorList count="%d">' % n_range
+    ]
+    for i in range(n_range):
+        pixels = np.arange(n_pixels) * xtrack_step
+        pixels[-1] = xtrack_size - 1
+        lines.append(
+            '<noiseRangeVector>'
+            '<azimuthTime>%s</azimuthTime><line>%d</line>'
+            '<pixel count="%d">%s</pixel>'
+            '<noiseRangeLut count="%d">%s</noiseRangeLut>'
+            '</noiseRangeVector>' % (
+                time_fmt % (i * 0.01), min(i * range_atrack_step, atrack_size - 1),
+                n_pixels, _values(pixels, '%d'),
+                n_pixels, _values(100 + 50 * rng.random(n_pixels))
+            )
+        )
+    lines.append('</noiseRangeVectorList>')
+
+    n_azi = n_swaths * n_blocks
+    lines.append('<noiseAzimuthVectorList count="%d">' % n_azi)
+    swath_size = xtrack_size // n_swaths
+    block_size = atrack_size // n_blocks
+    for sw in range(n_swaths):
+        for b in range(n_blocks):
+            a_start = b * block_size
+            a_stop = min((b + 1) * block_size, atrack_size) - 1
+            x_start = sw * swath_size
+            x_stop = min((sw + 1) * swath_size, xtrack_size) - 1
+            azi_lines = np.arange(a_start, a_stop + 1, azi_atrack_step)
+            lines.append(
+                '<noiseAzimuthVector>'
+                '<swath>IW%d</swath>'
+                '<firstAzimuthLine>%d</firstAzimuthLine><firstRangeSample>%d</firstRangeSample>'
+                '<lastAzimuthLine>%d</lastAzimuthLine><lastRangeSample>%d</lastRangeSample>'
+                '<line count="%d">%s</line>'
+                '<noiseAzimuthLut count="%d">%s</noiseAzimuthLut>'
+                '</noiseAzimuthVector>' % (
+                    sw + 1, a_start, x_start, a_stop, x_stop,
+                    azi_lines.size, _values(azi_lines, '%d'),
+                    azi_lines.size, _values(0.9 + 0.2 * rng.random(azi_lines.size))
+                )
+            )
+    lines += ['</noiseAzimuthVectorList>', '</noise>']
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines))
+    return path
+
+
+def xml_dir():
+    """temporary directory for synthetic files"""
+    import tempfile
+    path = os.path.join(tempfile.gettempdir(), 'xsar_benchmarks')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+# acquisition modes: image shape (atrack, xtrack), geolocation grid shape, and pixel spacing in meters
+modes = {
+    'IW': {'shape': (16700, 25500), 'grid': (10, 21), 'spacing': (10., 10.), 'product': 'GRDH'},
+    'EW': {'shape': (10300, 10500), 'grid': (10, 21), 'spacing': (40., 40.), 'product': 'GRDM'},
+    'WV': {'shape': (5700, 4900), 'grid': (10, 10), 'spacing': (4.1, 3.3), 'product': 'SLC_'},
+}
+
+# geolocation cases: mode and kwargs for `geolocation`
+geometries = {
+    'IW': {'mode': 'IW'},
+    'EW': {'mode': 'EW'},
+    'WV': {'mode': 'WV'},
+    'antemeridian': {'mode': 'IW', 'lon0': 179.5, 'lat0': 50.},
+    'polar': {'mode': 'EW', 'lon0': 10., 'lat0': 80.},
+}
+
+
+def geolocation(atracks, xtracks, lon0=-67., lat0=20., heading=-12., spacing=(10., 10.)):
+    """
+    synthetic lon/lat for atracks/xtracks, for a right looking sensor starting at (lon0, lat0).
+    The geometry is not affine, because of the earth curvature.
+    Longitudes are in [-180, 180] range, so the footprint may cross the antemeridian.
+    """
+    r = 6371000.
+    dist_a = np.asarray(atracks, dtype=float) * spacing[0]
+    dist_x = np.asarray(xtracks, dtype=float) * spacing[1]
+    h_a = np.deg2rad(heading)
+    h_x = np.deg2rad(heading + 90)
+    north = dist_a * np.cos(h_a) + dist_x * np.cos(h_x)
+    east = dist_a * np.sin(h_a) + dist_x * np.sin(h_x)
+    lat = lat0 + np.rad2deg(north / r)
+    lon = lon0 + np.rad2deg(east / (r * np.cos(np.deg2rad(lat))))
+    lon = (lon + 180) % 360 - 180
+    return lon, lat
+
+
+def gcps_grid(mode='IW', margin=(0, 0), **kwargs):
+    """
+    atracks, xtracks (1D) and lon, lat (2D) geolocation grid for `mode`.
+    The grid doesn't cover the last `margin` (atrack, xtrack) lines and pixels of the image.
+    kwargs are passed to `geolocation`.
+    """
+    shape = modes[mode]['shape']
+    grid = modes[mode]['grid']
+    atracks = np.linspace(0, shape[0] - 1 - margin[0], grid[0]).round().astype(int)
+    xtracks = np.linspace(0, shape[1] - 1 - margin[1], grid[1]).round().astype(int)
+    xtracks2D, atracks2D = np.meshgrid(xtracks, atracks)
+    kwargs.setdefault('spacing', modes[mode]['spacing'])
+    lon, lat = geolocation(atracks2D, xtracks2D, **kwargs)
+    return atracks, xtracks, lon, lat
+
+
+def annotation_xml(path, pol, atracks, xtracks, lon, lat, start=0., stop=25., n_filler=2000):
+    """
+    write an annotation xml file to `path`, with geolocation grid from `gcps_grid`.
+    `n_filler` elements are added to get a realistic file size.
+    """
+    incidence = 30 + 16 * xtracks / xtracks[-1]
+    points = []
+    for ia, a in enumerate(atracks):
+        for ix, x in enumerate(xtracks):
+            points.append(
+                '<geolocationGridPoint><azimuthTime>%s</azimuthTime><slantRangeTime>5.3e-03</slantRangeTime>'
+                '<line>%d</line><pixel>%d</pixel><latitude>%.12f</latitude><longitude>%.12f</longitude>'
+                '<height>0.0</height><incidenceAngle>%.10f</incidenceAngle><elevationAngle>%.10f</elevationAngle>'
+                '</geolocationGridPoint>' % (
+                    time_fmt % (start + (stop - start) * ia / len(atracks)), a, x, lat[ia, ix], lon[ia, ix],
+                    incidence[ix], incidence[ix] - 3.5
+                )
+            )
+    filler = ''.join(
+        '<orbit><time>%s</time><frame>Earth Fixed</frame><position><x>1.0e6</x><y>2.0e6</y><z>3.0e6</z></position>'
+        '<velocity><x>1.0e3</x><y>2.0e3</y><z>3.0e3</z></velocity></orbit>' % (time_fmt % (i * 0.01))
+        for i in range(n_filler))
+    content = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<product>'
+        '<adsHeader><polarisation>%s</polarisation></adsHeader>'
+        '<generalAnnotation><productInformation><pass>Ascending</pass><platformHeading>-1.2e+01</platformHeading>'
+        '</productInformation><orbitList count="%d">%s</orbitList></generalAnnotation>'
+        '<imageAnnotation><imageInformation>'
+        '<productFirstLineUtcTime>%s</productFirstLineUtcTime><productLastLineUtcTime>%s</productLastLineUtcTime>'
+        '</imageInformation><processingInformation>'
+        '<thermalNoiseCorrectionPerformed>false</thermalNoiseCorrectionPerformed>'
+        '</processingInformation></imageAnnotation>'
+        '<geolocationGrid><geolocationGridPointList count="%d">%s</geolocationGridPointList></geolocationGrid>'
+        '</product>' % (pol, n_filler, filler, time_fmt % start, time_fmt % stop, len(points), ''.join(points))
+    )
+    with open(path, 'w') as f:
+        f.write(content)
+    return path
+
+
+def measurement_tiff(path, atracks, xtracks, lon, lat, shape):
+    """write a sparse (empty) measurement tiff of `shape`, with gcps from `gcps_grid`"""
+    import rasterio
+    from rasterio.control import GroundControlPoint
+    gcps = [
+        GroundControlPoint(row=a, col=x, x=lon[ia, ix], y=lat[ia, ix], z=0.)
+        for ia, a in enumerate(atracks) for ix, x in enumerate(xtracks)
+    ]
+    with rasterio.open(path, 'w', driver='GTiff', height=shape[0], width=shape[1], count=1, dtype='uint16',
+                       tiled=True, sparse_ok=True, gcps=gcps, crs='EPSG:4326'):
+        pass
+    return path
+
+
+manifest_template = """<?xml version="1.0" encoding="UTF-8"?>
+<xfdu:XFDU xmlns:xfdu="urn:ccsds:schema:xfdu:1" xmlns:gml="http://www.opengis.net/gml"
+ xmlns:safe="http://www.esa.int/safe/sentinel-1.0" xmlns:s1="http://www.esa.int/safe/sentinel-1.0/sentinel-1"
+ xmlns:s1sar="http://www.esa.int/safe/sentinel-1.0/sentinel-1/sar"
+ xmlns:s1sarl1="http://www.esa.int/safe/sentinel-1.0/sentinel-1/sar/level-1" version="esa/safe/sentinel-1.0">
+  <metadataSection>
+    <metadataObject ID="processing" classification="PROVENANCE" category="PDI">
+      <metadataWrap mimeType="text/xml" vocabularyName="SAFE" textInfo="Processing">
+        <xmlData>
+          <safe:processing name="GRD Post Processing">
+            <safe:facility country="France" name="Synthetic" organisation="ESA" site="Synthetic">
+              <safe:software name="Sentinel-1 IPF" version="002.84"/>
+            </safe:facility>
+            <safe:resource name="raw" role="Raw Data">
+              <safe:processing name="L0 Processing">
+                <safe:facility name="Synthetic L0"><safe:software name="Sentinel-1 IPF" version="001.00"/></safe:facility>
+              </safe:processing>
+            </safe:resource>
+          </safe:processing>
+        </xmlData>
+      </metadataWrap>
+    </metadataObject>
+    <metadataObject ID="platform" classification="DESCRIPTION" category="DMD">
+      <metadataWrap mimeType="text/xml" vocabularyName="SAFE" textInfo="Platform Description">
+        <xmlData>
+          <safe:platform>
+            <safe:nssdcIdentifier>2014-016A</safe:nssdcIdentifier>
+            <safe:familyName>SENTINEL-1</safe:familyName>
+            <safe:number>A</safe:number>
+            <safe:instrument>
+              <safe:familyName abbreviation="SAR">Synthetic Aperture Radar</safe:familyName>
+              <safe:extension>
+                <s1sarl1:instrumentMode><s1sarl1:mode>{mode}</s1sarl1:mode></s1sarl1:instrumentMode>
+              </safe:extension>
+            </safe:instrument>
+          </safe:platform>
+        </xmlData>
+      </metadataWrap>
+    </metadataObject>
+    <metadataObject ID="generalProductInformation" classification="DESCRIPTION" category="DMD">
+      <metadataWrap mimeType="text/xml" vocabularyName="SAFE" textInfo="General Product Information">
+        <xmlData>
+          <s1sarl1:standAloneProductInformation>
+            <s1sarl1:productClass>S</s1sarl1:productClass>
+            {polarisations}
+            <s1sarl1:productType>{product_type}</s1sarl1:productType>
+          </s1sarl1:standAloneProductInformation>
+        </xmlData>
+      </metadataWrap>
+    </metadataObject>
+    <metadataObject ID="acquisitionPeriod" classification="DESCRIPTION" category="DMD">
+      <metadataWrap mimeType="text/xml" vocabularyName="SAFE" textInfo="Acquisition Period">
+        <xmlData>
+          <safe:acquisitionPeriod>
+            <safe:startTime>{start}</safe:startTime>
+            <safe:stopTime>{stop}</safe:stopTime>
+          </safe:acquisitionPeriod>
+        </xmlData>
+      </metadataWrap>
+    </metadataObject>
+    <metadataObject ID="measurementFrameSet" classification="DESCRIPTION" category="DMD">
+      <metadataWrap mimeType="text/xml" vocabularyName="SAFE" textInfo="Frame Set">
+        <xmlData>
+          <safe:frameSet>
+            {frames}
+          </safe:frameSet>
+        </xmlData>
+      </metadataWrap>
+    </metadataObject>
+  </metadataSection>
+  <dataObjectSection>
+    {data_objects}
+  </dataObjectSection>
+</xfdu:XFDU>
+"""
+
+
+def safe(root_dir, mode='IW', pols=('VV', 'VH'), n_subdatasets=1, start='20170907T103020', stop='20170907T103045',
+         measurement=True, margin=(0, 0), **kwargs):
+    """
+    write a synthetic SAFE in `root_dir`, with manifest, annotation, calibration and noise xml files,
+    and empty measurement tiffs with gcps.
+
+    Parameters
+    ----------
+    root_dir: str
+    mode: str
+        key in `modes` ('IW', 'EW', 'WV').
+    pols: tuple of str
+    n_subdatasets: int
+        number of subdatasets (ie 'WV' imagettes). SAFE is a multidataset if > 1.
+    measurement: bool
+        if False, measurement tiffs are not written (enough for manifest reading)
+    margin: tuple of int
+        (atrack, xtrack) lines and pixels at the end of the image, not covered by the geolocation grid.
+    kwargs: dict
+        passed to `geolocation` (ie lon0, lat0, heading)
+
+    Returns
+    -------
+    str
+        SAFE path
+    """
+    pol_code = {('VV', 'VH'): 'DV', ('HH', 'HV'): 'DH', ('VV',): 'SV', ('HH',): 'SH'}[tuple(pols)]
+    product = modes[mode]['product']
+    name = 'S1A_%s_%s_1S%s_%s_%s_018268_01EB76_S%03d.SAFE' % (
+        mode, product, pol_code, start, stop, n_subdatasets)
+    path = os.path.join(root_dir, name)
+    for d in ['annotation/calibration', 'measurement']:
+        os.makedirs(os.path.join(path, d), exist_ok=True)
+
+    atracks, xtracks, lon, lat = gcps_grid(mode, margin=margin, **kwargs)
+    shape = modes[mode]['shape']
+    start_iso = '%s-%s-%sT%s:%s:%s.000000' % (start[0:4], start[4:6], start[6:8], start[9:11], start[11:13], start[13:])
+    stop_iso = '%s-%s-%sT%s:%s:%s.000000' % (stop[0:4], stop[4:6], stop[6:8], stop[9:11], stop[11:13], stop[13:])
+    data_objects = []
+    frames = []
+    for sub in range(n_subdatasets):
+        # subdatasets are shifted along track
+        sub_lon, sub_lat = geolocation(
+            atracks[:, None] + sub * shape[0] * 2, xtracks[None, :],
+            **dict(kwargs, spacing=kwargs.get('spacing', modes[mode]['spacing'])))
+        corners = [(sub_lat[a, x], sub_lon[a, x]) for a, x in [(0, 0), (0, -1), (-1, -1), (-1, 0)]]
+        frames.append(
+            '<safe:frame><safe:footPrint srsName="http://www.opengis.net/gml/srs/epsg.xml#4326">'
+            '<gml:coordinates>%s</gml:coordinates></safe:footPrint></safe:frame>' % ' '.join(
+                '%f,%f' % c for c in corners))
+        for ipol, pol in enumerate(pols):
+            num = sub + 1 if n_subdatasets > 1 else ipol + 1
+            swath = '%s%d' % (mode.lower(), sub % 2 + 1) if n_subdatasets > 1 else mode.lower()
+            base = 's1a-%s-%s-%s-%s-%s-018268-01eb76-%03d' % (
+                swath, product[:3].lower(), pol.lower(), start.lower(), stop.lower(), num)
+            files = {
+                's1Level1ProductSchema': 'annotation/%s.xml' % base,
+                's1Level1CalibrationSchema': 'annotation/calibration/calibration-%s.xml' % base,
+                's1Level1NoiseSchema': 'annotation/calibration/noise-%s.xml' % base,
+                's1Level1MeasurementSchema': 'measurement/%s.tiff' % base,
+            }
+            annotation_xml(os.path.join(path, files['s1Level1ProductSchema']), pol, atracks, xtracks, sub_lon,
+                           sub_lat)
+            calibration_xml(os.path.join(path, files['s1Level1CalibrationSchema']),
+                            n_vectors=shape[0] // 600 + 2, n_pixels=shape[1] // 40 + 1)
+            noise_xml(os.path.join(path, files['s1Level1NoiseSchema']), n_range=shape[0] // 400 + 2,
+                      n_pixels=shape[1] // 40 + 1, atrack_size=shape[0], xtrack_size=shape[1])
+            if measurement:
+                measurement_tiff(os.path.join(path, files['s1Level1MeasurementSchema']), atracks, xtracks, sub_lon,
+                                 sub_lat, shape)
+            for rep_id, f in files.items():
+                data_objects.append(
+                    '<dataObject ID="%s" repID="%s"><byteStream mimeType="text/xml" size="1">'
+                    '<fileLocation locatorType="URL" href="./%s"/></byteStream></dataObject>' % (
+                        os.path.basename(f).replace('.', '_'), rep_id, f))
+
+    manifest = manifest_template.format(
+        mode=mode, product_type=product[:3].rstrip('_'),
+        polarisations='\n'.join(
+            '<s1sarl1:transmitterReceiverPolarisation>%s</s1sarl1:transmitterReceiverPolarisation>' % p for p in pols),
+        start=start_iso, stop=stop_iso, frames='\n'.join(frames), data_objects='\n'.join(data_objects))
+    with open(os.path.join(path, 'manifest.safe'), 'w') as f:
+        f.write(manifest)
+    return path
+
+
+def product_info_frame(n, seed=0):
+    """
+    GeoDataFrame like `xsar.product_info(..., columns='spatial')`, with `n` random footprints and time ranges
+    over one year.
+    """
+    import pandas as pd
+    import geopandas as gpd
+    from shapely.geometry import box
+    rng = np.random.default_rng(seed)
+    lon = rng.uniform(-180, 175, n)
+    lat = rng.uniform(-80, 75, n)
+    start = pd.Timestamp('2017-01-01') + pd.to_timedelta(rng.uniform(0, 365 * 86400, n), unit='s')
+    duration = pd.to_timedelta(rng.uniform(20, 300, n), unit='s')
+    df = gpd.GeoDataFrame(
+        {
+            'path': ['/data/S1A_%07d.SAFE' % i for i in range(n)],
+            'dsid': ['IW'] * n,
+            'name': ['SENTINEL1_DS:/data/S1A_%07d.SAFE:IW' % i for i in range(n)],
+            'time_range': [pd.Interval(s, s + d, closed='both') for s, d in zip(start, duration)],
+            'geometry': [box(x, y, x + 2.5, y + 2) for x, y in zip(lon, lat)]
+        }, crs='EPSG:4326')
+    return df.set_index(['path', 'dsid'])
+
+
+def cached_safe(mode='IW', name=None, **kwargs):
+    """
+    synthetic SAFE path, created once in `xml_dir()/safe_<name>` (name default to mode).
+    kwargs are passed to `safe`.
+    """
+    import glob
+    root_dir = os.path.join(xml_dir(), 'safe_%s' % (name or mode))
+    found = glob.glob(os.path.join(root_dir, '*.SAFE'))
+    if found:
+        return found[0]
+    return safe(root_dir, mode=mode, **kwargs)
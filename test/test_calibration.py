@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+import dask
+import dask.array
+import xarray as xr
+from xsar import sentinel1_xml_mappings as mappings
+from xsar.interpolate import RectBilinear
+from xsar.calibration import calibrate_dataarray
+
+
+@pytest.fixture
+def dn():
+    rng = np.random.default_rng(0)
+    dn_values = rng.integers(0, 500, (2, 900, 1300)).astype('u2')
+    return xr.DataArray(dask.array.from_array(dn_values, chunks=(1, 400, 600)), dims=('pol', 'atrack', 'xtrack'),
+                        coords={'pol': ['VV', 'VH'], 'atrack': np.arange(900) + 0.5, 'xtrack': np.arange(1300) + 3.})
+
+
+@pytest.fixture
+def luts_f():
+    rng = np.random.default_rng(1)
+    grid_atracks = np.linspace(0, 1000, 7).round()
+    grid_xtracks = np.linspace(0, 1500, 40).round()
+    return {(var_name, pol): RectBilinear(grid_atracks, grid_xtracks, 300 + 100 * rng.random((7, 40)))
+            for var_name in ['sigma0_raw', 'gamma0_raw'] for pol in ['VV', 'VH']}
+
+
+def test_calibrate_dataarray(dn, luts_f):
+    pols = dn.pol.values.tolist()
+    var_names = ['sigma0_raw', 'gamma0_raw']
+    lut_f = dask.delayed(RectBilinear.stack)([luts_f[(var_name, pol)] for var_name in var_names for pol in pols])
+    ds = calibrate_dataarray(dn, lut_f, var_names, dtype='f4')
+    assert ds.sigma0_raw.chunks == dn.chunks
+    ds = ds.compute()
+    for var_name in var_names:
+        # like abs(dn) ** 2 / lut ** 2, with full resolution luts
+        lut = np.stack([luts_f[(var_name, pol)](dn.atrack.values, dn.xtrack.values) for pol in pols])
+        expected = (np.abs(dn.values) ** 2. / lut ** 2)
+        expected[expected <= 0] = np.nan
+        assert ds[var_name].dtype == np.float32
+        np.testing.assert_array_equal(ds[var_name].values, expected.astype('f4'))
+
+
+def test_calibrate_dataarray_noise(dn, luts_f):
+    pols = dn.pol.values.tolist()
+    rng = np.random.default_rng(2)
+    noise_f = {}
+    for pol in pols:
+        lines = np.arange(0, 1000, 97)
+        pixels = [np.arange(0, 1400, 40)] * lines.size
+        noise_range = mappings.noise_lut_range(lines, pixels, [50 + rng.random(p.size) for p in pixels])
+        noise_azi = mappings.noise_lut_azi([np.arange(0, 900, 100)] * 2, [0, 0], [899, 899], [0, 700], [699, 1399],
+                                           [0.9 + 0.2 * rng.random(9) for _ in range(2)], ['IW1', 'IW2'])
+        noise_f[pol] = (noise_range, noise_azi)
+    var_names = ['sigma0_raw']
+    lut_f = RectBilinear.stack([luts_f[('sigma0_raw', pol)] for pol in pols])
+    ds = calibrate_dataarray(dn, lut_f, var_names, noise_f=[noise_f[pol] for pol in pols], denoise=True).compute()
+    assert set(ds.data_vars) == {'sigma0_raw', 'nesz', 'sigma0'}
+
+    # like previous xarray expressions, with full resolution luts
+    a, x = dn.atrack.values, dn.xtrack.values
+    lut = np.stack([luts_f[('sigma0_raw', pol)](a, x) for pol in pols])
+    noise_lut = np.stack([noise_f[pol][0](a, x).astype('f4') * noise_f[pol][1](a, x).astype('f4') for pol in pols])
+    sigma0_raw = np.abs(dn.values) ** 2. / lut ** 2
+    sigma0_raw[~(sigma0_raw > 0)] = np.nan
+    nesz = noise_lut / lut ** 2
+    np.testing.assert_array_equal(ds.sigma0_raw.values, sigma0_raw)
+    np.testing.assert_array_equal(ds.nesz.values, nesz)
+    np.testing.assert_array_equal(ds.sigma0.values, np.clip(sigma0_raw - nesz, 0, None))
+    assert np.any(ds.sigma0.values == 0)
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+from shapely.geometry import box
+import xsar
+import synthetic
+
+
+def brute_force(df, geometry, start, stop, predicate='intersects'):
+    start, stop = pd.Timestamp(start), pd.Timestamp(stop)
+    spatial_mask = df.geometry.intersects(geometry) if predicate == 'intersects' else df.geometry.within(geometry)
+    mask = spatial_mask & np.array([i.right >= start and i.left <= stop for i in df.time_range])
+    return set(df.index[mask])
+
+
+def test_catalog_query(tmp_path):
+    df = synthetic.product_info_frame(2000)
+    catalog = xsar.Catalog(df.iloc[:1500])
+    catalog.add(df.iloc[1000:])  # overlapping insert
+    assert len(catalog) == 2000
+
+    geometry = box(-20, -10, 30, 40)
+    start, stop = '2017-03-01', '2017-06-15 12:00'
+    found = catalog.query(geometry=geometry, start=start, stop=stop)
+    assert set(found.index) == brute_force(df, geometry, start, stop)
+    assert len(found) > 0
+    assert set(catalog.query_index(geometry=geometry, start=start, stop=stop)) == set(found.index)
+    contained = catalog.query(geometry=geometry, start=start, stop=stop, predicate='contains')
+    assert set(contained.index) == brute_force(df, geometry, start, stop, predicate='contains')
+
+    # point query, without time
+    lon, lat = df.geometry.iloc[0].centroid.coords[0]
+    assert df.index[0] in catalog.query(geometry=(lon, lat)).index
+
+    # small inserts are scanned without rebuilding the index
+    indexed = catalog._df
+    new_df = synthetic.product_info_frame(300, seed=1)
+    new_df.index = df.index[:300]  # replace datasets
+    all_df = pd.concat([df.iloc[300:], new_df])
+    for i in range(3):
+        catalog.add(new_df.iloc[i * 100:(i + 1) * 100])
+        found_delta = catalog.query(geometry=geometry, start=start, stop=stop)
+        assert catalog._df is indexed
+    assert set(found_delta.index) == brute_force(all_df, geometry, start, stop)
+    assert found_delta.index.equals(catalog.query_index(geometry=geometry, start=start, stop=stop))
+    assert found_delta.time_range.map(lambda i: i.left).is_monotonic_increasing
+    assert len(catalog) == 2000
+    assert set(catalog.query(geometry=geometry, start=start, stop=stop, predicate='contains').index) == \
+        brute_force(all_df, geometry, start, stop, predicate='contains')
+    # delta is merged above delta_size
+    catalog.delta_size = 250
+    catalog.add(new_df.iloc[:1])
+    assert set(catalog.query(geometry=geometry, start=start, stop=stop).index) == set(found_delta.index)
+    assert catalog._df is not indexed and catalog._delta is None
+    found = found_delta
+
+    # persistence
+    catalog_file = str(tmp_path / 'catalog.parquet')
+    catalog.save(catalog_file)
+    catalog = xsar.Catalog.open(catalog_file)
+    assert set(catalog.query(geometry=geometry, start=start, stop=stop).index) == set(found.index)
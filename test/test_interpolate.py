@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from scipy.interpolate import RectBivariateSpline
+from xsar.interpolate import RectBilinear, bracket
+
+
+@pytest.fixture
+def grid():
+    rng = np.random.default_rng(0)
+    atracks = np.cumsum(rng.uniform(500, 2000, 10))
+    xtracks = np.cumsum(rng.uniform(500, 2000, 21))
+    values = rng.normal(size=(3, atracks.size, xtracks.size))
+    return atracks, xtracks, values
+
+
+def test_bracket():
+    idx, weight = bracket(np.array([0., 10., 30.]), np.array([-5., 0., 5., 10., 20., 30., 40.]))
+    np.testing.assert_array_equal(idx, [0, 0, 0, 1, 1, 1, 1])
+    np.testing.assert_allclose(weight, [0, 0, 0.5, 0, 0.5, 1, 1])
+
+
+def test_rect_bilinear(grid):
+    atracks, xtracks, values = grid
+    rng = np.random.default_rng(1)
+    # grid coordinates, with knots and out of bounds coordinates (clamped, like RectBivariateSpline)
+    a = np.sort(np.concatenate([atracks, rng.uniform(atracks[0] - 300, atracks[-1] + 300, 200)]))
+    x = np.sort(np.concatenate([xtracks, rng.uniform(xtracks[0] - 300, xtracks[-1] + 300, 300)]))
+    # unsorted points
+    pa, px = rng.uniform(atracks[0] - 300, atracks[-1] + 300, (2, 50, 20))
+
+    multi_f = RectBilinear(atracks, xtracks, values)
+    assert multi_f(a, x).shape == (3, a.size, x.size)
+    assert multi_f.ev(pa, px).shape == (3, 50, 20)
+    for v, multi_grid, multi_points in zip(values, multi_f(a, x), multi_f.ev(pa, px)):
+        spline_f = RectBivariateSpline(atracks, xtracks, v, kx=1, ky=1)
+        lut_f = RectBilinear(atracks, xtracks, v)
+        np.testing.assert_allclose(lut_f(a, x), spline_f(a, x), rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(lut_f.ev(pa, px), spline_f.ev(pa, px), rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(lut_f(pa.ravel(), px.ravel(), grid=False), spline_f.ev(pa.ravel(), px.ravel()),
+                                   rtol=1e-12, atol=1e-12)
+        np.testing.assert_array_equal(multi_grid, lut_f(a, x))
+        np.testing.assert_array_equal(multi_points, lut_f.ev(pa, px))
+
+    with pytest.raises(ValueError):
+        RectBilinear(atracks, xtracks, values[:, 1:])
+
+
+def test_rect_bilinear_stack(grid):
+    atracks, xtracks, values = grid
+    a = np.linspace(atracks[0] - 300, atracks[-1] + 300, 500)
+    x = np.linspace(xtracks[0] - 300, xtracks[-1] + 300, 700)
+    f0 = RectBilinear(atracks, xtracks, values[0])
+    f1 = RectBilinear(atracks, xtracks, values[1:])
+    # different grid: stacked on union grid, without loss
+    f2 = RectBilinear(atracks[::2] + 100, xtracks[1::3], values[0, ::2, 1::3])
+    stacked = RectBilinear.stack([f0, f1, f2])
+    assert stacked.values.shape[0] == 4
+    res = stacked(a, x)
+    np.testing.assert_allclose(res[0], f0(a, x), rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(res[1:3], f1(a, x), rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(res[3], f2(a, x), rtol=1e-12, atol=1e-12)
+    # blocks of a subset of variables
+    for rows, block in stacked.blocks(a, x, variables=[3, 1]):
+        np.testing.assert_array_equal(block, res[[3, 1], rows])
+
+
+def test_solve(grid):
+    atracks, xtracks, _ = grid
+    # smooth and invertible, like lon/lat
+    xtracks2D, atracks2D = np.meshgrid(xtracks, atracks)
+    lonlat = np.stack([
+        atracks2D / 1000 + 0.5 * np.sin(xtracks2D / 5000),
+        xtracks2D / 1000 + 0.5 * np.cos(atracks2D / 4000)
+    ])
+    lonlat_f = RectBilinear(atracks, xtracks, lonlat)
+    rng = np.random.default_rng(2)
+    a = rng.uniform(atracks[0], atracks[-1], 1000)
+    x = rng.uniform(xtracks[0], xtracks[-1], 1000)
+    a[0] = np.nan
+    targets = lonlat_f.ev(a, x)
+    # first guess in the middle of the grid
+    a_solved, x_solved, residuals = lonlat_f.solve(targets, atracks.mean(), xtracks.mean(), tol=1e-6)
+    assert np.isnan(residuals[0]) and np.isnan(a_solved[0])
+    assert np.all(residuals[1:] < 1e-6)
+    np.testing.assert_allclose(a_solved[1:], a[1:], atol=1e-6)
+    np.testing.assert_allclose(x_solved[1:], x[1:], atol=1e-6)
+
+    # not enough iterations
+    _, _, residuals = lonlat_f.solve(targets, atracks.mean(), xtracks.mean(), tol=1e-6, max_iter=1)
+    assert np.any(residuals > 1e-6)
+
+    with pytest.raises(ValueError):
+        RectBilinear(atracks, xtracks, np.stack([lonlat[0]] * 3)).solve(targets, 0, 0)
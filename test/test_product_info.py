@@ -0,0 +1,74 @@
+import os
+import xsar
+from xsar import xsar as xsar_module
+from xsar import sentinel1_xml_mappings
+from xsar.xml_parser import XmlParser
+import synthetic
+
+
+def safes(root_dir):
+    paths = [synthetic.safe(str(root_dir), 'IW', measurement=False, start='20170907T1030%02d' % i) for i in range(2)]
+    paths.append(synthetic.safe(str(root_dir), 'WV', pols=('VV',), n_subdatasets=3, measurement=False))
+    return paths
+
+
+def test_product_info_parallel(tmp_path):
+    paths = safes(tmp_path)
+    df = xsar.product_info(paths, include_multi=True)
+    assert len(df) == 2 + 1 + 3
+    assert df.index.names == ['path', 'dsid']
+    df_threads = xsar.product_info(paths, include_multi=True, scheduler='threads', num_workers=2)
+    columns = [c for c in df.columns if c != 'meta']
+    assert df_threads[columns].equals(df[columns])
+
+
+def test_product_info_parser_memory(tmp_path, monkeypatch):
+    paths = safes(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    parser = XmlParser(
+        xpath_mappings=sentinel1_xml_mappings.xpath_mappings,
+        compounds_vars=sentinel1_xml_mappings.compounds_vars,
+        namespaces=sentinel1_xml_mappings.namespaces,
+        streamers=sentinel1_xml_mappings.streamers)
+    # relative paths, normalized by the parser
+    xsar.product_info([os.path.join('.', os.path.basename(p)) for p in paths], include_multi=True,
+                      _xml_parser=parser)
+    # cached values are removed after each SAFE
+    assert not parser._var_cache and not parser._compounds_vars_cache
+    assert not parser._xml_roots and not parser._xpath_cache
+
+
+def test_product_info_cache(tmp_path, monkeypatch):
+    paths = safes(tmp_path)
+    cache_file = str(tmp_path / 'product_info.parquet')
+    df = xsar.product_info(paths, include_multi=True)
+    xsar.product_info(paths[:2], include_multi=True, cache_file=cache_file)
+
+    # only new or modified SAFEs are read
+    read_paths = []
+    product_info_path = xsar_module._product_info_path
+
+    def _product_info_path(path, columns, *args):
+        if columns != ['dsid', 'meta']:  # not a 'meta' column rebuild
+            read_paths.append(path)
+        return product_info_path(path, columns, *args)
+
+    monkeypatch.setattr(xsar_module, '_product_info_path', _product_info_path)
+    df_cache = xsar.product_info(paths, include_multi=True, cache_file=cache_file)
+    assert read_paths == paths[2:]
+    assert df_cache.drop(columns='meta').equals(df.drop(columns='meta'))
+    assert df_cache['meta'].iloc[0].name == df['meta'].iloc[0].name
+
+    os.utime(os.path.join(paths[0], 'manifest.safe'), ns=(0, 0))
+    read_paths.clear()
+    xsar.product_info(paths, include_multi=True, columns=['name', 'ipf'], cache_file=cache_file)
+    assert read_paths == paths[:1]
+
+    # cache built with other arguments is not used
+    read_paths.clear()
+    df_single = xsar.product_info(paths, include_multi=False, cache_file=cache_file)
+    assert read_paths == paths
+    assert len(df_single) == len(df) - 1
+    read_paths.clear()
+    xsar.product_info(paths, include_multi=False, cache_file=cache_file)
+    assert read_paths == []
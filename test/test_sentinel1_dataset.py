@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+import xsar
+from xsar.sentinel1_dataset import _resolve_dependencies
+import synthetic
+
+dependencies = {
+    'sigma0_raw': ['sigma0_lut'],
+    'nesz': ['sigma0_lut', 'noise_lut_range', 'noise_lut_azi'],
+    'sigma0': ['sigma0_raw', 'nesz'],
+}
+
+
+def test_resolve_dependencies():
+    assert _resolve_dependencies(['sigma0'], dependencies) == {
+        'sigma0', 'sigma0_raw', 'nesz', 'sigma0_lut', 'noise_lut_range', 'noise_lut_azi'}
+    assert _resolve_dependencies(['sigma0_raw', 'longitude'], dependencies) == {
+        'sigma0_raw', 'sigma0_lut', 'longitude'}
+    assert _resolve_dependencies([], dependencies) == set()
+
+
+@pytest.fixture(scope='module')
+def s1meta(tmp_path_factory):
+    return xsar.Sentinel1Meta(synthetic.safe(str(tmp_path_factory.mktemp('safe')), 'IW'))
+
+
+@pytest.mark.parametrize('variables', [
+    ['sigma0'],
+    ['nesz', 'sigma0_lut'],
+    ['incidence'],
+    ['elevation', 'longitude', 'latitude'],
+    ['ground_heading', 'sigma0_raw'],
+    'gamma0_raw',
+])
+def test_variables(s1meta, variables):
+    resolution = {'atrack': 200, 'xtrack': 200}
+    ds = xsar.Sentinel1Dataset(s1meta, resolution=resolution, variables=variables).dataset
+    names = [variables] if isinstance(variables, str) else variables
+    assert set(ds.data_vars) == set(names) | {'time'}
+    assert list(ds.pol.values) == ['VV', 'VH']
+    # same values as a full dataset
+    full = xsar.Sentinel1Dataset(s1meta, resolution=resolution, luts=True).dataset
+    window = {'atrack': slice(0, 10), 'xtrack': slice(0, 10)}
+    for name in names:
+        np.testing.assert_array_equal(ds[name].isel(window).values, full[name].isel(window).values)
+
+
+def test_variables_unknown(s1meta):
+    with pytest.raises(ValueError):
+        xsar.Sentinel1Dataset(s1meta, resolution={'atrack': 200, 'xtrack': 200}, variables=['sigma1'])
+
+
+def test_ground_heading(s1meta):
+    resolution = {'atrack': 200, 'xtrack': 200}
+    heading = {
+        interpolate: xsar.Sentinel1Dataset(s1meta, resolution=resolution, variables=['ground_heading'],
+                                           interpolate_heading=interpolate).dataset.ground_heading
+        for interpolate in [False, True]
+    }
+    atracks, xtracks = heading[False].atrack.values, heading[False].xtrack.values
+    # per pixel heading by default
+    np.testing.assert_allclose(
+        heading[False].values, s1meta.coords2heading(atracks, xtracks, to_grid=True, approx=False), rtol=1e-6)
+    np.testing.assert_allclose(
+        heading[True].values, s1meta.coords2heading(atracks, xtracks, to_grid=True, interpolate=True), rtol=1e-6)
@@ -0,0 +1,180 @@
+import numpy as np
+import pytest
+import shapely.geometry
+import xsar
+from xsar.utils import haversine
+import synthetic
+
+
+@pytest.fixture(scope='module')
+def antemeridian_meta(tmp_path_factory):
+    path = synthetic.safe(str(tmp_path_factory.mktemp('safe')), 'IW', lon0=179.5, lat0=50.)
+    return xsar.Sentinel1Meta(path)
+
+
+def test_coords2ll_antemeridian(antemeridian_meta):
+    s1meta = antemeridian_meta
+    gcps_lon = s1meta.gcps['longitude'].values.copy()
+    assert s1meta.cross_antemeridian
+    lon, lat = s1meta.coords2ll(s1meta.gcps.atrack.values, s1meta.gcps.xtrack.values, to_grid=True)
+    np.testing.assert_allclose(lon, gcps_lon, atol=1e-8)
+    np.testing.assert_allclose(lat, s1meta.gcps['latitude'].values, atol=1e-8)
+    # gcps are not modified, and interpolators are reused
+    np.testing.assert_array_equal(s1meta.gcps['longitude'].values, gcps_lon)
+    assert s1meta.cross_antemeridian
+    assert s1meta._coords2ll_interpolator is s1meta._coords2ll_interpolator
+
+
+def test_gcps(antemeridian_meta):
+    s1meta = antemeridian_meta
+    gcps = s1meta.gcps
+    assert gcps['longitude'].dtype == np.float64
+    assert 'gcp' not in gcps
+    gcps_objects = s1meta.gcps_objects
+    assert gcps_objects.dims == ('atrack', 'xtrack')
+    for a, x in [(0, 0), (2, 3), (-1, -1)]:
+        gcp = gcps_objects.values[a, x]
+        assert (gcp.row, gcp.col) == (gcps.atrack.values[a], gcps.xtrack.values[x])
+        assert gcp.x == gcps['longitude'].values[a, x]
+        assert gcp.y == gcps['latitude'].values[a, x]
+
+
+def test_ll2coords(antemeridian_meta):
+    s1meta = antemeridian_meta
+    rng = np.random.default_rng(0)
+    atracks = rng.uniform(0, s1meta.gcps.atrack.values[-1], 10000)
+    xtracks = rng.uniform(0, s1meta.gcps.xtrack.values[-1], 10000)
+    lon, lat = s1meta.coords2ll(atracks, xtracks)
+    atracks_ll, xtracks_ll, residuals = s1meta.ll2coords(lon, lat, return_residuals=True)
+    assert np.all(residuals < 1e-3)
+    np.testing.assert_allclose(atracks_ll, atracks, atol=1e-3)
+    np.testing.assert_allclose(xtracks_ll, xtracks, atol=1e-3)
+    # scalars
+    atrack, xtrack = s1meta.ll2coords(lon[0], lat[0])
+    assert isinstance(atrack, float)
+    assert abs(atrack - atracks[0]) < 1e-3 and abs(xtrack - xtracks[0]) < 1e-3
+
+
+def test_ll2coords_grid(antemeridian_meta):
+    s1meta = antemeridian_meta
+    rng = np.random.default_rng(1)
+    atracks = rng.uniform(0, s1meta.gcps.atrack.values[-1], 10000)
+    xtracks = rng.uniform(0, s1meta.gcps.xtrack.values[-1], 10000)
+    lon, lat = s1meta.coords2ll(atracks, xtracks)
+    atracks_ll, xtracks_ll, residuals = s1meta.ll2coords(lon, lat, method='grid', return_residuals=True)
+    assert np.all(np.isnan(residuals))
+    np.testing.assert_allclose(atracks_ll, atracks, atol=0.05)
+    np.testing.assert_allclose(xtracks_ll, xtracks, atol=0.05)
+    # lookup grid is cached
+    assert s1meta._get_ll2coords_grid() is s1meta._get_ll2coords_grid()
+    with pytest.raises(ValueError):
+        s1meta.ll2coords(lon, lat, method='unknown')
+
+
+def test_piecewise_affine(antemeridian_meta):
+    s1meta = antemeridian_meta
+    rng = np.random.default_rng(2)
+    atracks = rng.uniform(0, s1meta.gcps.atrack.values[-1], 10000)
+    xtracks = rng.uniform(0, s1meta.gcps.xtrack.values[-1], 10000)
+    lon, lat = s1meta.coords2ll(atracks, xtracks)
+    for max_error in [100, 1]:
+        lon_approx, lat_approx = s1meta.coords2ll(atracks, xtracks, approx=max_error)
+        assert np.max(haversine(lon, lat, lon_approx, lat_approx)[0]) <= max_error
+        # grid evaluation is like points
+        lon_grid, lat_grid = s1meta.coords2ll(atracks[:50], xtracks[:60], to_grid=True, approx=max_error)
+        xtracks2D, atracks2D = np.meshgrid(xtracks[:60], atracks[:50])
+        np.testing.assert_allclose(
+            np.stack([lon_grid, lat_grid]),
+            np.stack(s1meta.coords2ll(atracks2D, xtracks2D, approx=max_error)))
+        # inverse: pixel size is 10 meters
+        atracks_ll, xtracks_ll = s1meta.ll2coords(lon, lat, approx=max_error)
+        assert np.max(np.hypot(atracks_ll - atracks, xtracks_ll - xtracks)) <= max_error / 10 * 2
+    assert s1meta._get_piecewise_affine(1) is s1meta._get_piecewise_affine(1.)
+    lon0, lat0 = s1meta.coords2ll(atracks[0], xtracks[0], approx=1)
+    assert isinstance(lon0, float)
+    atrack0, xtrack0 = s1meta.ll2coords(lon[0], lat[0], approx=1)
+    assert isinstance(atrack0, float)
+    footprint = s1meta.coords2ll(shapely.geometry.box(1000, 2000, 3000, 4000), approx=1)
+    assert footprint.is_valid
+    # numpy booleans are not an error budget
+    np.testing.assert_array_equal(s1meta.coords2ll(atracks, xtracks, approx=np.True_),
+                                  s1meta.coords2ll(atracks, xtracks, approx=True))
+    np.testing.assert_array_equal(s1meta.ll2coords(lon, lat, approx=np.False_), s1meta.ll2coords(lon, lat))
+
+
+def test_piecewise_affine_image_extent(tmp_path):
+    # last image lines and pixels are not covered by the gcps grid
+    s1meta = xsar.Sentinel1Meta(synthetic.safe(str(tmp_path), 'IW', pols=('VV',), margin=(300, 400)))
+    height, width = s1meta.gcps.attrs['image_shape']
+    assert s1meta.gcps.atrack.values[-1] < height - 1 and s1meta.gcps.xtrack.values[-1] < width - 1
+    atracks = np.r_[0, np.linspace(s1meta.gcps.atrack.values[-1], height - 1, 20)]
+    xtracks = np.r_[0, np.linspace(s1meta.gcps.xtrack.values[-1], width - 1, 20)]
+    lon, lat = s1meta.coords2ll(atracks, xtracks, to_grid=True)
+    for max_error in [10, 1]:
+        lon_approx, lat_approx = s1meta.coords2ll(atracks, xtracks, to_grid=True, approx=max_error)
+        assert np.max(haversine(lon, lat, lon_approx, lat_approx)[0]) <= max_error
+
+
+@pytest.mark.parametrize('heading', [-12., -179.7])
+def test_coords2heading_interpolate(tmp_path, heading):
+    s1meta = xsar.Sentinel1Meta(synthetic.safe(str(tmp_path), 'IW', pols=('VV',), heading=heading))
+    atracks = np.arange(0, 16000, 97.)
+    xtracks = np.arange(0, 25000, 101.)
+    exact = s1meta.coords2heading(atracks, xtracks, to_grid=True, approx=False)
+    interpolated = s1meta.coords2heading(atracks, xtracks, to_grid=True, interpolate=True)
+    assert np.all((-180 <= interpolated) & (interpolated <= 180))
+    assert np.max(np.abs((interpolated - exact + 180) % 360 - 180)) < 0.05
+    assert isinstance(s1meta.coords2heading(100, 200, interpolate=True), float)
+
+
+def test_lazy_lonlat(antemeridian_meta, monkeypatch):
+    import xarray as xr
+    from xsar.xarray_backends import LonLatBackendArray
+    s1meta = antemeridian_meta
+    atracks = np.arange(0, 16000, 10.)
+    xtracks = np.arange(0, 25000, 10.)
+    shapes = []
+    coords2ll = s1meta.coords2ll
+
+    def counting_coords2ll(a, x, **kwargs):
+        shapes.append((np.size(a), np.size(x)))
+        return coords2ll(a, x, **kwargs)
+
+    monkeypatch.setattr(s1meta, 'coords2ll', counting_coords2ll)
+    ds = xr.Dataset(
+        {ll: LonLatBackendArray(s1meta, atracks, xtracks, ll).to_variable() for ll in ['longitude', 'latitude']},
+        coords={'atrack': atracks, 'xtrack': xtracks})
+    ds = xr.merge([ds, xr.DataArray(np.zeros(atracks.size), dims='atrack').to_dataset(name='dummy')])
+    sub = ds.isel(atrack=slice(100, 150), xtrack=[3, 7, 2000]).sel(atrack=slice(None, None, 2))
+    assert shapes == []
+    lon = sub.longitude.values
+    assert shapes == [(25, 3)]
+    assert lon.dtype == np.float32
+    exp_lon, exp_lat = coords2ll(sub.atrack.values, sub.xtrack.values, to_grid=True)
+    np.testing.assert_allclose(lon, exp_lon, atol=1e-4)
+    np.testing.assert_allclose(sub.latitude.values, exp_lat, atol=1e-4)
+    assert float(ds.latitude[10, 20]) == pytest.approx(float(coords2ll(100., 200.)[1]), abs=1e-4)
+    # lazy indexing not available in xarray
+    monkeypatch.setattr(xsar.xarray_backends, 'LazilyIndexedArray', None)
+    with pytest.raises(NotImplementedError):
+        LonLatBackendArray(s1meta, atracks, xtracks, 'longitude').to_variable()
+
+
+@pytest.mark.parametrize('geometry', list(synthetic.geometries))
+def test_geolocation_accuracy(tmp_path, geometry):
+    kwargs = dict(synthetic.geometries[geometry])
+    mode = kwargs.pop('mode')
+    s1meta = xsar.Sentinel1Meta(synthetic.safe(str(tmp_path), mode, pols=('VV',), **kwargs))
+    if s1meta.multidataset:
+        s1meta = xsar.Sentinel1Meta(s1meta.subdatasets[0])
+    gcps = s1meta.gcps
+    rng = np.random.default_rng(0)
+    atracks = rng.uniform(0, gcps.atrack.values[-1], 1000)
+    xtracks = rng.uniform(0, gcps.xtrack.values[-1], 1000)
+    lon, lat = s1meta.coords2ll(atracks, xtracks)
+    true_lon, true_lat = synthetic.geolocation(atracks, xtracks, spacing=synthetic.modes[mode]['spacing'], **kwargs)
+    # gcps grid bilinear interpolation error: below an EW pixel (40 m), but near the pole
+    assert np.max(haversine(lon, lat, true_lon, true_lat)[0]) < (500 if geometry == 'polar' else 40)
+    roundtrip = s1meta.ll2coords(lon, lat)
+    np.testing.assert_allclose(roundtrip[0], atracks, atol=1e-3)
+    np.testing.assert_allclose(roundtrip[1], xtracks, atol=1e-3)
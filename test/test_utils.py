@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+import shapely.geometry
+import shapely.ops
+from shapely.geometry import Point, LineString, MultiPolygon, GeometryCollection
+from xsar import utils
+
+
+@pytest.fixture(params=[True, False], ids=['shapely_transform', 'fallback'])
+def shapely_transform(request, monkeypatch):
+    monkeypatch.setattr(utils, '_shapely_transform', request.param and utils._shapely_transform)
+
+
+@pytest.mark.filterwarnings('ignore:.*shapely.ops.transform:DeprecationWarning')
+def test_transform_geometry(shapely_transform):
+    calls = []
+
+    def func(x, y):
+        calls.append(len(x))
+        return np.asarray(x) * 2 + 1, np.asarray(y) - 3
+
+    polygon_with_hole = Point(0, 0).buffer(10).difference(Point(1, 1).buffer(2))
+    geometries = [
+        Point(1, 2),
+        LineString([(0, 0), (1, 1), (2, 0)]),
+        polygon_with_hole,
+        MultiPolygon([polygon_with_hole, Point(30, 30).buffer(5)]),
+        GeometryCollection([Point(1, 2), polygon_with_hole]),
+        shapely.geometry.Polygon(),
+    ]
+    for geometry in geometries:
+        calls.clear()
+        transformed = utils.transform_geometry(geometry, func)
+        assert transformed.geom_type == geometry.geom_type
+        assert len(calls) <= 1
+        expected = shapely.ops.transform(func, geometry)
+        assert transformed.equals_exact(expected, 1e-12) or (transformed.is_empty and expected.is_empty)
@@ -0,0 +1,165 @@
+import numpy as np
+import pytest
+from datetime import datetime
+from xsar import sentinel1_xml_mappings as mappings
+from xsar.xml_parser import XmlParser
+
+# minimal manifest, with elements that must not match (nested processing, instrument familyName)
+manifest_content = """<?xml version="1.0" encoding="UTF-8"?>
+<xfdu:XFDU xmlns:xfdu="urn:ccsds:schema:xfdu:1" xmlns:gml="http://www.opengis.net/gml"
+ xmlns:safe="http://www.esa.int/safe/sentinel-1.0"
+ xmlns:s1sarl1="http://www.esa.int/safe/sentinel-1.0/sentinel-1/sar/level-1">
+  <metadataSection>
+    <metadataObject ID="processing"><metadataWrap><xmlData>
+      <safe:processing name="GRD Post Processing">
+        <safe:facility name="Facility"><safe:software name="Sentinel-1 IPF" version="002.84"/></safe:facility>
+        <safe:resource name="raw"><safe:processing name="L0">
+          <safe:facility name="L0"><safe:software name="Sentinel-1 IPF" version="001.00"/></safe:facility>
+        </safe:processing></safe:resource>
+      </safe:processing>
+    </xmlData></metadataWrap></metadataObject>
+    <metadataObject ID="platform"><metadataWrap><xmlData>
+      <safe:platform>
+        <safe:familyName>SENTINEL-1</safe:familyName>
+        <safe:number>A</safe:number>
+        <safe:instrument>
+          <safe:familyName abbreviation="SAR">Synthetic Aperture Radar</safe:familyName>
+          <safe:extension><s1sarl1:instrumentMode><s1sarl1:mode>IW</s1sarl1:mode></s1sarl1:instrumentMode></safe:extension>
+        </safe:instrument>
+      </safe:platform>
+    </xmlData></metadataWrap></metadataObject>
+    <metadataObject ID="generalProductInformation"><metadataWrap><xmlData>
+      <s1sarl1:standAloneProductInformation>
+        <s1sarl1:transmitterReceiverPolarisation>VV</s1sarl1:transmitterReceiverPolarisation>
+        <s1sarl1:transmitterReceiverPolarisation>VH</s1sarl1:transmitterReceiverPolarisation>
+        <s1sarl1:productType>GRD</s1sarl1:productType>
+      </s1sarl1:standAloneProductInformation>
+    </xmlData></metadataWrap></metadataObject>
+    <metadataObject ID="acquisitionPeriod"><metadataWrap><xmlData>
+      <safe:acquisitionPeriod>
+        <safe:startTime>2017-09-07T10:30:20.000000</safe:startTime>
+        <safe:stopTime>2017-09-07T10:30:45.000000</safe:stopTime>
+      </safe:acquisitionPeriod>
+    </xmlData></metadataWrap></metadataObject>
+    <metadataObject ID="measurementFrameSet"><metadataWrap><xmlData>
+      <safe:frameSet><safe:frame><safe:footPrint>
+        <gml:coordinates>20.0,-67.0 20.4,-64.6 21.9,-64.9 21.4,-67.3</gml:coordinates>
+      </safe:footPrint></safe:frame></safe:frameSet>
+    </xmlData></metadataWrap></metadataObject>
+  </metadataSection>
+  <dataObjectSection>
+    <dataObject ID="vv" repID="s1Level1ProductSchema"><byteStream>
+      <fileLocation href="./annotation/s1a-iw-grd-vv-20170907t103020-20170907t103045-018268-01eb76-001.xml"/>
+    </byteStream></dataObject>
+    <dataObject ID="vh" repID="s1Level1ProductSchema"><byteStream>
+      <fileLocation href="./annotation/s1a-iw-grd-vh-20170907t103020-20170907t103045-018268-01eb76-002.xml"/>
+    </byteStream></dataObject>
+    <dataObject ID="vv_noise" repID="s1Level1NoiseSchema"><byteStream>
+      <fileLocation href="./annotation/calibration/noise-s1a-iw-grd-vv-018268-01eb76-001.xml"/>
+    </byteStream></dataObject>
+  </dataObjectSection>
+</xfdu:XFDU>
+"""
+
+
+def test_ragged_fromstring():
+    # rows of different sizes, non str items (from lxml.objectify pyval), irregular spaces
+    x = ['0 40 80', '1 2', 5, '  3  4 \n 5', '']
+    values, offsets = mappings.ragged_fromstring(x, dtype=int)
+    np.testing.assert_array_equal(values, [0, 40, 80, 1, 2, 5, 3, 4, 5])
+    np.testing.assert_array_equal(offsets, [0, 3, 5, 6, 9, 9])
+    rows = mappings.int_1Darray_list_from_string_list(x)
+    for row, expected in zip(rows, [[0, 40, 80], [1, 2], [5], [3, 4, 5], []]):
+        np.testing.assert_array_equal(row, expected)
+    # irregular spaces with the right values count: rows must not be misaligned
+    for dtype in [int, float]:
+        values, offsets = mappings.ragged_fromstring(['1  2', '3\t4 5'], dtype=dtype)
+        np.testing.assert_array_equal(values, [1, 2, 3, 4, 5])
+        np.testing.assert_array_equal(offsets, [0, 2, 5])
+
+
+def test_bulk_decoders():
+    rng = np.random.default_rng(0)
+    x = [' '.join('%.6e' % v for v in rng.random(50)) for _ in range(20)]
+    legacy = np.vstack([np.fromstring(e, dtype=float, sep=' ') for e in x])
+    np.testing.assert_array_equal(mappings.float_2Darray_from_string_list(x), legacy)
+    for row, expected in zip(mappings.float_1Darray_list_from_string_list(x), legacy):
+        np.testing.assert_array_equal(row, expected)
+    with pytest.raises(ValueError):
+        mappings.float_2Darray_from_string_list(['1 2', '3'])
+
+    dates = ['2017-09-07T10:30:20.123456', '2017-09-07T10:30:45.000001']
+    legacy = np.array([np.datetime64(datetime.strptime(d, '%Y-%m-%dT%H:%M:%S.%f')) for d in dates])
+    np.testing.assert_array_equal(mappings.datetime64_array(dates), legacy)
+    assert mappings.datetime64_array(dates).dtype == legacy.dtype
+
+
+def test_manifest_streamer(tmp_path):
+    manifest = str(tmp_path / 'manifest.safe')
+    with open(manifest, 'w') as f:
+        f.write(manifest_content)
+    parser = XmlParser(xpath_mappings=mappings.xpath_mappings, namespaces=mappings.namespaces)
+    streamed = mappings.manifest_streamer(manifest)
+    for var_name, (_, xpath) in mappings.xpath_mappings['manifest'].items():
+        assert streamed[xpath] == parser.xpath(manifest, xpath), var_name
+
+    # manifest is read without building an xml tree
+    parser = XmlParser(xpath_mappings=mappings.xpath_mappings, compounds_vars=mappings.compounds_vars,
+                       namespaces=mappings.namespaces, streamers=mappings.streamers)
+    attrs = parser.get_compound_var(manifest, 'safe_attributes')
+    assert attrs['ipf_version'] == 2.84
+    assert list(attrs['polarizations']) == ['VV', 'VH']
+    assert attrs['mission'] == 'SENTINEL-1'
+    assert not parser._xml_roots
+    assert parser.stats['stream']['misses'] == 1
+
+
+def test_noise_lut():
+    # overlapping blocks: last one is used. Blocks are not sorted by atrack.
+    noise_lut = mappings._NoiseLut(
+        [(100, 0, 199, 49), (0, 0, 99, 99), (50, 50, 150, 99)],
+        [lambda a, x: 1., lambda a, x: 2., lambda a, x: np.add.outer(a, x)])
+    atracks = np.arange(0, 200, 10.)
+    xtracks = np.arange(0, 100, 5.)
+    expected = np.full((atracks.size, xtracks.size), np.nan)
+    expected[(atracks >= 100)[:, None] & (xtracks <= 49)] = 1.
+    expected[(atracks <= 99)[:, None] & (xtracks <= 99)] = 2.
+    block = (atracks >= 50)[:, None] & (atracks <= 150)[:, None] & (xtracks >= 50)
+    expected[block] = np.add.outer(atracks, xtracks)[block]
+    np.testing.assert_array_equal(noise_lut(atracks, xtracks), expected)
+    # chunk without any block
+    assert np.all(np.isnan(noise_lut(np.arange(160., 200.), np.arange(60., 100.))))
+
+    # range noise: vectors on lines 0, 10, 20, each one used on half the lines to the previous and next one
+    xtracks = [np.array([0, 50, 99])] * 3
+    luts = [np.array([1., 2., 3.]) * v for v in (1, 10, 100)]
+    noise_range = mappings.noise_lut_range(np.array([0, 10, 20]), xtracks, luts)
+    lines = np.arange(0, 30)
+    values = noise_range(lines, np.array([0., 25., 99.]))
+    np.testing.assert_allclose(values[:, 1], np.where(lines < 5, 1.5, np.where(lines < 15, 15, 150)))
+
+    # ragged vectors, compared to one interp1d per line
+    from scipy.interpolate import interp1d
+    rng = np.random.default_rng(0)
+    lines = np.array([0, 40, 70, 130])
+    xtracks = [np.unique(rng.integers(0, 1000, n)) for n in (10, 50, 3, 20)]
+    luts = [rng.random(x.size) for x in xtracks]
+    noise_range = mappings.noise_lut_range(lines, xtracks, luts)
+    atracks = np.arange(0, 200, 3.)
+    xtracks_chunk = np.arange(-0.5, 1000, 7.)
+    values = noise_range(atracks, xtracks_chunk)
+    starts = (lines - np.diff(lines, prepend=0) / 2).astype(int)
+    for a, row in zip(atracks, values):
+        i = np.flatnonzero(starts <= a)[-1]
+        expected = interp1d(xtracks[i], luts[i], bounds_error=False, fill_value=np.nan)(xtracks_chunk)
+        np.testing.assert_array_equal(row, expected)
+
+    # vectors with less than 2 samples: only defined at their sample (empty vectors are nan)
+    xtracks = [np.array([0, 50, 99]), np.array([50]), np.array([], dtype=int), np.array([0, 100])]
+    luts = [np.array([1., 2., 3.]), np.array([7.]), np.array([]), np.array([4., 5.])]
+    noise_range = mappings.noise_lut_range(np.array([0, 10, 20, 30]), xtracks, luts)
+    values = noise_range(np.array([0., 10., 20., 30.]), np.array([0., 50., 99.]))
+    np.testing.assert_allclose(values, [[1, 2, 3], [np.nan, 7, np.nan], [np.nan] * 3, [4, 4.5, 4.99]])
+    # last vector with one sample
+    noise_range = mappings.noise_lut_range(np.array([0, 10]), xtracks[:2], luts[:2])
+    np.testing.assert_array_equal(noise_range(np.array([12.]), np.array([0., 50.])), [[np.nan, 7]])
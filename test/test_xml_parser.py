@@ -0,0 +1,228 @@
+import os
+import threading
+import pytest
+import cloudpickle
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from xsar import xml_parser
+from xsar.xml_parser import XmlParser, DiskCache
+
+xml_content = """<?xml version="1.0" encoding="UTF-8"?>
+<calibration>
+  <adsHeader>
+    <polarisation>VV</polarisation>
+  </adsHeader>
+  <calibrationVectorList count="2">
+    <calibrationVector>
+      <line>0</line>
+      <pixel count="3">0 40 80</pixel>
+      <sigmaNought count="3">1.0 2.0 3.0</sigmaNought>
+    </calibrationVector>
+    <calibrationVector>
+      <line>100</line>
+      <pixel count="3">0 40 80</pixel>
+      <sigmaNought count="3">4.0 5.0 6.0</sigmaNought>
+    </calibrationVector>
+  </calibrationVectorList>
+</calibration>
+"""
+
+xpath_mappings = {
+    'calibration': {
+        'polarization': (lambda x: x[0], '/calibration/adsHeader/polarisation'),
+        'atrack': (np.array, '//calibration/calibrationVectorList/calibrationVector/line'),
+        'sigma0_lut': (
+            lambda x: np.vstack([np.fromstring(e, dtype=float, sep=' ') for e in x]),
+            '//calibration/calibrationVectorList/calibrationVector/sigmaNought'),
+    }
+}
+
+compounds_vars = {
+    'sigma0': {
+        'func': lambda atrack, lut: (atrack, lut),
+        'args': ('calibration.atrack', 'calibration.sigma0_lut')
+    }
+}
+
+
+def write_xml(path, content=xml_content):
+    with open(path, 'w') as f:
+        f.write(content)
+    return str(path)
+
+
+def new_parser(**kwargs):
+    return XmlParser(xpath_mappings=xpath_mappings, compounds_vars=compounds_vars, **kwargs)
+
+
+def test_get_var(tmp_path):
+    xml_file = write_xml(tmp_path / 'calibration.xml')
+    parser = new_parser()
+    assert parser.get_var(xml_file, 'calibration.polarization') == 'VV'
+    np.testing.assert_array_equal(parser.get_var(xml_file, 'calibration.atrack'), [0, 100])
+    atrack, lut = parser.get_compound_var(xml_file, 'sigma0')
+    np.testing.assert_array_equal(lut, [[1, 2, 3], [4, 5, 6]])
+
+
+def test_disk_cache(tmp_path, monkeypatch):
+    xml_file = write_xml(tmp_path / 'calibration.xml')
+    cache_dir = str(tmp_path / 'cache')
+
+    lut = new_parser(cache_dir=cache_dir).get_var(xml_file, 'calibration.sigma0_lut')
+
+    # a new parser (like in another process) must not parse the xml file
+    parser = new_parser(cache_dir=cache_dir)
+    np.testing.assert_array_equal(parser.get_var(xml_file, 'calibration.sigma0_lut'), lut)
+    assert xml_file not in parser._xml_roots
+
+    # cache is invalidated if the file is modified
+    write_xml(xml_file, xml_content.replace('4.0 5.0 6.0', '7.0 8.0 9.0'))
+    os.utime(xml_file, ns=(0, 0))
+    parser = new_parser(cache_dir=cache_dir)
+    np.testing.assert_array_equal(parser.get_var(xml_file, 'calibration.sigma0_lut'), [[1, 2, 3], [7, 8, 9]])
+
+    # cache is invalidated if decoders change
+    key = DiskCache.key(xml_file, 'calibration.sigma0_lut')
+    monkeypatch.setattr(xml_parser, 'decoders_version', xml_parser.decoders_version + 1)
+    assert DiskCache.key(xml_file, 'calibration.sigma0_lut') != key
+
+
+def test_disk_cache_eviction(tmp_path):
+    cache = DiskCache(str(tmp_path / 'cache'), max_size=None)
+    cache.set('key0', np.zeros(100))
+    entry_size = os.path.getsize(cache._entry_path('key0'))
+    cache.max_size = entry_size * 4.5
+    for i in range(1, 4):
+        cache.set('key%d' % i, np.zeros(100))
+    for i in range(4):
+        os.utime(cache._entry_path('key%d' % i), ns=(i, i))
+    cache.get('key0')  # key0 is now the most recently used
+    cache.set('key4', np.zeros(100))  # cache is full: key1 is evicted
+    assert cache._scan_size() <= cache.max_size
+    for key in ['key0', 'key2', 'key3', 'key4']:
+        cache.get(key)
+    with pytest.raises(KeyError):
+        cache.get('key1')
+
+    # replacing an entry doesn't change cache size
+    size = cache._size
+    cache.set('key4', np.ones(100))
+    assert cache._size == size == cache._scan_size()
+
+
+def test_roots_eviction(tmp_path):
+    xml_files = [write_xml(tmp_path / ('calibration_%d.xml' % i)) for i in range(3)]
+    parser = new_parser(max_roots=2)
+    for xml_file in xml_files:
+        parser.get_var(xml_file, 'calibration.atrack')
+    assert list(parser._xml_roots) == xml_files[1:]
+    assert xml_files[0] not in parser._xpath_cache
+    # decoded variables are kept
+    np.testing.assert_array_equal(parser.get_var(xml_files[0], 'calibration.atrack'), [0, 100])
+    stats = parser.stats
+    assert stats['roots'] == {'hits': 0, 'misses': 3, 'evictions': 1}
+    assert stats['var'] == {'hits': 1, 'misses': 3, 'evictions': 0}
+
+    parser = new_parser(max_roots_size=1)
+    for xml_file in xml_files:
+        parser.get_var(xml_file, 'calibration.atrack')
+    # the most recently used root is always kept
+    assert list(parser._xml_roots) == xml_files[-1:]
+
+
+def test_xpath_batch(tmp_path):
+    xml_file = write_xml(tmp_path / 'calibration.xml')
+    parser = new_parser()
+    parser.get_var(xml_file, 'calibration.polarization')
+    # all xpath from 'calibration' file type are evaluated on first access
+    assert set(parser._xpath_cache[xml_file]) == set(xp for _, xp in xpath_mappings['calibration'].values())
+    parser.get_compound_var(xml_file, 'sigma0')
+    assert parser.stats['roots']['misses'] == 1
+    assert parser.xpath(xml_file, '//calibrationVector/line') == [0, 100]
+    with pytest.raises(NotImplementedError):
+        parser.get_var(xml_file, 'calibration')
+    with pytest.raises(KeyError):
+        parser.get_var(xml_file, 'calibration.unknown')
+
+
+def test_threads(tmp_path):
+    xml_files = [write_xml(tmp_path / ('calibration_%d.xml' % i)) for i in range(2)]
+    parser = new_parser()
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(lambda i: parser.get_compound_var(xml_files[i % 2], 'sigma0'), range(32)))
+    for result in results:
+        np.testing.assert_array_equal(result[1], [[1, 2, 3], [4, 5, 6]])
+    # each file is parsed only once, and each variable is decoded only once
+    stats = parser.stats
+    assert stats['roots']['misses'] == 2
+    assert stats['var']['misses'] == 4
+    assert stats['compound']['misses'] == 2
+    assert stats['compound']['hits'] == 30
+    # per key locks are removed once values are computed
+    assert not parser._key_locks
+
+    # parser is still picklable (cloudpickle is used by dask)
+    parser = cloudpickle.loads(cloudpickle.dumps(parser))
+    np.testing.assert_array_equal(parser.get_var(xml_files[0], 'calibration.atrack'), [0, 100])
+
+
+def test_pickle_policy(tmp_path):
+    xml_file = write_xml(tmp_path / 'calibration.xml')
+    cache_dir = str(tmp_path / 'cache')
+    parser = new_parser(cache_dir=cache_dir)
+    parser.get_compound_var(xml_file, 'sigma0')
+
+    # xml trees are never pickled, and computed compound vars are pickled
+    worker_parser = cloudpickle.loads(cloudpickle.dumps(parser))
+    assert not worker_parser._xml_roots and not worker_parser._xpath_cache
+    worker_parser.get_compound_var(xml_file, 'sigma0')
+    assert worker_parser.stats['compound'] == {'hits': 1, 'misses': 0, 'evictions': 0}
+    assert worker_parser.stats['roots']['misses'] == 0
+
+    # not picklable compound vars are rebuilt from decoded vars without parsing
+    parser._compounds_vars_cache[(xml_file, 'sigma0')] = (threading.Lock(),)
+    del parser._compounds_picklable[(xml_file, 'sigma0')]
+    worker_parser = cloudpickle.loads(cloudpickle.dumps(parser))
+    worker_parser.get_compound_var(xml_file, 'sigma0')
+    assert worker_parser.stats['compound']['misses'] == 1
+    assert worker_parser.stats['roots']['misses'] == 0
+
+    # without decoded vars, the worker warms from the shared disk cache
+    parser.pickle_vars = False
+    worker_parser = cloudpickle.loads(cloudpickle.dumps(parser))
+    assert not worker_parser._var_cache
+    worker_parser.get_compound_var(xml_file, 'sigma0')
+    assert worker_parser.stats['roots']['misses'] == 0
+    assert worker_parser.stats['disk']['hits'] == 2
+
+
+def test_prefetch(tmp_path):
+    xml_files = [write_xml(tmp_path / ('calibration_%d.xml' % i)) for i in range(4)]
+    parser = new_parser()
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(lambda f: parser.prefetch(f, 'calibration'), xml_files))
+    assert parser.stats['var']['misses'] == 4 * len(xpath_mappings['calibration'])
+    parser.clear_roots()
+    # all variables are decoded: no more parsing
+    for xml_file in xml_files:
+        parser.get_compound_var(xml_file, 'sigma0')
+    assert parser.stats['roots']['misses'] == 4
+
+
+def test_prefetch_errors(tmp_path):
+    xml_file = write_xml(tmp_path / 'calibration.xml')
+    mappings = {'calibration': dict(xpath_mappings['calibration'])}
+    # not found variable is skipped
+    mappings['calibration']['gamma_lut'] = (lambda x: x[0], '//calibration/calibrationVectorList/gamma')
+    parser = XmlParser(xpath_mappings=mappings)
+    parser.prefetch(xml_file, 'calibration')
+    with pytest.raises(IndexError):
+        parser.get_var(xml_file, 'calibration.gamma_lut')
+
+    # unreadable file is skipped
+    parser.prefetch(str(tmp_path / 'missing.xml'), 'calibration')
+
+    # decoding error is raised
+    mappings['calibration']['atrack'] = (lambda x: int('a'), '//calibration/calibrationVectorList/calibrationVector/line')
+    with pytest.raises(ValueError):
+        XmlParser(xpath_mappings=mappings).prefetch(xml_file, 'calibration')
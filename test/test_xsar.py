@@ -24,3 +24,8 @@ ds.compute()
 
 ds = xsar.open_dataset(meta).isel(pol=0,atrack=slice(0,100),xtrack=slice(0,100))
 ds.compute()
+
+# only sigma0 and its dependencies are built
+ds = xsar.open_dataset(meta, resolution={'atrack': 100, 'xtrack': 100}, variables=['sigma0'])
+assert set(ds.data_vars) == {'time', 'sigma0'}
+ds.compute()